@@ -0,0 +1,40 @@
+# Age-bracket classification throughput: per-row linear scan (old) vs. bisect vs. batch API.
+# Usage: python -m bench.age_brackets [rows]   (NumPy is used for the batch path when installed)
+import random, sys, time
+from datetime import date, timedelta
+from config import AGE_BRACKETS
+from utils.age_index import AgeBracketIndex, ages_from_birthdays, np
+
+def _linear(age: int):
+    slots = [(lo_hi, rid) for lo_hi, rid in AGE_BRACKETS]  # rebuilt per call, as before
+    for (lo, hi), rid in slots:
+        if lo <= age <= hi:
+            return rid
+    return None
+
+def _timed(label: str, rows: int, fn):
+    t0 = time.perf_counter()
+    out = fn()
+    dt = time.perf_counter() - t0
+    print(f"{label:<28} {dt*1000:9.1f}ms  {rows/dt/1e6:6.2f}M rows/s")
+    return out
+
+def main(rows: int) -> None:
+    rng = random.Random(42)
+    today = date(2026, 10, 18)
+    birthdays = [date(1940, 1, 1) + timedelta(days=rng.randrange(0, 31_000)) for _ in range(rows)]
+    index = AgeBracketIndex(AGE_BRACKETS)
+    print(f"rows={rows} numpy={'yes' if np is not None else 'no'}")
+
+    ages = _timed("ages_from_birthdays (dates)", rows, lambda: ages_from_birthdays(birthdays, today))
+    if np is not None:
+        arr = np.array(birthdays, dtype="datetime64[D]")
+        ages_np = _timed("ages_from_birthdays (dt64)", rows, lambda: ages_from_birthdays(arr, today))
+        assert ages_np == ages
+    expected = _timed("linear scan (old)", rows, lambda: [_linear(a) for a in ages])
+    scalar = _timed("AgeBracketIndex.resolve", rows, lambda: [index.resolve(a) for a in ages])
+    batch = _timed("AgeBracketIndex.resolve_many", rows, lambda: index.resolve_many(ages))
+    assert scalar == expected and batch == expected
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,66 @@
+# canon_name/canon_full: old 11-pass pipeline vs. the fold-table engine, on a synthetic
+# mix of Thai and Latin display names (decorations, leet, confusables, emoji, zero-width).
+# Usage: python -m bench.canon_names [names]
+import random, re, sys, time, unicodedata
+from utils.text import _CONFUSABLES_MAP, _LEET_MAP, canon_full, canon_many
+
+# the pre-engine pipeline, kept verbatim as the correctness reference
+EMOJI_RE = re.compile(
+    r"[\U0001F300-\U0001F5FF\U0001F600-\U0001F64F\U0001F680-\U0001F6FF\U0001F700-\U0001F77F"
+    r"\U0001F780-\U0001F7FF\U0001F900-\U0001F9FF\U0001FA00-\U0001FA6F\U0001FA70-\U0001FAFF"
+    r"\u2600-\u26FF\u2700-\u27BF]"
+    r"|[\u200d\uFE0F]"
+    r"|[\U0001F1E6-\U0001F1FF]{2}"
+)
+_ZERO_WIDTH_RE = re.compile(r"[\u200B-\u200F\u202A-\u202E\u2060-\u206F\uFEFF]")
+
+def _reference(s: str) -> str:
+    if not s: return ""
+    s = unicodedata.normalize("NFKC", s)
+    s = _ZERO_WIDTH_RE.sub("", s)
+    s = EMOJI_RE.sub("", s)
+    s = s.translate(_CONFUSABLES_MAP)
+    s = s.translate(_LEET_MAP)
+    s = unicodedata.normalize("NFKD", s)
+    s = "".join(ch for ch in s if unicodedata.category(ch) != "Mn")
+    s = "".join(ch for ch in s if unicodedata.category(ch).startswith("L"))
+    s = s.casefold()
+    if not s: return s
+    out = [s[0]]
+    for ch in s[1:]:
+        if ch != out[-1]: out.append(ch)
+    return "".join(out)
+
+_THAI = ["สมชาย", "น้องมิ้นท์", "พี่ต้น", "ปลาทู", "แบม", "เจ้าหญิงน้อย", "ไอซ์", "ภูมิ", "กุ๊กไก่", "ต๊ะ"]
+_LATIN = ["Alex", "NoobMaster", "xXSn1perXx", "Café", "Zoë", "ＦＵＬＬＷＩＤＴＨ", "Mr.Bean", "lil_pump", "KiRa", "Ｌｕｎａ"]
+_DECOR = ["", "", "✨", "🔥", "👑", "​", "(ห้องเกม)", "[TH]", "_", "123", "Ꭺ", "оо", "ß", "é́"]
+
+def _corpus(n: int, rng: random.Random) -> list[str]:
+    out = []
+    for _ in range(n):
+        base = rng.choice(_THAI + _LATIN)
+        out.append(rng.choice(_DECOR) + base + rng.choice(_DECOR) + (str(rng.randrange(100)) if rng.random() < 0.3 else ""))
+    return out
+
+def _timed(label: str, n: int, fn):
+    t0 = time.perf_counter()
+    out = fn()
+    dt = time.perf_counter() - t0
+    print(f"{label:<30} {dt*1000:9.1f}ms  {n/dt/1e3:8.1f}k names/s")
+    return out
+
+def main(n: int) -> None:
+    rng = random.Random(7)
+    names = _corpus(n, rng)
+    unique = list(dict.fromkeys(names))
+    print(f"names={n} unique={len(unique)}")
+    expected = _timed("reference (11 passes)", n, lambda: [_reference(x) for x in names])
+    canon_full.cache_clear()
+    cold = _timed("engine, unique names (no LRU)", len(unique), lambda: [canon_full.__wrapped__(x) for x in unique])
+    got = _timed("engine + LRU (canon_many)", n, lambda: canon_many(names))
+    assert got == expected, "output mismatch"
+    assert cold == [_reference(x) for x in unique]
+    print("identical output ✓")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,382 @@
+# Local stand-in for Discord's REST API and gateway, for end-to-end load tests of the real bot.py.
+# Point the bot at it with DISCORD_API_BASE=http://127.0.0.1:<port>/api/v10 (see bench/loadtest.py); the
+# gateway is served at ws://127.0.0.1:<port>/ws.
+# It emulates the slice the bot uses: login, gateway READY/GUILD_CREATE/heartbeats, interaction
+# callbacks + followups, message send/edit, member fetch/edit and DMs, with per-route rate-limit
+# headers and 429s.
+import asyncio, itertools, json, random, time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Optional
+from aiohttp import web, WSMsgType
+from config import (ROLE_ID_TO_GIVE, GENDER_ROLE_IDS_ALL, AGE_ROLE_IDS_ALL, APPROVAL_CHANNEL_ID,
+                    ADMIN_NOTIFY_CHANNEL_ID, VERIFY_CHANNEL_ID, LOG_CHANNEL_ID, BIRTHDAY_CHANNEL_ID)
+
+DISCORD_EPOCH_MS = 1420070400000
+# route kind -> (limit, per seconds); roughly Discord's published per-resource buckets
+RATE_LIMITS = {"member": (10, 10.0), "message": (5, 5.0), "edit": (5, 5.0), "dm": (5, 5.0)}
+GLOBAL_LIMIT = (50, 1.0)
+
+_seq = itertools.count()
+
+def snowflake() -> int:
+    return ((int(time.time() * 1000) - DISCORD_EPOCH_MS) << 22) | (next(_seq) & 0x3FFFFF)
+
+def json_response(body, *, status: int = 200, headers: Optional[dict] = None) -> web.Response:
+    # discord.py only decodes bodies whose Content-Type is exactly application/json (no charset)
+    return web.Response(body=json.dumps(body).encode(), status=status,
+                        headers={**(headers or {}), "Content-Type": "application/json"})
+
+def _iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+class _Bucket:
+    __slots__ = ("limit", "per", "remaining", "reset_at")
+    def __init__(self, limit: int, per: float):
+        self.limit, self.per = limit, per
+        self.remaining, self.reset_at = limit, time.monotonic() + per
+
+    def hit(self) -> Optional[float]:
+        # None if allowed, else seconds until the window resets
+        now = time.monotonic()
+        if now >= self.reset_at:
+            self.remaining, self.reset_at = self.limit, now + self.per
+        if self.remaining <= 0:
+            return self.reset_at - now
+        self.remaining -= 1
+        return None
+
+class FakeDiscord:
+    def __init__(self, *, guilds: int = 1, shard_count: int = 1, rest_latency: float = 0.0, jitter: float = 0.0,
+                 rate_limits: bool = True):
+        self.shard_count = shard_count
+        self.rest_latency, self.jitter = rest_latency, jitter
+        self.rate_limits = rate_limits
+        self.bot_user = {"id": str(snowflake()), "username": "saltybot", "discriminator": "0", "global_name": None,
+                         "avatar": None, "bot": True, "flags": 0}
+        self.app_id = self.bot_user["id"]
+        self.guilds: dict[int, dict] = {}
+        self.users: dict[int, dict] = {}
+        self.members: dict[tuple[int, int], dict] = {}
+        self.messages: dict[int, dict] = {}
+        self.dm_channels: dict[int, int] = {}
+        self.sessions: dict[int, "_Session"] = {}   # shard_id -> gateway session
+        self.ready = asyncio.Event()
+        self._buckets: dict[tuple, _Bucket] = {}
+        self._global = _Bucket(*GLOBAL_LIMIT)
+        self._waiters: dict[tuple, asyncio.Future] = {}
+        self.calls: Counter = Counter()
+        self.rate_limited: Counter = Counter()
+        for _ in range(guilds):
+            self._make_guild()
+
+    # ---- state ----
+    def _make_guild(self) -> int:
+        gid = snowflake()
+        role_ids = [ROLE_ID_TO_GIVE, *GENDER_ROLE_IDS_ALL, *AGE_ROLE_IDS_ALL]
+        roles = [self._role(gid, "@everyone", 0, "0")]
+        roles += [self._role(rid, f"role-{i}", i + 1, "0") for i, rid in enumerate(dict.fromkeys(role_ids))]
+        bot_role, mod_role = snowflake(), snowflake()
+        roles.append(self._role(mod_role, "moderator", len(roles) + 1, str(1 << 28)))  # MANAGE_ROLES
+        roles.append(self._role(bot_role, "saltybot", len(roles) + 1, "8"))
+        channel_ids = dict.fromkeys([APPROVAL_CHANNEL_ID, ADMIN_NOTIFY_CHANNEL_ID, VERIFY_CHANNEL_ID, LOG_CHANNEL_ID, BIRTHDAY_CHANNEL_ID])
+        channels = [{"id": str(cid), "type": 0, "name": f"ch-{i}", "position": i, "permission_overwrites": [],
+                     "guild_id": str(gid), "nsfw": False, "parent_id": None, "topic": None, "last_message_id": None,
+                     "rate_limit_per_user": 0} for i, cid in enumerate(channel_ids)]
+        self.guilds[gid] = {"id": gid, "roles": roles, "channels": channels, "mod_role": mod_role}
+        self.members[(gid, int(self.bot_user["id"]))] = self._member_obj(self.bot_user, [bot_role])
+        return gid
+
+    @staticmethod
+    def _role(rid: int, name: str, position: int, permissions: str) -> dict:
+        return {"id": str(rid), "name": name, "color": 0, "hoist": False, "position": position, "permissions": permissions,
+                "managed": False, "mentionable": False, "flags": 0, "icon": None, "unicode_emoji": None}
+
+    @staticmethod
+    def _member_obj(user: dict, roles: list[int]) -> dict:
+        return {"user": user, "roles": [str(r) for r in roles], "joined_at": _iso(), "deaf": False, "mute": False,
+                "flags": 0, "nick": None, "avatar": None, "pending": False, "premium_since": None,
+                "communication_disabled_until": None}
+
+    def add_user(self, guild_id: int, name: str, roles: Optional[list[int]] = None) -> int:
+        uid = snowflake()
+        self.users[uid] = {"id": str(uid), "username": name, "discriminator": "0", "global_name": name,
+                           "avatar": None, "bot": False, "flags": 0}
+        self.members[(guild_id, uid)] = self._member_obj(self.users[uid], roles or [])
+        return uid
+
+    def guild_shard(self, guild_id: int) -> int:
+        return (guild_id >> 22) % self.shard_count
+
+    def post_message(self, channel_id: int, guild_id: Optional[int], *, content: str = "", embeds=None,
+                     components=None, author: Optional[dict] = None) -> dict:
+        mid = snowflake()
+        msg = {"id": str(mid), "channel_id": str(channel_id), "author": author or self.bot_user, "content": content,
+               "timestamp": _iso(), "edited_timestamp": None, "tts": False, "mention_everyone": False, "mentions": [],
+               "mention_roles": [], "attachments": [], "embeds": embeds or [], "pinned": False, "type": 0, "flags": 0,
+               "components": components or []}
+        if guild_id: msg["guild_id"] = str(guild_id)
+        self.messages[mid] = msg
+        return msg
+
+    # ---- load-generator hooks ----
+    def expect(self, key: tuple) -> asyncio.Future:
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters[key] = fut
+        return fut
+
+    def _resolve(self, key: tuple, value=None) -> None:
+        fut = self._waiters.pop(key, None)
+        if fut and not fut.done(): fut.set_result(value if value is not None else time.perf_counter())
+
+    async def dispatch_interaction(self, guild_id: int, user_id: int, *, custom_id: str, channel_id: int,
+                                   message: Optional[dict] = None, permissions: str = "0") -> tuple[int, asyncio.Future]:
+        # returns the interaction id and a future resolved when the bot answers its callback
+        iid = snowflake()
+        answered = self.expect(("callback", iid))
+        payload = {"id": str(iid), "application_id": self.app_id, "type": 3, "token": f"tok-{iid}", "version": 1,
+                   "guild_id": str(guild_id), "channel_id": str(channel_id),
+                   "channel": {"id": str(channel_id), "type": 0, "guild_id": str(guild_id)},
+                   "member": dict(self.members[(guild_id, user_id)], permissions=permissions),
+                   "data": {"custom_id": custom_id, "component_type": 2},
+                   "app_permissions": "8", "locale": "th", "guild_locale": "th", "entitlements": [],
+                   "authorizing_integration_owners": {"0": str(guild_id)}, "context": 0}
+        if message: payload["message"] = message
+        await self.sessions[self.guild_shard(guild_id)].dispatch("INTERACTION_CREATE", payload)
+        return iid, answered
+
+    # ---- HTTP plumbing ----
+    async def _limited(self, kind: str, key) -> Optional[web.Response]:
+        self.calls[kind] += 1
+        if self.rest_latency or self.jitter:
+            await asyncio.sleep(max(0.0, self.rest_latency + random.uniform(-self.jitter, self.jitter)))
+        if not self.rate_limits or kind not in RATE_LIMITS:
+            return None
+        retry = self._global.hit()
+        scope = "global"
+        if retry is None:
+            b = self._buckets.get((kind, key))
+            if b is None:
+                b = self._buckets[(kind, key)] = _Bucket(*RATE_LIMITS[kind])
+            retry, scope = b.hit(), "user"
+        if retry is None:
+            return None
+        self.rate_limited[kind] += 1
+        return json_response({"message": "You are being rate limited.", "retry_after": round(retry, 3),
+                                  "global": scope == "global", "code": 0}, status=429,
+                                 headers={"Retry-After": str(max(1, int(retry + 0.999))), "X-RateLimit-Scope": scope,
+                                          "X-RateLimit-Global": "true" if scope == "global" else "false"})
+
+    def _ok(self, kind: str, key, body=None, status: int = 200) -> web.Response:
+        headers = {}
+        b = self._buckets.get((kind, key))
+        if b is not None:
+            reset_after = max(b.reset_at - time.monotonic(), 0.0)
+            headers = {"X-RateLimit-Limit": str(b.limit), "X-RateLimit-Remaining": str(max(b.remaining, 0)),
+                       "X-RateLimit-Reset": f"{time.time() + reset_after:.3f}", "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+                       "X-RateLimit-Bucket": f"{kind}-{key}"}
+        if body is None:
+            return web.Response(status=204, headers=headers)
+        return json_response(body, status=status, headers=headers)
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        r = app.router
+        api = "/api/v10"
+        r.add_get(f"{api}/users/@me", self._me)
+        r.add_get(f"{api}/oauth2/applications/@me", self._application)
+        r.add_get(f"{api}/gateway", self._gateway)
+        r.add_get(f"{api}/gateway/bot", self._gateway)
+        r.add_get("/ws", self._ws)
+        r.add_post(f"{api}/interactions/{{iid}}/{{token}}/callback", self._callback)
+        r.add_post(f"{api}/webhooks/{{app}}/{{token}}", self._followup)
+        r.add_route("*", f"{api}/webhooks/{{app}}/{{token}}/messages/{{mid}}", self._followup_message)
+        r.add_post(f"{api}/channels/{{cid}}/messages", self._send)
+        r.add_route("*", f"{api}/channels/{{cid}}/messages/{{mid}}", self._message)
+        r.add_route("*", f"{api}/guilds/{{gid}}/members/{{uid}}", self._member)
+        r.add_route("*", f"{api}/guilds/{{gid}}/members/{{uid}}/roles/{{rid}}", self._member_role)
+        r.add_post(f"{api}/users/@me/channels", self._dm_channel)
+        r.add_route("*", f"{api}/{{tail:.*}}", self._unknown)
+        return app
+
+    async def _me(self, _req):
+        return json_response(self.bot_user)
+
+    async def _application(self, _req):
+        return json_response({"id": self.app_id, "name": "saltybot", "icon": None, "description": "", "bot_public": False,
+                              "bot_require_code_grant": False, "verify_key": "0" * 64, "flags": 0,
+                              "owner": {**self.bot_user, "bot": False}, "team": None})
+
+    async def _gateway(self, req):
+        return json_response({"url": f"ws://{req.host}/ws", "shards": self.shard_count,
+                                  "session_start_limit": {"total": 1000, "remaining": 1000, "reset_after": 0, "max_concurrency": 16}})
+
+    async def _ws(self, req):
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(req)
+        session = _Session(self, ws, f"ws://{req.host}/ws")
+        await session.run()
+        return ws
+
+    async def _callback(self, req):
+        if (resp := await self._limited("callback", None)): return resp
+        body = await self._json(req)
+        iid = int(req.match_info["iid"])
+        self._resolve(("callback", iid))
+        return json_response({"interaction": {"id": str(iid), "type": body.get("type"),
+                                                  "response_message_loading": False, "response_message_ephemeral": False}})
+
+    async def _followup(self, req):
+        if (resp := await self._limited("followup", None)): return resp
+        body = await self._json(req)
+        token = req.match_info["token"]
+        msg = self.post_message(0, None, content=body.get("content") or "", embeds=body.get("embeds"))
+        self._resolve(("followup", token), msg.get("content"))
+        return json_response(msg)
+
+    async def _followup_message(self, req):
+        if (resp := await self._limited("followup", None)): return resp
+        return json_response(self.post_message(0, None))
+
+    async def _send(self, req):
+        cid = int(req.match_info["cid"])
+        if (resp := await self._limited("message", cid)): return resp
+        body = await self._json(req)
+        guild_id = next((g for g, gd in self.guilds.items() if any(c["id"] == str(cid) for c in gd["channels"])), None)
+        msg = self.post_message(cid, guild_id, content=body.get("content") or "", embeds=body.get("embeds"),
+                                components=body.get("components"))
+        self._resolve(("send", cid))
+        return self._ok("message", cid, msg)
+
+    async def _message(self, req):
+        cid, mid = int(req.match_info["cid"]), int(req.match_info["mid"])
+        msg = self.messages.get(mid)
+        if msg is None:
+            return json_response({"message": "Unknown Message", "code": 10008}, status=404)
+        if req.method == "GET":
+            if (resp := await self._limited("get", cid)): return resp
+            return json_response(msg)
+        if req.method == "DELETE":
+            self.messages.pop(mid, None)
+            return web.Response(status=204)
+        if (resp := await self._limited("edit", cid)): return resp
+        body = await self._json(req)
+        for k in ("content", "embeds", "components"):
+            if k in body: msg[k] = body[k]
+        msg["edited_timestamp"] = _iso()
+        self._resolve(("edit", mid))
+        return self._ok("edit", cid, msg)
+
+    async def _member(self, req):
+        gid, uid = int(req.match_info["gid"]), int(req.match_info["uid"])
+        m = self.members.get((gid, uid))
+        if m is None:
+            return json_response({"message": "Unknown Member", "code": 10007}, status=404)
+        if req.method == "GET":
+            if (resp := await self._limited("member_get", gid)): return resp
+            return json_response(m)
+        if (resp := await self._limited("member", gid)): return resp
+        body = await self._json(req)
+        if "roles" in body:
+            m["roles"] = [str(r) for r in body["roles"]]
+        if "nick" in body:
+            m["nick"] = body["nick"]
+        self._resolve(("roles", uid), m["roles"])
+        return self._ok("member", gid, m)
+
+    async def _member_role(self, req):
+        gid, uid, rid = int(req.match_info["gid"]), int(req.match_info["uid"]), req.match_info["rid"]
+        if (resp := await self._limited("member", gid)): return resp
+        m = self.members[(gid, uid)]
+        if req.method == "PUT" and rid not in m["roles"]: m["roles"].append(rid)
+        if req.method == "DELETE" and rid in m["roles"]: m["roles"].remove(rid)
+        self._resolve(("roles", uid), m["roles"])
+        return self._ok("member", gid)
+
+    async def _dm_channel(self, req):
+        body = await req.json()
+        uid = int(body["recipient_id"])
+        cid = self.dm_channels.setdefault(uid, snowflake())
+        return json_response({"id": str(cid), "type": 1, "last_message_id": None,
+                                  "recipients": [self.users.get(uid, {"id": str(uid), "username": "user", "discriminator": "0"})]})
+
+    async def _unknown(self, req):
+        self.calls[f"unknown {req.method} /{req.match_info['tail']}"] += 1
+        return json_response({"message": "404: Not Found", "code": 0}, status=404)
+
+    @staticmethod
+    async def _json(req) -> dict:
+        if req.content_type == "application/json":
+            return await req.json()
+        if req.content_type.startswith("multipart/"):
+            # discord.py sends payload_json as the first part when files are attached
+            reader = await req.multipart()
+            part = await reader.next()
+            return json.loads(await part.text()) if part is not None else {}
+        return {}
+
+    async def _guild_create(self, gid: int) -> dict:
+        g = self.guilds[gid]
+        return {"id": str(gid), "name": f"guild-{gid}", "icon": None, "owner_id": self.bot_user["id"], "unavailable": False,
+                "roles": g["roles"], "channels": g["channels"], "threads": [], "emojis": [], "stickers": [],
+                "features": [], "member_count": sum(1 for k in self.members if k[0] == gid), "large": False,
+                "members": [m for (mg, uid), m in self.members.items() if mg == gid and str(uid) == self.bot_user["id"]],
+                "voice_states": [], "presences": [], "stage_instances": [], "guild_scheduled_events": [],
+                "premium_tier": 0, "verification_level": 0, "default_message_notifications": 0,
+                "explicit_content_filter": 0, "mfa_level": 0, "nsfw_level": 0, "system_channel_id": None,
+                "system_channel_flags": 0, "rules_channel_id": None, "afk_channel_id": None, "afk_timeout": 300,
+                "preferred_locale": "th", "premium_subscription_count": 0, "max_members": 500000,
+                "joined_at": _iso(), "application_id": None, "vanity_url_code": None, "description": None,
+                "banner": None, "splash": None, "discovery_splash": None, "public_updates_channel_id": None}
+
+class _Session:
+    # one gateway connection (one shard)
+    def __init__(self, server: FakeDiscord, ws: web.WebSocketResponse, url: str):
+        self.server, self.ws, self.url = server, ws, url
+        self.seq = 0
+        self.shard_id = 0
+
+    async def send(self, payload: dict) -> None:
+        await self.ws.send_str(json.dumps(payload))
+
+    async def dispatch(self, event: str, data: dict) -> None:
+        self.seq += 1
+        await self.send({"op": 0, "t": event, "s": self.seq, "d": data})
+
+    async def run(self) -> None:
+        await self.send({"op": 10, "d": {"heartbeat_interval": 41250}})
+        async for msg in self.ws:
+            if msg.type != WSMsgType.TEXT: continue
+            data = json.loads(msg.data)
+            op = data.get("op")
+            if op == 1:
+                await self.send({"op": 11})
+            elif op == 2:
+                await self._identify(data["d"])
+            elif op == 6:
+                await self.send({"op": 9, "d": False})  # no resume support: force a fresh IDENTIFY
+        if self.server.sessions.get(self.shard_id) is self:
+            del self.server.sessions[self.shard_id]
+
+    async def _identify(self, d: dict) -> None:
+        s = self.server
+        shard = d.get("shard") or [0, 1]
+        self.shard_id = shard[0]
+        s.sessions[self.shard_id] = self
+        gids = [g for g in s.guilds if s.guild_shard(g) == self.shard_id]
+        await self.dispatch("READY", {"v": 10, "user": s.bot_user, "session_id": f"sess-{self.shard_id}",
+                                      "resume_gateway_url": self.url, "shard": shard,
+                                      "guilds": [{"id": str(g), "unavailable": True} for g in gids],
+                                      "application": {"id": s.app_id, "flags": 0}, "private_channels": [],
+                                      "relationships": [], "user_settings": {}, "presences": []})
+        for g in gids:
+            await self.dispatch("GUILD_CREATE", await s._guild_create(g))
+        if len(s.sessions) >= s.shard_count:
+            s.ready.set()
+
+async def serve(server: FakeDiscord, host: str = "127.0.0.1", port: int = 0) -> tuple[web.AppRunner, int]:
+    runner = web.AppRunner(server.app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    return runner, site._server.sockets[0].getsockname()[1]
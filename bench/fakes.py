@@ -0,0 +1,297 @@
+# In-memory repos and duck-typed Discord objects for offline benchmarks and replays.
+# They implement just the surface the handlers touch; no token, gateway or network needed.
+import asyncio, itertools, time
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Optional
+from config import (ROLE_ID_TO_GIVE, GENDER_ROLE_IDS_ALL, AGE_ROLE_IDS_ALL, APPROVAL_CHANNEL_ID,
+                    ADMIN_NOTIFY_CHANNEL_ID)
+from domain.models import VerificationPayload, OutboxEffect
+
+_ids = itertools.count(10**17)
+
+def next_id() -> int:
+    return next(_ids)
+
+# ---- repos ----
+class MemoryVerifyRepo:
+    def __init__(self):
+        self.rows: dict[tuple[int, int], dict] = {}     # (guild_id, message_id) -> row
+        self.latest: dict[tuple[int, int], dict] = {}   # (guild_id, user_id) -> newest row
+        self.outbox: Optional["MemoryOutboxRepo"] = None
+
+    async def record_submission(self, guild_id, user_id, channel_id, message_id, nickname, age_text, gender_text,
+                                birthday_text, account_age_days, account_risk, birthday=None) -> int:
+        row = dict(id=next_id(), guild_id=guild_id, user_id=user_id, channel_id=channel_id, message_id=message_id,
+                   payload=VerificationPayload(guild_id, user_id, nickname, age_text, gender_text, birthday_text,
+                                               account_age_days, account_risk),
+                   status="SUBMITTED", decided_by=None, sent_at=datetime.now(timezone.utc))
+        if message_id is not None:
+            self.rows[(guild_id, message_id)] = row
+        self.latest[(guild_id, user_id)] = row
+        return row["id"]
+
+    async def attach_message(self, request_id, channel_id, message_id) -> None:
+        row = next((r for r in self.latest.values() if r["id"] == request_id and r["message_id"] is None), None)
+        if row is not None:
+            row.update(channel_id=channel_id, message_id=message_id)
+            self.rows[(row["guild_id"], message_id)] = row
+
+    async def list_unposted(self, max_age_seconds) -> list[tuple[int, VerificationPayload, datetime]]:
+        return [(r["id"], r["payload"], r["sent_at"]) for r in self.latest.values()
+                if r["message_id"] is None and r["status"] == "SUBMITTED"]
+
+    async def cancel_unposted(self, request_id) -> Optional[int]:
+        row = next((r for r in self.latest.values() if r["id"] == request_id), None)
+        if row is None or row["message_id"] is not None or row["status"] != "SUBMITTED":
+            return None
+        row["status"] = "CANCELLED"
+        return row["user_id"]
+
+    async def insert_request(self, *args) -> int:
+        return await self.record_submission(*args)
+
+    async def set_request_status(self, guild_id, message_id, status, decided_by, effects=()) -> bool:
+        row = self.rows.get((guild_id, message_id))
+        if row is None or row["status"] != "SUBMITTED":
+            return False
+        row.update(status=status, decided_by=decided_by)
+        if self.outbox is not None:
+            self.outbox.insert(effects)
+        return True
+
+    async def get_latest_request(self, guild_id, user_id) -> Optional[VerificationPayload]:
+        row = self.latest.get((guild_id, user_id))
+        return row["payload"] if row else None
+
+    async def get_by_message(self, guild_id, message_id) -> Optional[VerificationPayload]:
+        row = self.rows.get((guild_id, message_id))
+        return row["payload"] if row else None
+
+    async def list_pending(self, max_age_seconds) -> list[tuple[int, int, float]]:
+        now = datetime.now(timezone.utc)
+        out = []
+        for r in self.rows.values():
+            age = (now - r["sent_at"]).total_seconds()
+            if r["status"] == "SUBMITTED" and age < max_age_seconds:
+                out.append((r["guild_id"], r["user_id"], age))
+        return out
+
+    async def has_pending(self, guild_id, user_id, max_age_seconds) -> bool:
+        row = self.latest.get((guild_id, user_id))
+        return (row is not None and row["status"] == "SUBMITTED"
+                and (datetime.now(timezone.utc) - row["sent_at"]).total_seconds() < max_age_seconds)
+
+    async def cancel_request(self, guild_id, message_id) -> Optional[int]:
+        row = self.rows.get((guild_id, message_id))
+        if row is None or row["status"] != "SUBMITTED":
+            return None
+        row["status"] = "CANCELLED"
+        return row["user_id"]
+
+class MemoryMemberRepo:
+    def __init__(self):
+        self.rows: dict[tuple[int, int], dict] = {}
+
+    async def upsert_member(self, guild_id, user_id, *, nickname, age_text, gender_text, birthday_text, birthday=None) -> None:
+        self.rows[(guild_id, user_id)] = dict(nickname=nickname, age_text=age_text, gender_text=gender_text,
+                                              birthday_text=birthday_text, birthday=birthday)
+
+    async def list_unparsed_birthdays(self) -> list[tuple[int, int, str]]:
+        return [(g, u, r["birthday_text"]) for (g, u), r in self.rows.items() if r["birthday_text"] and r["birthday"] is None]
+
+    async def set_birthdays_many(self, rows: list[tuple[int, int, date]]) -> None:
+        for g, u, d in rows:
+            if (g, u) in self.rows: self.rows[(g, u)]["birthday"] = d
+
+class MemoryApprovalIndexRepo:
+    def __init__(self):
+        self.rows: dict[tuple[int, int], tuple[int, int]] = {}
+
+    async def set_latest(self, guild_id, user_id, channel_id, message_id) -> None:
+        self.rows[(guild_id, user_id)] = (channel_id, message_id)
+
+    async def get_latest(self, guild_id, user_id) -> Optional[tuple[int, int]]:
+        return self.rows.get((guild_id, user_id))
+
+class MemoryOutboxRepo:
+    def __init__(self):
+        self.rows: dict[str, dict] = {}  # dedup_key -> row
+
+    def insert(self, effects) -> None:
+        for fx in effects:
+            self.rows.setdefault(fx.dedup_key, dict(fx=fx, attempts=0, next_at=0.0, done=False, dead=False, error=None))
+
+    async def claim_due(self, guild_ids, limit, lease_seconds) -> list[OutboxEffect]:
+        now, out = time.monotonic(), []
+        for r in self.rows.values():
+            if len(out) >= limit: break
+            if not r["done"] and r["next_at"] <= now and r["fx"].guild_id in guild_ids:
+                r.update(attempts=r["attempts"] + 1, next_at=now + lease_seconds)
+                fx = r["fx"]
+                out.append(OutboxEffect(fx.kind, fx.dedup_key, fx.payload, fx.guild_id, r["attempts"]))
+        return out
+
+    async def complete_many(self, keys) -> None:
+        for k in keys:
+            if k in self.rows: self.rows[k].update(done=True, error=None)
+
+    async def retry_many(self, rows) -> None:
+        for k, delay, err in rows:
+            if k in self.rows: self.rows[k].update(next_at=time.monotonic() + delay, error=err)
+
+    async def dead_many(self, rows) -> None:
+        for k, err in rows:
+            if k in self.rows: self.rows[k].update(done=True, dead=True, error=err)
+
+    async def purge_done(self, older_than_seconds) -> int:
+        return 0
+
+def install_memory_backends() -> SimpleNamespace:
+    # rebinds the shared VerificationService and Outbox singletons (used by ui.views and cogs.verification)
+    from ui.views import verify_service
+    from services.outbox import outbox
+    repos = SimpleNamespace(verify=MemoryVerifyRepo(), members=MemoryMemberRepo(), approvals=MemoryApprovalIndexRepo(),
+                            outbox=MemoryOutboxRepo())
+    repos.verify.outbox = repos.outbox
+    outbox.repo = repos.outbox
+    verify_service.verify_repo = repos.verify
+    verify_service.member_repo = repos.members
+    verify_service.approval_repo = repos.approvals
+    verify_service.payloads.verify_repo = repos.verify
+    verify_service.pending.verify_repo = repos.verify
+    verify_service.payloads._cache.clear()
+    verify_service.pending._cache.clear()
+    return repos
+
+def unthrottle_rest() -> None:
+    # offline runs measure our code path, not Discord's buckets
+    from services.rest_scheduler import rest
+    for kind in ("member", "channel", "dm"):
+        rest.limits[kind] = (10**9, 1.0)
+    rest._buckets.clear()
+
+# ---- Discord stand-ins ----
+class FakeRole:
+    def __init__(self, role_id: int, default: bool = False):
+        self.id = role_id
+        self._default = default
+    def is_default(self) -> bool:
+        return self._default
+
+class FakeAsset:
+    url = "https://cdn.invalid/avatar.png"
+    def with_static_format(self, _fmt): return self
+    def with_size(self, _size): return self
+
+class FakeMessage:
+    def __init__(self, channel: "FakeChannel", content=None, embed=None, view=None):
+        self.id = next_id()
+        self.channel = channel
+        self.guild = channel.guild
+        self.content = content
+        self.embeds = [embed] if embed is not None else []
+        self.view = view
+        self.edits = 0
+
+    async def edit(self, *, embed=None, view=None, **_):
+        if embed is not None: self.embeds = [embed]
+        if view is not None: self.view = view
+        self.edits += 1
+        return self
+
+class FakeChannel:
+    def __init__(self, guild: "FakeGuild", channel_id: int):
+        self.id = channel_id
+        self.guild = guild
+        self.sent: list[FakeMessage] = []
+
+    async def send(self, content=None, *, embed=None, view=None, **_):
+        msg = FakeMessage(self, content, embed, view)
+        self.sent.append(msg)
+        self.guild._messages[msg.id] = msg
+        return msg
+
+    async def fetch_message(self, message_id: int) -> FakeMessage:
+        return self.guild._messages[message_id]
+
+class FakeMember:
+    def __init__(self, guild: "FakeGuild", user_id: int, name: str, *, moderator: bool = False,
+                 account_age_days: int = 400, roles: Optional[list[FakeRole]] = None):
+        self.id = user_id
+        self.guild = guild
+        self.name = self.display_name = self.global_name = name
+        self.nick = None
+        self.bot = False
+        self.mention = f"<@{user_id}>"
+        self.display_avatar = FakeAsset()
+        self.created_at = datetime.now(timezone.utc) - timedelta(days=account_age_days)
+        self.guild_permissions = SimpleNamespace(administrator=moderator, manage_roles=moderator)
+        self.roles = [guild.default_role] + list(roles or [])
+        self.dms: list[str] = []
+
+    async def edit(self, *, roles=None, reason=None, **_):
+        if roles is not None:
+            self.roles = [self.guild.default_role] + [self.guild.get_role(r.id) or FakeRole(r.id) for r in roles]
+        return self
+
+    async def send(self, content=None, **_):
+        self.dms.append(content)
+
+class FakeGuild:
+    def __init__(self, guild_id: Optional[int] = None):
+        self.id = guild_id or next_id()
+        self.shard_id = 0
+        self.default_role = FakeRole(self.id, default=True)
+        self._roles = {rid: FakeRole(rid) for rid in (ROLE_ID_TO_GIVE, *GENDER_ROLE_IDS_ALL, *AGE_ROLE_IDS_ALL)}
+        self._channels = {cid: FakeChannel(self, cid) for cid in {APPROVAL_CHANNEL_ID, ADMIN_NOTIFY_CHANNEL_ID}}
+        self._members: dict[int, FakeMember] = {}
+        self._messages: dict[int, FakeMessage] = {}
+
+    def add_member(self, name: str, **kw) -> FakeMember:
+        m = FakeMember(self, next_id(), name, **kw)
+        self._members[m.id] = m
+        return m
+
+    def get_role(self, role_id): return self._roles.get(role_id)
+    def get_channel(self, channel_id): return self._channels.get(channel_id)
+    def get_member(self, user_id): return self._members.get(user_id)
+
+    async def fetch_member(self, user_id):
+        await asyncio.sleep(0)
+        return self._members[user_id]
+
+class FakeResponse:
+    def __init__(self):
+        self._done = False
+        self.modal = None
+    def is_done(self) -> bool:
+        return self._done
+    async def defer(self, **_):
+        self._done = True
+    async def send_message(self, content=None, **_):
+        self._done = True
+    async def send_modal(self, modal):
+        self._done = True
+        self.modal = modal
+
+class FakeFollowup:
+    def __init__(self):
+        self.sent: list[str] = []
+    async def send(self, content=None, **_):
+        self.sent.append(content)
+
+class FakeInteraction:
+    def __init__(self, user: FakeMember, *, message: Optional[FakeMessage] = None, channel: Optional[FakeChannel] = None):
+        self.user = user
+        self.guild = user.guild
+        self.message = message
+        self.channel = channel or (message.channel if message else None)
+        self.response = FakeResponse()
+        self.followup = FakeFollowup()
+
+def fill_modal(form, *, name: str = "", age: str = "", gender: str = "", birthday: str = ""):
+    # TextInput.value is read-only; discord.py keeps the submitted text in _value
+    for field, text in ((form.name, name), (form.age, age), (form.gender, gender), (form.birthday, birthday)):
+        field._value = text
+    return form
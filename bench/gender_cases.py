@@ -0,0 +1,29 @@
+# resolve_gender on the inputs that have gone wrong before; exits 1 on any mismatch.
+# Usage: python -m bench.gender_cases
+import sys
+from utils.gender import resolve_gender, MALE, FEMALE, LGBT, UNDISCLOSED
+
+CASES = [
+    # exact aliases
+    ("ชาย", MALE), ("ช", MALE), ("m", MALE), ("Male", MALE), ("ผู้ชาย", MALE),
+    ("หญิง", FEMALE), ("ห", FEMALE), ("f", FEMALE), ("Female", FEMALE), ("ผู้หญิง", FEMALE),
+    ("lgbt", LGBT), ("ทอม", LGBT), ("เกย์", LGBT), ("ไม่ระบุ", UNDISCLOSED),
+    # identities that start with a male/female stem
+    ("mtf", LGBT), ("MtF", LGBT), ("ftm", LGBT), ("m2f", UNDISCLOSED), ("mtf!!", LGBT), ("ftm ค่ะ", LGBT),
+    ("trans woman", LGBT), ("transman", LGBT), ("หญิงข้ามเพศ", LGBT), ("ชายข้ามเพศครับ", LGBT),
+    ("สาวสองค่ะ", LGBT), ("กะเทย", LGBT), ("ตุ๊ด", LGBT), ("lesbian", LGBT), ("bi", LGBT),
+    # words sharing a one-letter stem are not genders
+    ("หล่อ", UNDISCLOSED), ("หมา", UNDISCLOSED), ("ชาบู", UNDISCLOSED), ("mango", UNDISCLOSED), ("fox", UNDISCLOSED),
+    # prefixes and typos that should still resolve
+    ("ชายจ้า", MALE), ("male!!", MALE), ("หญิงค่ะ", FEMALE), ("female!!", FEMALE), ("femal", FEMALE), ("หนุ่มๆ", MALE),
+]
+
+def main() -> int:
+    bad = [(text, want, got) for text, want in CASES if (got := resolve_gender(text)) != want]
+    for text, want, got in bad:
+        print(f"✗ {text!r}: expected {want}, got {got}")
+    print(f"{len(CASES) - len(bad)}/{len(CASES)} ok")
+    return 1 if bad else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
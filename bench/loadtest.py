@@ -0,0 +1,179 @@
+# End-to-end load test: runs the real bot.py against bench/fake_discord.py, replays concurrent
+# verify-click / approve / reject flows and reports throughput, tail latency, 429s and bot RSS.
+# Approve/reject flows need DATABASE_URL (requests are seeded through PgVerifyRepo and removed afterwards).
+# Usage: DATABASE_URL=... python -m bench.loadtest [--flows 2000] [--concurrency 200]
+#        [--mix verify=1,approve=1,reject=0] [--guilds 4] [--rest-latency-ms 30] [--save|--compare]
+import argparse, asyncio, os, random, sys, time
+from bench.fake_discord import FakeDiscord, serve
+from bench.report import summarize, print_table, save_baseline, compare_baseline
+from config import APPROVAL_CHANNEL_ID, VERIFY_CHANNEL_ID, DATABASE_URL
+
+BASELINE = "loadtest"
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_APPROVAL_COMPONENTS = [{"type": 1, "components": [
+    {"type": 2, "style": 3, "label": "✅ Approve / อนุมัติ", "custom_id": "approve_button"},
+    {"type": 2, "style": 4, "label": "❌ Reject / ปฏิเสธ", "custom_id": "reject_button"}]}]
+
+def _rss_kb(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+class RssSampler:
+    def __init__(self, pid: int, interval: float = 0.5):
+        self.pid, self.interval = pid, interval
+        self.start = self.peak = self.end = 0
+        self._task: asyncio.Task | None = None
+
+    async def _run(self) -> None:
+        while True:
+            self.end = _rss_kb(self.pid)
+            self.peak = max(self.peak, self.end)
+            await asyncio.sleep(self.interval)
+
+    def begin(self) -> None:
+        self.start = self.peak = self.end = _rss_kb(self.pid)
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task: self._task.cancel()
+        self.end = _rss_kb(self.pid) or self.end
+
+async def _seed(server: FakeDiscord, repo, gid: int, i: int) -> tuple[int, dict]:
+    uid = server.add_user(gid, f"req{i}")
+    msg = server.post_message(APPROVAL_CHANNEL_ID, gid, content=f"<@{uid}>", components=_APPROVAL_COMPONENTS,
+                              embeds=[{"type": "rich", "title": "📋 Verification Request / คำขอยืนยันตัวตน",
+                                       "footer": {"text": f"User ID: {uid}"}}])
+    await repo.record_submission(gid, uid, APPROVAL_CHANNEL_ID, int(msg["id"]), "ต้น", "21", "ชาย", "05/11/2004", 400, "LOW")
+    return uid, msg
+
+async def main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(prog="python -m bench.loadtest")
+    ap.add_argument("--flows", type=int, default=2000)
+    ap.add_argument("--concurrency", type=int, default=200)
+    ap.add_argument("--mix", default="verify=1,approve=1,reject=0")
+    ap.add_argument("--guilds", type=int, default=4)
+    ap.add_argument("--shards", type=int, default=1)
+    ap.add_argument("--rest-latency-ms", type=float, default=30.0)
+    ap.add_argument("--jitter-ms", type=float, default=10.0)
+    ap.add_argument("--no-rate-limits", action="store_true")
+    ap.add_argument("--timeout", type=float, default=60.0, help="per-flow timeout (s)")
+    ap.add_argument("--bot-log", default=os.devnull)
+    ap.add_argument("--save", action="store_true")
+    ap.add_argument("--compare", action="store_true")
+    ap.add_argument("--tolerance", type=float, default=0.25)
+    args = ap.parse_args(argv)
+
+    mix = {k: float(v) for k, v in (p.split("=") for p in args.mix.split(",") if p)}
+    if not DATABASE_URL and (mix.get("approve") or mix.get("reject")):
+        print("⚠️ DATABASE_URL not set: running verify-click flows only")
+        mix = {"verify": 1.0}
+    kinds = random.Random(7).choices(list(mix), weights=list(mix.values()), k=args.flows)
+
+    server = FakeDiscord(guilds=args.guilds, shard_count=args.shards, rest_latency=args.rest_latency_ms / 1000,
+                         jitter=args.jitter_ms / 1000, rate_limits=not args.no_rate_limits)
+    runner, port = await serve(server)
+    env = {**os.environ, "DISCORD_API_BASE": f"http://127.0.0.1:{port}/api/v10", "DISCORD_BOT_TOKEN": "fake.token.load",
+           "SHARD_COUNT": str(args.shards if args.shards > 1 else 0), "CLUSTER_PROCESSES": "1", "CLUSTER_ID": "0"}
+    log = open(args.bot_log, "ab")
+    t_spawn = time.perf_counter()
+    proc = await asyncio.create_subprocess_exec(sys.executable, os.path.join(ROOT, "bot.py"), cwd=ROOT, env=env,
+                                                stdout=log, stderr=log)
+    repo = pool = None
+    gids = list(server.guilds)
+    try:
+        ready, exited = asyncio.create_task(server.ready.wait()), asyncio.create_task(proc.wait())
+        await asyncio.wait((ready, exited), timeout=120, return_when=asyncio.FIRST_COMPLETED)
+        ready.cancel(); exited.cancel()
+        if not server.ready.is_set():
+            print(f"❌ bot never reached the fake gateway (exit code {proc.returncode}); see --bot-log")
+            return 1
+        print(f"bot connected in {time.perf_counter() - t_spawn:.2f}s (pid {proc.pid})")
+        await asyncio.sleep(2.5)  # GUILD_CREATE processing → on_ready (discord.py waits guild_ready_timeout=2s)
+
+        mods = {g: server.add_user(g, "mod", roles=[server.guilds[g]["mod_role"]]) for g in gids}
+        seeded: dict[int, tuple[int, int, dict]] = {}
+        if any(k != "verify" for k in kinds):
+            from db.pool import get_pool
+            from db.repo import PgVerifyRepo
+            pool, repo = await get_pool(), PgVerifyRepo()
+            for i, k in enumerate(kinds):
+                if k != "verify":
+                    g = gids[i % len(gids)]
+                    seeded[i] = (g, *await _seed(server, repo, g, i))
+            print(f"seeded {len(seeded)} pending requests")
+
+        latencies: dict[str, list[float]] = {k: [] for k in mix}
+        timeouts = {k: 0 for k in mix}
+        sem = asyncio.Semaphore(args.concurrency)
+
+        async def flow(i: int, kind: str) -> None:
+            async with sem:
+                t0 = time.perf_counter()
+                try:
+                    if kind == "verify":
+                        g = gids[i % len(gids)]
+                        uid = server.add_user(g, f"user{i}")
+                        _, answered = await server.dispatch_interaction(g, uid, custom_id="verify_button",
+                                                                        channel_id=VERIFY_CHANNEL_ID)
+                        done = await asyncio.wait_for(answered, args.timeout)
+                    else:
+                        g, _uid, msg = seeded[i]
+                        edited = server.expect(("edit", int(msg["id"])))
+                        await server.dispatch_interaction(g, mods[g], custom_id=f"{kind}_button", channel_id=APPROVAL_CHANNEL_ID,
+                                                          message=msg)
+                        done = await asyncio.wait_for(edited, args.timeout)  # message edit is the last step of both flows
+                    latencies[kind].append(done - t0)
+                except asyncio.TimeoutError:
+                    timeouts[kind] += 1
+
+        rss = RssSampler(proc.pid)
+        rss.begin()
+        t_start = time.perf_counter()
+        await asyncio.gather(*(flow(i, k) for i, k in enumerate(kinds)))
+        wall = time.perf_counter() - t_start
+        rss.stop()
+
+        results = {k: summarize(v, wall) for k, v in latencies.items() if v}
+        completed = sum(len(v) for v in latencies.values())
+        print_table(results)
+        print(f"\nflows: {completed}/{args.flows} completed in {wall:.2f}s → {completed / wall * 60:,.0f}/min"
+              f"  timeouts={sum(timeouts.values())} {timeouts}")
+        print(f"429s: {dict(server.rate_limited)}  REST calls: {dict(server.calls)}")
+        print(f"bot RSS: start {rss.start / 1024:.1f}MB  peak {rss.peak / 1024:.1f}MB  end {rss.end / 1024:.1f}MB"
+              f"  growth {(rss.end - rss.start) / 1024:+.1f}MB")
+
+        results["_totals"] = {"n": completed, "ops_per_s": round(completed / wall, 1), "mean_us": 0.0,
+                              "p50_us": 0.0, "p95_us": max((r["p95_us"] for r in results.values()), default=0.0),
+                              "p99_us": max((r["p99_us"] for r in results.values()), default=0.0),
+                              "rate_limited": sum(server.rate_limited.values()), "rss_growth_kb": rss.end - rss.start}
+        if args.save:
+            print(f"baseline saved to {save_baseline(BASELINE, results)}")
+        if args.compare:
+            problems = compare_baseline(BASELINE, results, args.tolerance)
+            for p in problems: print(f"❌ {p}")
+            if problems: return 1
+        return 0
+    finally:
+        if proc.returncode is None:
+            proc.terminate()
+            try:
+                await asyncio.wait_for(proc.wait(), 15)
+            except asyncio.TimeoutError:
+                proc.kill()
+        log.close()
+        await runner.cleanup()
+        if pool is not None:
+            async with pool.acquire() as con:
+                for table in ("verification_requests", "approval_index", "members", "outbox"):
+                    await con.execute(f"DELETE FROM {table} WHERE guild_id = ANY($1::bigint[])", gids)
+            await pool.close()
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(sys.argv[1:])))
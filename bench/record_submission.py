@@ -0,0 +1,44 @@
+# Latency of the single-statement record_submission vs. the old three-call path.
+# Usage: DATABASE_URL=postgresql://... python -m bench.record_submission [iterations]
+import asyncio, statistics, sys, time
+from db.pool import get_pool
+from db.repo import PgVerifyRepo, PgMemberRepo, PgApprovalIndexRepo
+
+BENCH_GUILD_ID = 0  # rows are written under this guild and removed afterwards
+
+def _report(label: str, samples: list[float]) -> None:
+    ms = sorted(s * 1000 for s in samples)
+    p95 = ms[int(len(ms) * 0.95) - 1]
+    print(f"{label:<12} n={len(ms)}  mean={statistics.fmean(ms):.3f}ms  p50={statistics.median(ms):.3f}ms  p95={p95:.3f}ms")
+
+async def _three_calls(verify, approval, members, i: int) -> None:
+    args = (BENCH_GUILD_ID, i, 1, 10_000_000 + i, "bench", "21", "ชาย", "01/01/2000", 100, "LOW")
+    await verify.insert_request(*args)
+    await approval.set_latest(BENCH_GUILD_ID, i, 1, 10_000_000 + i)
+    await members.upsert_member(BENCH_GUILD_ID, i, nickname="bench", age_text="21", gender_text="ชาย", birthday_text="01/01/2000")
+
+async def _single_call(verify, i: int) -> None:
+    await verify.record_submission(BENCH_GUILD_ID, i, 1, 20_000_000 + i, "bench", "21", "ชาย", "01/01/2000", 100, "LOW")
+
+async def main(iterations: int) -> None:
+    verify, approval, members = PgVerifyRepo(), PgApprovalIndexRepo(), PgMemberRepo()
+    pool = await get_pool()
+    try:
+        for label, fn in (("three-calls", lambda i: _three_calls(verify, approval, members, i)),
+                          ("single-cte", lambda i: _single_call(verify, i))):
+            for i in range(20):  # warm connections / plans
+                await fn(i)
+            samples = []
+            for i in range(iterations):
+                t0 = time.perf_counter()
+                await fn(i % 1000)
+                samples.append(time.perf_counter() - t0)
+            _report(label, samples)
+    finally:
+        async with pool.acquire() as con:
+            for table in ("verification_requests", "approval_index", "members"):
+                await con.execute(f"DELETE FROM {table} WHERE guild_id=$1", BENCH_GUILD_ID)
+        await pool.close()
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
@@ -0,0 +1,149 @@
+# Replays a TRACE_PATH recording (services/trace_recorder.py) through the real handlers in
+# cogs/verification.py and ui/views.py, against in-memory repos and fake Discord objects.
+# Events keep their recorded spacing (divided by --speed), so bursts overlap as they did live.
+# Usage: python -m bench.replay trace.jsonl [--speed 10] [--view persistent|legacy] [--save|--compare]
+import argparse, asyncio, json, sys, time
+from bench.fakes import FakeGuild, FakeInteraction, install_memory_backends, unthrottle_rest, fill_modal
+from bench.report import summarize, print_table, save_baseline, compare_baseline
+from config import APPROVAL_CHANNEL_ID
+
+BASELINE = "replay"
+
+class Replayer:
+    def __init__(self, view: str):
+        self.view = view
+        self.guilds: dict[str, FakeGuild] = {}
+        self.members: dict[tuple[str, str], object] = {}
+        self.latest_request: dict[tuple[str, str], object] = {}  # (guild hash, user hash) -> approval message
+        self.samples: dict[str, list[float]] = {}
+        self.lag: list[float] = []
+        self.errors = 0
+
+    def _guild(self, g: str) -> FakeGuild:
+        if g not in self.guilds: self.guilds[g] = FakeGuild()
+        return self.guilds[g]
+
+    def _member(self, g: str, u: str, *, moderator: bool = False, acct=None, name=None):
+        key = (g, u)
+        m = self.members.get(key)
+        if m is None:
+            m = self.members[key] = self._guild(g).add_member(name or f"u-{u[:6]}", moderator=moderator,
+                                                              account_age_days=acct if acct is not None else 400)
+        if name:  # the recorded nickname matched the user's Discord name
+            m.name = m.display_name = m.global_name = name
+        return m
+
+    async def _approval_message(self, g: str, target: str):
+        msg = self.latest_request.get((g, target))
+        if msg is None and (g, target) in self.members:
+            # posted by the background approval_post job after the replayed modal submit
+            mention = self.members[(g, target)].mention
+            ch = self._guild(g).get_channel(APPROVAL_CHANNEL_ID)
+            msg = next((m for m in reversed(ch.sent) if m.content == mention), None)
+        if msg is None:
+            # recording started after this submission: seed one outside the timed path
+            from ui.views import verify_service
+            guild, user = self._guild(g), self._member(g, target)
+            msg = await guild.get_channel(APPROVAL_CHANNEL_ID).send(content=user.mention)
+            await verify_service.record_submission(guild=guild, user=user, channel_id=msg.channel.id, message_id=msg.id,
+                                                   nickname="", age_text="", gender_text="", birthday_text="",
+                                                   account_age_days=400, account_risk="LOW")
+            self.latest_request[(g, target)] = msg
+        return msg
+
+    async def handle(self, ev: dict) -> None:
+        from cogs.verification import VerificationForm, VerificationView
+        from ui.views import ApproveRejectPersistent
+        g, u = ev["g"], ev["u"]
+        if ev["k"] == "click" and ev["id"] == "verify_button":
+            kind, member = "verify_button", self._member(g, u, acct=ev.get("acct"))
+            fn = lambda: VerificationView().confirm_button.callback(FakeInteraction(member))
+        elif ev["k"] == "modal":
+            f = ev["f"]
+            member = self._member(g, u, acct=ev.get("acct"), name=f["name"] if ev.get("same_name") else None)
+            form = fill_modal(VerificationForm(), name=f["name"], age=f["age"], gender=f["gender"], birthday=f["birthday"])
+            kind = "modal_submit"
+            fn = lambda: form.on_submit(FakeInteraction(member))
+        elif ev["k"] == "click" and ev.get("target"):
+            kind = ev["id"].replace("_button", "")
+            mod = self._member(g, u, moderator=ev.get("mod", True))
+            msg = await self._approval_message(g, ev["target"])
+            view = msg.view if self.view == "legacy" and msg.view is not None else ApproveRejectPersistent()
+            action = getattr(view, kind)
+            fn = lambda: action.callback(FakeInteraction(mod, message=msg))
+        else:
+            return
+        t0 = time.perf_counter()
+        try:
+            await fn()
+        except Exception:
+            self.errors += 1
+        self.samples.setdefault(kind, []).append(time.perf_counter() - t0)
+        if ev["k"] == "modal":
+            self.latest_request.pop((g, u), None)  # a new submission supersedes the previous approval message
+
+async def main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(prog="python -m bench.replay")
+    ap.add_argument("trace")
+    ap.add_argument("--speed", type=float, default=1.0, help="time compression; 0 = as fast as possible")
+    ap.add_argument("--view", choices=("persistent", "legacy"), default="persistent",
+                    help="approve/reject through ui.views.ApproveRejectPersistent or the cog's per-message view")
+    ap.add_argument("--save", action="store_true")
+    ap.add_argument("--compare", action="store_true")
+    ap.add_argument("--tolerance", type=float, default=0.25)
+    args = ap.parse_args(argv)
+
+    with open(args.trace, encoding="utf-8") as f:
+        events = sorted((json.loads(line) for line in f if line.strip()), key=lambda e: e["t"])
+    if not events:
+        print("empty trace"); return 1
+
+    from services.rest_scheduler import rest
+    from services.job_queue import jobs
+    from services.admin_notifier import admin_notifier
+    install_memory_backends()
+    unthrottle_rest()
+    r = Replayer(args.view)
+    t_first = events[0]["t"]
+    start = time.perf_counter()
+
+    async def scheduled(ev: dict) -> None:
+        if args.speed > 0:
+            due = (ev["t"] - t_first) / args.speed
+            delay = due - (time.perf_counter() - start)
+            if delay > 0: await asyncio.sleep(delay)
+            r.lag.append(max(0.0, (time.perf_counter() - start) - due))
+        await r.handle(ev)
+
+    # events for the same user run in order (a modal can't overtake its own verify click)
+    chains: dict[tuple[str, str], list[dict]] = {}
+    for ev in events:
+        chains.setdefault((ev["g"], ev["u"]), []).append(ev)
+
+    async def chain(evs: list[dict]) -> None:
+        for ev in evs: await scheduled(ev)
+
+    await asyncio.gather(*(chain(evs) for evs in chains.values()))
+    wall = time.perf_counter() - start
+    await jobs.close()
+    await admin_notifier.close()
+    await rest.close()
+
+    results = {k: summarize(v, wall) for k, v in r.samples.items()}
+    print_table(results)
+    span = events[-1]["t"] - t_first
+    print(f"\n{len(events)} events spanning {span:.1f}s replayed in {wall:.2f}s at {args.speed}x  errors={r.errors}")
+    if r.lag:
+        lag = summarize(r.lag)
+        print(f"schedule lag p50={lag['p50_us'] / 1000:.1f}ms p99={lag['p99_us'] / 1000:.1f}ms "
+              f"(how late events started; grows when the handlers can't keep up)")
+    if args.save:
+        print(f"baseline saved to {save_baseline(BASELINE, results)}")
+    if args.compare:
+        problems = compare_baseline(BASELINE, results, args.tolerance)
+        for p in problems: print(f"❌ {p}")
+        if problems: return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(sys.argv[1:])))
@@ -0,0 +1,51 @@
+# Shared summary / baseline helpers for the bench scripts.
+import json, os, platform, statistics
+from typing import Optional
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values: return 0.0
+    k = (len(sorted_values) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+def summarize(samples: list[float], wall: Optional[float] = None) -> dict:
+    # samples in seconds; wall = elapsed wall time when calls overlapped (concurrent runs)
+    us = sorted(s * 1e6 for s in samples)
+    busy = wall if wall is not None else sum(samples)
+    return {"n": len(us), "ops_per_s": round(len(us) / busy, 1) if busy else 0.0,
+            "mean_us": round(statistics.fmean(us), 2) if us else 0.0,
+            "p50_us": round(percentile(us, 0.50), 2), "p95_us": round(percentile(us, 0.95), 2),
+            "p99_us": round(percentile(us, 0.99), 2)}
+
+def print_table(results: dict[str, dict]) -> None:
+    print(f"{'case':<24} {'n':>7} {'ops/s':>12} {'p50':>10} {'p95':>10} {'p99':>10}  (µs)")
+    for name, r in results.items():
+        print(f"{name:<24} {r['n']:>7} {r['ops_per_s']:>12,.1f} {r['p50_us']:>10.1f} {r['p95_us']:>10.1f} {r['p99_us']:>10.1f}")
+
+def save_baseline(name: str, results: dict[str, dict]) -> str:
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    path = os.path.join(BASELINE_DIR, f"{name}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"python": platform.python_version(), "machine": platform.machine(), "results": results},
+                  f, indent=2, sort_keys=True)
+    return path
+
+def compare_baseline(name: str, results: dict[str, dict], tolerance: float) -> list[str]:
+    # regressions: p95 slower or throughput lower than baseline by more than `tolerance`
+    path = os.path.join(BASELINE_DIR, f"{name}.json")
+    if not os.path.exists(path):
+        return [f"no baseline at {path}; run with --save first"]
+    with open(path, encoding="utf-8") as f:
+        base = json.load(f)["results"]
+    problems = []
+    for case, r in results.items():
+        b = base.get(case)
+        if not b: continue
+        if r["p95_us"] > b["p95_us"] * (1 + tolerance):
+            problems.append(f"{case}: p95 {b['p95_us']:.1f}µs → {r['p95_us']:.1f}µs")
+        if r["ops_per_s"] < b["ops_per_s"] / (1 + tolerance):
+            problems.append(f"{case}: ops/s {b['ops_per_s']:,.1f} → {r['ops_per_s']:,.1f}")
+    return problems
@@ -0,0 +1,134 @@
+# Offline benchmarks for the verification hot path: handlers run against fake Discord
+# objects and in-memory repos (bench/fakes.py), so no token, database or network is needed.
+# Usage: python -m bench.suite [-n N] [--only a,b] [--save] [--compare] [--tolerance 0.25]
+import argparse, asyncio, gc, inspect, random, sys, time
+from bench.fakes import (FakeGuild, FakeInteraction, install_memory_backends, unthrottle_rest, fill_modal)
+from bench.report import summarize, print_table, save_baseline, compare_baseline
+
+BASELINE = "suite"
+
+_NAMES = ["ต้นกล้า", "มะปราง", "ℕ𝕠𝕠𝕟", "N00n", "ｐｏｏｍ", "ส้ม🍊", "Bo\u200bss", "เฟิร์น", "Mïnt", "ไอซ์"]
+_GENDERS = ["ชาย", "หญิง", "ช", "ญ", "male", "Female", "lgbt", "ทอม", "ไม่ระบุ", "เกย์", "ผู้ชาย", "femal"]
+_AGES = ["", "13", "17", "21", "29", "45", "70", "ไม่ระบุ", "-"]
+
+def _name(rng: random.Random, i: int) -> str:
+    return f"{rng.choice(_NAMES)}{i % 97}"
+
+# Each case is prepare(i) -> zero-arg callable (sync or async); only the callable is timed.
+def case_canon_name(ctx):
+    from core.utils import canon_name
+    rng = random.Random(1)
+    return lambda i: (lambda s=_name(rng, i): canon_name(s))
+
+def case_resolve_gender(ctx):
+    from core.utils import resolve_gender_role_id
+    return lambda i: (lambda s=_GENDERS[i % len(_GENDERS)]: resolve_gender_role_id(s))
+
+def case_resolve_age(ctx):
+    from core.utils import resolve_age_role_id
+    return lambda i: (lambda s=_AGES[i % len(_AGES)]: resolve_age_role_id(s))
+
+def case_service_record(ctx):
+    from ui.views import verify_service
+    guild = ctx["guild"]
+    def prepare(i):
+        user = guild.add_member(f"svc{i}")
+        return lambda: verify_service.record_submission(
+            guild=guild, user=user, channel_id=1, message_id=10**12 + i, nickname="ต้น", age_text="21",
+            gender_text="ชาย", birthday_text="01/01/2000", account_age_days=400, account_risk="LOW")
+    return prepare
+
+def case_modal_submit(ctx):
+    from cogs.verification import VerificationForm
+    guild, rng = ctx["guild"], random.Random(2)
+    def prepare(i):
+        user = guild.add_member(f"user{i}")
+        form = fill_modal(VerificationForm(), name=_name(rng, i)[:10], age=_AGES[i % len(_AGES)],
+                          gender=_GENDERS[i % len(_GENDERS)], birthday="05/11/2004" if i % 2 else "")
+        return lambda: form.on_submit(FakeInteraction(user))
+    return prepare
+
+async def _submitted(ctx, i: int):
+    # one pending request, posted to the approval channel the same way on_submit does
+    from ui.views import verify_service
+    guild = ctx["guild"]
+    user = guild.add_member(f"req{i}")
+    msg = await guild.get_channel(ctx["approval_channel_id"]).send(content=user.mention)
+    await verify_service.record_submission(guild=guild, user=user, channel_id=msg.channel.id, message_id=msg.id,
+                                           nickname="ต้น", age_text=_AGES[i % len(_AGES)], gender_text=_GENDERS[i % len(_GENDERS)],
+                                           birthday_text="05/11/2004" if i % 2 else "", account_age_days=400, account_risk="LOW")
+    return msg
+
+def _click(ctx, action: str):
+    from ui.views import ApproveRejectPersistent
+    mod = ctx["moderator"]
+    async def setup(i):
+        msg = await _submitted(ctx, i)
+        view = ApproveRejectPersistent()
+        return lambda: getattr(view, action).callback(FakeInteraction(mod, message=msg))
+    return setup
+
+def case_approve(ctx): return _click(ctx, "approve")
+def case_reject(ctx): return _click(ctx, "reject")
+
+CASES = {
+    "canon_name": case_canon_name,
+    "resolve_gender_role_id": case_resolve_gender,
+    "resolve_age_role_id": case_resolve_age,
+    "service.record": case_service_record,
+    "form.on_submit": case_modal_submit,
+    "persistent.approve": case_approve,
+    "persistent.reject": case_reject,
+}
+
+async def run_case(prepare, n: int) -> dict:
+    warm = max(n // 20, 10)
+    samples = []
+    gc.collect()
+    for i in range(warm + n):
+        fn = prepare(i)
+        if inspect.isawaitable(fn): fn = await fn
+        t0 = time.perf_counter()
+        out = fn()
+        if inspect.isawaitable(out): await out
+        if i >= warm: samples.append(time.perf_counter() - t0)
+    return summarize(samples)
+
+async def main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(prog="python -m bench.suite")
+    ap.add_argument("-n", "--iterations", type=int, default=2000)
+    ap.add_argument("--only", default="", help="comma-separated case names")
+    ap.add_argument("--save", action="store_true", help=f"write bench/baselines/{BASELINE}.json")
+    ap.add_argument("--compare", action="store_true", help="exit 1 if slower than the saved baseline")
+    ap.add_argument("--tolerance", type=float, default=0.25)
+    args = ap.parse_args(argv)
+
+    from config import APPROVAL_CHANNEL_ID
+    from services.rest_scheduler import rest
+    from services.job_queue import jobs
+    from services.admin_notifier import admin_notifier
+    install_memory_backends()
+    unthrottle_rest()
+    guild = FakeGuild()
+    ctx = {"guild": guild, "moderator": guild.add_member("mod", moderator=True), "approval_channel_id": APPROVAL_CHANNEL_ID}
+
+    wanted = [c for c in args.only.split(",") if c] or list(CASES)
+    results = {}
+    for name in wanted:
+        results[name] = await run_case(CASES[name](ctx), args.iterations)
+    await jobs.close()
+    await admin_notifier.close()
+    await rest.close()
+    print_table(results)
+
+    if args.save:
+        print(f"baseline saved to {save_baseline(BASELINE, results)}")
+    if args.compare:
+        problems = compare_baseline(BASELINE, results, args.tolerance)
+        for p in problems: print(f"❌ {p}")
+        if problems: return 1
+        print("✅ within tolerance of baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(sys.argv[1:])))
@@ -1,31 +1,181 @@
-import asyncio, discord
+import time
+_T0 = time.perf_counter()
+
+import asyncio, signal, discord, yarl
 from discord.ext import commands
-from config import DISCORD_BOT_TOKEN
-from ui.views import VerificationView, ApproveRejectPersistent
+from config import (DISCORD_BOT_TOKEN, DATABASE_URL, HBD_NOTIFY_ENABLED, AUTO_REFRESH_ENABLED,
+                    SHARD_COUNT, CLUSTER_PROCESSES, CLUSTER_ID, SHARD_LATENCY_SAMPLE_SECONDS,
+                    METRICS_HOST, METRICS_PORT, DISCORD_API_BASE, TRACE_PATH, WRITE_BEHIND_ENABLED,
+                    APPROVAL_CHANNEL_ID, WARM_UP_RETRY_MAX_SECONDS)
+from cluster import shard_ids_for
+from db.pool import init_pool, close_pool
+from services.rest_scheduler import rest
+from services.job_queue import jobs
+from services.admin_notifier import admin_notifier
+from services.outbox import outbox
+from services.write_behind import write_behind
+from services.invalidation import InvalidationBus
+from services.metrics_server import MetricsServer
+from services.trace_recorder import TraceRecorder
+from db.repo import PgHBDRepo, PgMemberRepo, PgAgeRefreshRepo, PgGenderAliasRepo
+from utils.gender import load_guild_aliases
+from utils.startup import StartupTimer
+from services.age_service import AgeService
+from tasks.birthday_daemon import BirthdayDaemon
+from tasks.age_refresh_daemon import AgeRefreshDaemon
+from tasks.outbox_dispatcher import OutboxDispatcher
+from tasks.shard_monitor import ShardMonitor
+from ui.views import VerificationView, ApproveRejectPersistent, verify_service
+from cogs.verification import resume_unposted
+
+if DISCORD_API_BASE:
+    # load tests: REST and the gateway both go to the local stand-in (bench/fake_discord.py).
+    # Client.connect and AutoShardedClient.launch_shards dial DEFAULT_GATEWAY, not /gateway/bot.
+    discord.http.Route.BASE = DISCORD_API_BASE
+    discord.gateway.DiscordWebSocket.DEFAULT_GATEWAY = yarl.URL(DISCORD_API_BASE).with_scheme("ws").with_path("/ws")
+
+startup = StartupTimer(_T0)
+startup.record("imports", _T0)
 
 intents = discord.Intents.default()
 intents.message_content = True
 intents.guilds = True
 intents.members = True
 
-bot = commands.Bot(command_prefix="$", intents=intents, help_command=None)
+# no full member cache and no startup chunking: members come from interactions or
+# services.member_cache (bounded LRU + singleflight fetch)
+_bot_kwargs = dict(command_prefix="$", intents=intents, help_command=None,
+                   member_cache_flags=discord.MemberCacheFlags.none(), chunk_guilds_at_startup=False)
+
+class _DrainOnClose:
+    # queued approval posts and the last admin digest still need discord.py's HTTP session,
+    # which super().close() shuts; runs on SIGTERM and when `async with bot` exits
+    async def close(self) -> None:
+        await jobs.close()
+        await admin_notifier.close()  # after jobs: a job that gives up raises a notice
+        await super().close()
+
+class SaltyBot(_DrainOnClose, commands.Bot): pass
+class ShardedSaltyBot(_DrainOnClose, commands.AutoShardedBot): pass
+
+if SHARD_COUNT:
+    # each cluster process owns an interleaved slice of the shards
+    bot = ShardedSaltyBot(shard_count=SHARD_COUNT, shard_ids=shard_ids_for(CLUSTER_ID, SHARD_COUNT, CLUSTER_PROCESSES),
+                          **_bot_kwargs)
+else:
+    bot = SaltyBot(**_bot_kwargs)
+bot.shard_monitor = ShardMonitor(bot, SHARD_LATENCY_SAMPLE_SECONDS)
+invalidation = InvalidationBus()
+metrics_server = MetricsServer(METRICS_HOST, METRICS_PORT + CLUSTER_ID) if METRICS_PORT else None
+tracer = TraceRecorder(f"{TRACE_PATH}.{CLUSTER_ID}" if CLUSTER_PROCESSES > 1 else TRACE_PATH) if TRACE_PATH else None
+
+EXTENSIONS = ("commands.verify_embed", "commands.idcard", "commands.admin", "commands.help")
+
+@bot.event
+async def on_connect():
+    if startup.end("gateway"):
+        startup.begin("ready")
 
 @bot.event
 async def on_ready():
-    print(f"✅ Logged in as {bot.user}")
-    bot.add_view(VerificationView())
-    bot.add_view(ApproveRejectPersistent())
+    print(f"✅ Logged in as {bot.user} (cluster {CLUSTER_ID}, shards {getattr(bot, 'shard_ids', None) or [0]})")
+    if startup.end("ready"):
+        print(startup.report())
+
+@bot.listen("on_interaction")
+async def _trace_interaction(interaction: discord.Interaction):
+    if tracer: tracer.record(interaction)
+
+# deleting an approval message voids its request, so the user may submit again
+@bot.listen("on_raw_message_delete")
+async def _approval_deleted(payload: discord.RawMessageDeleteEvent):
+    if payload.guild_id and payload.channel_id == APPROVAL_CHANNEL_ID:
+        await verify_service.cancel_by_message(payload.guild_id, payload.message_id)
+
+@bot.listen("on_raw_bulk_message_delete")
+async def _approvals_deleted(payload: discord.RawBulkMessageDeleteEvent):
+    if payload.guild_id and payload.channel_id == APPROVAL_CHANNEL_ID:
+        for message_id in payload.message_ids:
+            await verify_service.cancel_by_message(payload.guild_id, message_id)
+
+@bot.event
+async def on_shard_ready(shard_id: int):
+    print(f"✅ shard {shard_id} ready")
 
 async def load_cogs():
-    await bot.load_extension("commands.verify_embed")
-    await bot.load_extension("commands.idcard")
-    await bot.load_extension("commands.admin")
-    await bot.load_extension("commands.help")
+    # extensions are independent; setup() only registers a cog
+    await asyncio.gather(*(bot.load_extension(ext) for ext in EXTENSIONS))
+
+async def _reload_aliases(_msg: dict) -> None:
+    await load_guild_aliases(PgGenderAliasRepo())
+
+async def _retrying(step: str, fn) -> None:
+    delay = 1.0
+    while True:
+        try:
+            return await fn()
+        except Exception as e:
+            print(f"⚠️ warm-up {step} failed: {e!r}; retrying in {delay:g}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, WARM_UP_RETRY_MAX_SECONDS)
+
+async def _warm_caches() -> None:
+    with startup.span("pool"):
+        await init_pool()  # connect + prepare statements
+        await asyncio.gather(load_guild_aliases(PgGenderAliasRepo()), verify_service.pending.warm())
+
+async def warm_up():
+    # runs alongside the gateway connect; early handlers simply wait on get_pool()'s lock.
+    # Each step retries until it succeeds: without it the pending set, aliases and resumed posts are missing.
+    await _retrying("pool", _warm_caches)
+    invalidation.on("request", verify_service.on_request_notify)
+    invalidation.on("aliases", _reload_aliases)
+    # also covers writes between the warm-up above and the first LISTEN
+    invalidation.on_connect(verify_service.pending.resync)
+    invalidation.on_connect(lambda: load_guild_aliases(PgGenderAliasRepo()))
+    invalidation.start()
+    # acknowledged submissions whose approval post never went out; needs this process's guilds
+    await bot.wait_until_ready()
+    handled: set[int] = set()
+    await _retrying("resume", lambda: resume_unposted(bot, handled))
 
 async def main():
-    async with bot:
-        await load_cogs()
-        await bot.start(DISCORD_BOT_TOKEN)
+    warm: asyncio.Task | None = None
+    closing: list[asyncio.Task] = []
+    try:
+        # Heroku/cluster.py stop dynos with SIGTERM: bot.close() drains the queue, the finally below flushes the rest
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, lambda: closing.append(asyncio.ensure_future(bot.close())))
+        except NotImplementedError:
+            pass  # Windows
+        async with bot:
+            with startup.span("cogs"):
+                await load_cogs()
+            # persistent views registered before login, so clicks right after a (re)connect are routed
+            bot.add_view(VerificationView())
+            bot.add_view(ApproveRejectPersistent())
+            if DATABASE_URL:
+                warm = asyncio.create_task(warm_up())
+                if HBD_NOTIFY_ENABLED:
+                    BirthdayDaemon(bot, PgHBDRepo(), PgMemberRepo()).start()
+                if AUTO_REFRESH_ENABLED:
+                    AgeRefreshDaemon(bot, PgAgeRefreshRepo(), AgeService()).start()
+                OutboxDispatcher(bot, outbox).start()
+                if WRITE_BEHIND_ENABLED: write_behind.start()
+            bot.shard_monitor.start()
+            if metrics_server: await metrics_server.start()
+            if tracer: tracer.start()
+            startup.begin("gateway")
+            await bot.start(DISCORD_BOT_TOKEN)
+    finally:
+        if warm: warm.cancel()
+        await asyncio.gather(*closing, return_exceptions=True)  # bot.close() must finish closing its HTTP session
+        await invalidation.close()
+        if metrics_server: await metrics_server.close()
+        if tracer: await tracer.close()
+        await rest.close()
+        await write_behind.close()  # no-op when disabled/empty; must run before the pool closes
+        await close_pool()
 
 if __name__ == "__main__":
     asyncio.run(main())
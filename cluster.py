@@ -0,0 +1,59 @@
+import os, sys, signal, subprocess, time
+from config import SHARD_COUNT, CLUSTER_PROCESSES, CLUSTER_STABLE_SECONDS
+
+# Cluster launcher: runs CLUSTER_PROCESSES copies of bot.py, each owning an interleaved slice
+# of SHARD_COUNT shards. Shared state lives in Postgres; see services/invalidation.py.
+
+def shard_ids_for(cluster_id:int, shard_count:int, processes:int) -> list[int]:
+    return list(range(cluster_id, shard_count, max(processes, 1)))
+
+def _spawn(cluster_id:int) -> subprocess.Popen:
+    env = {**os.environ, "CLUSTER_ID": str(cluster_id)}
+    return subprocess.Popen([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "bot.py")], env=env)
+
+def main() -> None:
+    if not SHARD_COUNT or SHARD_COUNT < CLUSTER_PROCESSES:
+        raise SystemExit("cluster mode needs SHARD_COUNT >= CLUSTER_PROCESSES")
+    procs = {i: _spawn(i) for i in range(CLUSTER_PROCESSES)}
+    restarts = {i: 0 for i in procs}
+    started = {i: time.monotonic() for i in procs}
+    stopping = False
+
+    def _stop(_sig, _frame):
+        nonlocal stopping
+        stopping = True
+        for p in procs.values():
+            if p.poll() is None: p.terminate()
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    due: dict[int, float] = {}  # cluster_id -> monotonic time of its next restart
+    while not stopping:
+        time.sleep(1)
+        now = time.monotonic()
+        for i, p in list(procs.items()):
+            if stopping: break
+            if i in due:
+                if now >= due[i]:
+                    del due[i]
+                    procs[i] = _spawn(i)
+                    started[i] = now
+                continue
+            code = p.poll()
+            if code is None:
+                # a child that has stayed up long enough earns back the short backoff
+                if restarts[i] and now - started[i] >= CLUSTER_STABLE_SECONDS: restarts[i] = 0
+                continue
+            restarts[i] += 1
+            delay = min(60, 2 ** min(restarts[i], 6))
+            print(f"⚠️ cluster {i} exited ({code}); restarting in {delay}s")
+            due[i] = now + delay
+
+    for p in procs.values():
+        try:
+            p.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            p.kill()
+
+if __name__ == "__main__":
+    main()
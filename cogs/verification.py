@@ -4,17 +4,94 @@ import discord
 from datetime import datetime, timedelta, timezone
 import re
 
-from core.config import (
-    VERIFY_CHANNEL_ID, APPROVAL_CHANNEL_ID, ROLE_ID_TO_GIVE, TH_TZ,
-    GENDER_ROLE_IDS_ALL, AGE_ROLE_IDS_ALL
-)
+from core.config import VERIFY_CHANNEL_ID, APPROVAL_CHANNEL_ID, ROLE_ID_TO_GIVE, TH_TZ
 from core.utils import (
-    INVALID_CHARS, contains_emoji, canon_name, discord_names_set,
-    resolve_gender_role_id, resolve_age_role_id, is_age_undisclosed,
-    notify_admin, parse_birthday, age_from_birthday, build_account_check_field,
+    text_violations, canon_name, discord_names_set, is_age_undisclosed,
+    notify_admin, parse_birthday, build_account_check_field,
 )
+from domain.models import VerificationPayload
+from ui.views import verify_service, decision_effects, run_decision_effects
+from services.job_queue import jobs
+from services.rest_scheduler import rest, channel_route, PRIORITY_INTERACTIVE
+from services.member_cache import members
+from utils.metrics import instrumented, INTERACTION_STEP_SECONDS, VERIFICATIONS_TOTAL, ERRORS_TOTAL
+
+_VIOLATION_LABELS = {"digit": "ตัวเลข", "forbidden": "สัญลักษณ์", "emoji": "อีโมจิ", "zero_width": "อักขระล่องหน"}
+
+def _violation_hint(violations: list[str]) -> str:
+    return f" (พบ: {', '.join(_VIOLATION_LABELS[v] for v in violations)})" if violations else ""
+
+def _request_embed(user: discord.abc.User, payload: VerificationPayload, sent_at: datetime) -> discord.Embed:
+    embed = discord.Embed(title="📋 Verification Request / คำขอยืนยันตัวตน", color=discord.Color.orange())
+    embed.set_thumbnail(url=user.display_avatar.with_static_format("png").with_size(128).url)
+    embed.add_field(name="Nickname / ชื่อเล่น", value=payload.nickname or "ไม่ระบุ", inline=False)
+    embed.add_field(name="Age / อายุ", value=payload.age_text or "ไม่ระบุ", inline=False)
+    embed.add_field(name="Gender / เพศ", value=payload.gender_text or "ไม่ระบุ", inline=False)
+    embed.add_field(name="Birthday / วันเกิด", value=payload.birthday_text or "ไม่ระบุ", inline=False)
+    name, value, _, _ = build_account_check_field(user)
+    embed.add_field(name=name, value=value, inline=False)
+    embed.add_field(name="📅 Sent at", value=sent_at.astimezone(TH_TZ).strftime("%d/%m/%Y %H:%M"), inline=False)
+    embed.set_footer(text=f"User ID: {user.id}")
+    return embed
+
+async def submit_approval_post(guild: discord.Guild, user: discord.abc.User, request_id: int,
+                          payload: VerificationPayload, sent_at: datetime) -> None:
+    posted: list[discord.Message] = []
+
+    async def post():
+        channel = guild.get_channel(APPROVAL_CHANNEL_ID)
+        if channel is None:
+            raise RuntimeError("approval channel not found")
+        if not posted:  # a retry after a failed attach must not post the request twice
+            view = ApproveRejectView(user=user, gender_text=payload.gender_text, age_text=payload.age_text or "ไม่ระบุ",
+                                     form_name=payload.nickname, birthday_text=payload.birthday_text)
+            embed = _request_embed(user, payload, sent_at)
+            posted.append(await rest.submit(channel_route(channel), lambda: channel.send(
+                content=user.mention,
+                embed=embed,
+                view=view,
+                allowed_mentions=discord.AllowedMentions(everyone=False, roles=False, users=True),
+            ), priority=PRIORITY_INTERACTIVE))
+        await verify_service.attach_message(request_id, channel.id, posted[0].id, payload)
 
-pending_verifications: set[int] = set()
+    async def give_up(e: BaseException):
+        if posted:  # posted but never attached: buttons on it could not find the request
+            try:
+                await posted[0].delete()
+            except Exception:
+                pass
+        await verify_service.abandon_unposted(request_id, guild.id)
+        await notify_admin(guild, f"โพสต์คำขอยืนยันของ {user.mention} ไม่สำเร็จ ผู้ใช้ต้องส่งใหม่: {e!r}", kind="error")
+
+    if not jobs.submit("approval_post", post, on_failure=give_up):
+        # queue full: post inline (the pre-queue behaviour) instead of dropping it
+        try:
+            await post()
+        except Exception as e:
+            await give_up(e)
+            raise
+
+async def resume_unposted(bot: commands.Bot, handled: set[int] | None = None) -> int:
+    # submissions acknowledged before a crash/restart whose approval message never went out;
+    # run by bot.py's warm_up once the pool and the guild cache are ready. `handled` carries the
+    # request ids already dealt with across warm_up's retries, so none is queued twice.
+    handled = set() if handled is None else handled
+    resumed = 0
+    for request_id, payload, sent_at in await verify_service.verify_repo.list_unposted(verify_service.pending.ttl):
+        if request_id in handled: continue
+        guild = bot.get_guild(payload.guild_id)
+        if guild is None: continue  # another cluster process owns this guild
+        try:
+            user = await members.get(guild, payload.user_id)
+        except discord.NotFound:
+            await verify_service.abandon_unposted(request_id, guild.id)
+            handled.add(request_id); continue
+        handled.add(request_id)
+        await submit_approval_post(guild, user, request_id, payload, sent_at)
+        resumed += 1
+    if resumed:
+        print(f"📨 re-queued {resumed} unposted verification request(s)")
+    return resumed
 
 class VerificationForm(discord.ui.Modal, title="Verify Identity / ยืนยันตัวตน"):
     def __init__(self):
@@ -40,18 +117,21 @@ class VerificationForm(discord.ui.Modal, title="Verify Identity / ยืนย
         for child in (self.name, self.age, self.gender, self.birthday):
             self.add_item(child)
 
+    @instrumented("submit")
     async def on_submit(self, interaction: discord.Interaction):
+        request_id = None
         try:
             if not interaction.response.is_done():
-                await interaction.response.defer(ephemeral=True)
+                with INTERACTION_STEP_SECONDS.labels("submit", "defer").time():
+                    await interaction.response.defer(ephemeral=True)
 
-            member = interaction.guild.get_member(interaction.user.id) or await interaction.guild.fetch_member(interaction.user.id)
+            member = await members.from_interaction(interaction)
             if member and any(r.id == ROLE_ID_TO_GIVE for r in member.roles):
                 await interaction.followup.send(
                     "✅ คุณได้รับการยืนยันแล้ว ไม่ต้องส่งซ้ำ\nหากคิดว่าเป็นความผิดพลาด กรุณาติดต่อผู้ดูแล", ephemeral=True
                 ); return
 
-            if interaction.user.id in pending_verifications:
+            if await verify_service.pending.is_pending(interaction.guild.id, interaction.user.id):
                 await interaction.followup.send("❗ ส่งคำขอไปแล้ว กรุณารอแอดมินตรวจ", ephemeral=True); return
 
             # validate age
@@ -62,15 +142,17 @@ class VerificationForm(discord.ui.Modal, title="Verify Identity / ยืนย
             # validate nickname
             nick = (self.name.value or "").strip()
             if nick:
-                if len(nick) < 2 or len(nick) > 10 or any(ch.isdigit() for ch in nick) or any(c in INVALID_CHARS for c in nick) or contains_emoji(nick):
-                    await interaction.followup.send("❌ Nickname ต้องเป็นตัวอักษร 2–10 ตัว และห้ามตัวเลข/สัญลักษณ์/อีโมจิ", ephemeral=True); return
+                bad = text_violations(nick)
+                if len(nick) < 2 or len(nick) > 10 or bad:
+                    await interaction.followup.send("❌ Nickname ต้องเป็นตัวอักษร 2–10 ตัว และห้ามตัวเลข/สัญลักษณ์/อีโมจิ" + _violation_hint(bad), ephemeral=True); return
                 if canon_name(nick) in discord_names_set(interaction.user):
                     await interaction.followup.send("❌ ชื่อเล่นต้องต่างจากชื่อในดิสคอร์ดของคุณจริง ๆ", ephemeral=True); return
 
             gender_raw = (self.gender.value or "")
             if gender_raw.strip():
-                if any(ch.isdigit() for ch in gender_raw) or any(c in INVALID_CHARS for c in gender_raw) or contains_emoji(gender_raw):
-                    await interaction.followup.send("❌ Gender invalid. Text only.", ephemeral=True); return
+                bad = text_violations(gender_raw)
+                if bad:
+                    await interaction.followup.send("❌ Gender invalid. Text only." + _violation_hint(bad), ephemeral=True); return
 
             birthday_raw = (self.birthday.value or "").strip()
             bday_dt = None
@@ -79,54 +161,36 @@ class VerificationForm(discord.ui.Modal, title="Verify Identity / ยืนย
                 if not bday_dt:
                     await interaction.followup.send("❌ วันเกิดไม่ถูกต้อง (dd/mm/yyyy เช่น 05/11/2004)", ephemeral=True); return
 
-            pending_verifications.add(interaction.user.id)
-
-            display_nick = nick if nick else "ไม่ระบุ"
-            display_age = (age_raw if age_raw else "ไม่ระบุ")
-            display_gender = (gender_raw.strip() if gender_raw.strip() else "ไม่ระบุ")
-            display_birthday = birthday_raw if birthday_raw else "ไม่ระบุ"
-
-            embed = discord.Embed(title="📋 Verification Request / คำขอยืนยันตัวตน", color=discord.Color.orange())
-            thumb_url = interaction.user.display_avatar.with_static_format("png").with_size(128).url
-            embed.set_thumbnail(url=thumb_url)
-            embed.add_field(name="Nickname / ชื่อเล่น", value=display_nick, inline=False)
-            embed.add_field(name="Age / อายุ", value=display_age, inline=False)
-            embed.add_field(name="Gender / เพศ", value=display_gender, inline=False)
-            embed.add_field(name="Birthday / วันเกิด", value=display_birthday, inline=False)
-
-            name, value, risk, age_days = build_account_check_field(interaction.user)
-            embed.add_field(name=name, value=value, inline=False)
-            if risk == "HIGH":
-                await notify_admin(interaction.guild, f"{interaction.user.mention} ความเสี่ยงสูงจากอายุบัญชี ({age_days} วัน)")
-
-            now = datetime.now(TH_TZ)
-            embed.add_field(name="📅 Sent at", value=now.strftime("%d/%m/%Y %H:%M"), inline=False)
-            embed.set_footer(text=f"User ID: {interaction.user.id}")
-
             channel = interaction.guild.get_channel(APPROVAL_CHANNEL_ID)
             if not channel:
-                await notify_admin(interaction.guild, "ไม่พบห้อง APPROVAL_CHANNEL_ID")
+                await notify_admin(interaction.guild, "ไม่พบห้อง APPROVAL_CHANNEL_ID", kind="config")
                 await interaction.followup.send("⚠️ ระบบขัดข้อง: ไม่พบห้องอนุมัติ แจ้งแอดมินเรียบร้อย", ephemeral=True); return
 
-            view = ApproveRejectView(
-                user=interaction.user,
-                gender_text=gender_raw,
-                age_text=age_raw if age_raw else "ไม่ระบุ",
-                form_name=nick,
-                birthday_text=birthday_raw
-            )
-            await channel.send(
-                content=interaction.user.mention,
-                embed=embed,
-                view=view,
-                allowed_mentions=discord.AllowedMentions(everyone=False, roles=False, users=True),
-            )
+            _, _, risk, age_days = build_account_check_field(interaction.user)
+            payload = VerificationPayload(interaction.guild.id, interaction.user.id, nick, age_raw, gender_raw.strip(),
+                                          birthday_raw, age_days, risk)
+            # durable first: the row exists (message_id NULL) before the user is told it was sent,
+            # so a crash before the approval post is picked up by resume_unposted on the next start
+            with INTERACTION_STEP_SECONDS.labels("submit", "record").time():
+                request_id = await verify_service.record_submission(
+                    guild=interaction.guild, user=interaction.user, channel_id=channel.id, message_id=None,
+                    nickname=nick, age_text=age_raw, gender_text=gender_raw.strip(), birthday_text=birthday_raw,
+                    account_age_days=age_days, account_risk=risk,
+                )
+            await submit_approval_post(interaction.guild, interaction.user, request_id, payload, datetime.now(TH_TZ))
+            if risk == "HIGH":
+                await notify_admin(interaction.guild, "ความเสี่ยงสูงจากอายุบัญชี", kind="risk", key="account_age",
+                                   who=f"{interaction.user.mention} ({age_days} วัน)")
 
             await interaction.followup.send("✅ ส่งคำขอแล้ว กรุณารอการอนุมัติจากแอดมิน", ephemeral=True)
 
         except Exception as e:
-            pending_verifications.discard(interaction.user.id)
-            await notify_admin(interaction.guild, f"เกิดข้อผิดพลาดตอนส่งแบบฟอร์มของ {interaction.user.mention}: {e!r}")
+            ERRORS_TOTAL.labels("submit").inc()
+            if request_id is None:
+                # never recorded; once it is, only abandon_unposted (a failed approval post) frees the user
+                verify_service.pending.discard(interaction.guild.id, interaction.user.id)
+            await notify_admin(interaction.guild, f"เกิดข้อผิดพลาดตอนส่งแบบฟอร์ม: {e!r}", kind="error", key=f"submit:{e!r}",
+                               who=interaction.user.mention)
             try:
                 await interaction.followup.send("❌ ระบบขัดข้อง กรุณาลองใหม่ภายหลัง", ephemeral=True)
             except Exception:
@@ -137,8 +201,9 @@ class VerificationView(discord.ui.View):
         super().__init__(timeout=None)
 
     @discord.ui.button(label="Verify Identity / ยืนยันตัวตน", style=discord.ButtonStyle.success, emoji="✅", custom_id="verify_button")
+    @instrumented("verify_button")
     async def confirm_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        member = interaction.guild.get_member(interaction.user.id) or await interaction.guild.fetch_member(interaction.user.id)
+        member = await members.from_interaction(interaction)
         if member and any(r.id == ROLE_ID_TO_GIVE for r in member.roles):
             await interaction.response.send_message("✅ คุณได้รับการยืนยันแล้ว ไม่ต้องกดอีกครั้ง", ephemeral=True); return
         await interaction.response.send_modal(VerificationForm())
@@ -153,126 +218,49 @@ class ApproveRejectView(discord.ui.View):
         self.birthday_text = (birthday_text or "").strip()
 
     @discord.ui.button(label="✅ Approve / อนุมัติ", style=discord.ButtonStyle.success, custom_id="approve_button")
+    @instrumented("approve")
     async def approve(self, interaction: discord.Interaction, button: discord.ui.Button):
-        try:
-            if not interaction.response.is_done():
+        if not interaction.response.is_done():
+            with INTERACTION_STEP_SECONDS.labels("approve", "defer").time():
                 await interaction.response.defer()
-
-            member = interaction.guild.get_member(self.user.id) or await interaction.guild.fetch_member(self.user.id)
-            general_role = interaction.guild.get_role(ROLE_ID_TO_GIVE)
-            gender_role = interaction.guild.get_role(resolve_gender_role_id(self.gender_text))
-
-            age_role = None
-            if self.birthday_text:
-                bday_dt = parse_birthday(self.birthday_text)
-                if bday_dt:
-                    years = age_from_birthday(bday_dt)
-                    age_role_id = resolve_age_role_id(str(years))
-                    age_role = interaction.guild.get_role(age_role_id) if age_role_id else None
-            if age_role is None:
-                age_role_id = resolve_age_role_id(self.age_text)
-                age_role = interaction.guild.get_role(age_role_id) if age_role_id else None
-
-            if not (member and general_role and gender_role):
-                await interaction.followup.send("❌ Member or role not found.", ephemeral=True)
-                await notify_admin(interaction.guild, "อนุมัติไม่สำเร็จ: ไม่พบ member/role"); return
-
-            # enforce one gender role
-            try:
-                to_remove_gender = [r for r in member.roles if r.id in GENDER_ROLE_IDS_ALL and (gender_role is None or r.id != gender_role.id)]
-                if to_remove_gender:
-                    await member.remove_roles(*to_remove_gender, reason="Verification: enforce single gender role")
-            except discord.Forbidden:
-                await interaction.followup.send("❌ ไม่มีสิทธิ์ถอดยศเพศเดิม", ephemeral=True); return
-
-            # enforce one age role (only if new exists)
-            if age_role:
-                try:
-                    to_remove_age = [r for r in member.roles if r.id in AGE_ROLE_IDS_ALL and r.id != age_role.id]
-                    if to_remove_age:
-                        await member.remove_roles(*to_remove_age, reason="Verification: enforce single age role")
-                except discord.Forbidden:
-                    await interaction.followup.send("❌ ไม่มีสิทธิ์ถอดยศอายุเดิม", ephemeral=True); return
-
-            roles_to_add = []
-            if general_role and general_role not in member.roles: roles_to_add.append(general_role)
-            if gender_role and gender_role not in member.roles: roles_to_add.append(gender_role)
-            if age_role and age_role not in member.roles: roles_to_add.append(age_role)
-
-            if roles_to_add:
-                try:
-                    await member.add_roles(*roles_to_add, reason="Verified")
-                except discord.Forbidden:
-                    await interaction.followup.send("❌ Missing permissions to add roles.", ephemeral=True)
-                    await notify_admin(interaction.guild, f"บอทให้ยศไม่สำเร็จที่ {member.mention}"); return
-
-            pending_verifications.discard(self.user.id)
-        except Exception as e:
-            await notify_admin(interaction.guild, f"Approve error: {e!r}")
-        finally:
-            for child in self.children:
-                if getattr(child, "custom_id", None) == "approve_button":
-                    child.label = "✅ Approved / อนุมัติแล้ว"
-                    child.style = discord.ButtonStyle.success
-                elif getattr(child, "custom_id", None) == "reject_button":
-                    child.style = discord.ButtonStyle.secondary
-                child.disabled = True
-
-            try:
-                msg = interaction.message
-                if msg and msg.embeds:
-                    e = msg.embeds[0]
-                    actor = getattr(interaction.user, "display_name", None) or interaction.user.name
-                    stamp = datetime.now(TH_TZ).strftime("%d/%m/%Y %H:%M")
-                    orig = e.footer.text or ""
-                    footer = f"{orig} • Approved by {actor} • {stamp}" if orig else f"Approved by {actor} • {stamp}"
-                    e.set_footer(text=footer)
-                    await msg.edit(embed=e, view=self)
-                else:
-                    await interaction.message.edit(view=self)
-            except discord.NotFound:
-                pass
+        effects = decision_effects(interaction, "APPROVED", user_id=self.user.id, gender_text=self.gender_text,
+                                   age_text=self.age_text, birthday_text=self.birthday_text)
+        # conditional UPDATE claims the request and commits its side effects to the outbox;
+        # a losing click never touches roles
+        with INTERACTION_STEP_SECONDS.labels("approve", "claim").time():
+            won = await verify_service.verify_repo.set_request_status(interaction.guild.id, interaction.message.id, "APPROVED",
+                                                                      interaction.user.id, effects)
+        if not won:
+            await interaction.followup.send("⚠️ คำขอนี้ถูกจัดการไปแล้ว", ephemeral=True); return
+        verify_service.pending.discard(interaction.guild.id, self.user.id)
+        VERIFICATIONS_TOTAL.labels("approved").inc()
+        with INTERACTION_STEP_SECONDS.labels("approve", "effects").time():
+            await run_decision_effects(interaction, effects)
 
     @discord.ui.button(label="❌ Reject / ปฏิเสธ", style=discord.ButtonStyle.danger, custom_id="reject_button")
+    @instrumented("reject")
     async def reject(self, interaction: discord.Interaction, button: discord.ui.Button):
-        try:
-            if not interaction.response.is_done():
+        if not interaction.response.is_done():
+            with INTERACTION_STEP_SECONDS.labels("reject", "defer").time():
                 await interaction.response.defer()
-            pending_verifications.discard(self.user.id)
-            try:
-                await self.user.send("❌ การยืนยันตัวตนของคุณไม่ผ่าน กรุณาติดต่อแอดมิน")
-            except Exception:
-                await interaction.followup.send("⚠️ ไม่สามารถส่ง DM แจ้งผู้ใช้ได้", ephemeral=True)
-        except Exception as e:
-            await notify_admin(interaction.guild, f"Reject error: {e!r}")
-        finally:
-            for child in self.children:
-                if getattr(child, "custom_id", None) == "reject_button":
-                    child.label = "❌ Rejected / ปฏิเสธแล้ว"
-                    child.style = discord.ButtonStyle.danger
-                elif getattr(child, "custom_id", None) == "approve_button":
-                    child.style = discord.ButtonStyle.secondary
-                child.disabled = True
-            try:
-                msg = interaction.message
-                if msg and msg.embeds:
-                    e = msg.embeds[0]
-                    actor = getattr(interaction.user, "display_name", None) or interaction.user.name
-                    stamp = datetime.now(TH_TZ).strftime("%d/%m/%Y %H:%M")
-                    orig = e.footer.text or ""
-                    footer = f"{orig} • Rejected by {actor} • {stamp}" if orig else f"Rejected by {actor} • {stamp}"
-                    e.set_footer(text=footer)
-                    await msg.edit(embed=e, view=self)
-                else:
-                    await interaction.message.edit(view=self)
-            except discord.NotFound:
-                pass
+        effects = decision_effects(interaction, "REJECTED", user_id=self.user.id)
+        if not await verify_service.verify_repo.set_request_status(interaction.guild.id, interaction.message.id, "REJECTED",
+                                                                   interaction.user.id, effects):
+            await interaction.followup.send("⚠️ คำขอนี้ถูกจัดการไปแล้ว", ephemeral=True); return
+        verify_service.pending.discard(interaction.guild.id, self.user.id)
+        VERIFICATIONS_TOTAL.labels("rejected").inc()
+        with INTERACTION_STEP_SECONDS.labels("reject", "effects").time():
+            await run_decision_effects(interaction, effects)
 
 # ---- Cog ----
 class VerificationCog(commands.Cog, name="Verification"):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
+    async def cog_load(self):
+        # restore SUBMITTED requests so a restart doesn't allow double-submits
+        await verify_service.pending.warm()
+
     @commands.command(name="verify_embed")
     @commands.has_permissions(administrator=True)
     async def verify_embed(self, ctx: commands.Context):
@@ -1,7 +1,14 @@
 from discord.ext import commands
 import discord
-from config import ROLE_ID_TO_GIVE, GENDER_ROLE_IDS_ALL, AGE_ROLE_IDS_ALL
+from config import ROLE_ID_TO_GIVE, GENDER_ROLE_IDS_ALL, AGE_ROLE_IDS_ALL, CLUSTER_ID
 from utils.auth import is_moderator
+from db.pool import pool_stats
+from services.rest_scheduler import rest, PRIORITY_BACKGROUND
+from services.member_cache import members
+from services.job_queue import jobs
+from utils.metrics import (INTERACTION_SECONDS, INTERACTION_STEP_SECONDS, REST_SECONDS, JOB_SECONDS,
+                           VERIFICATIONS_TOTAL, ERRORS_TOTAL, JOBS_TOTAL, OUTBOX_TOTAL)
+from utils.roles import current_role_ids, apply_role_ids
 
 class AdminCog(commands.Cog):
     def __init__(self, bot): self.bot = bot
@@ -9,10 +16,68 @@ class AdminCog(commands.Cog):
     @commands.command(name="reverify")
     @commands.has_permissions(manage_roles=True)
     async def reverify(self, ctx: commands.Context, member: discord.Member):
-        to_remove = [r for r in member.roles if r.id in {ROLE_ID_TO_GIVE, *GENDER_ROLE_IDS_ALL, *AGE_ROLE_IDS_ALL}]
-        if to_remove:
-            await member.remove_roles(*to_remove, reason="Force re-verification")
+        member = await members.fresh(ctx.guild, member.id)  # keep roles granted since the converter's copy
+        target = current_role_ids(member) - {ROLE_ID_TO_GIVE, *GENDER_ROLE_IDS_ALL, *AGE_ROLE_IDS_ALL}
+        await apply_role_ids(member, target, reason="Force re-verification", priority=PRIORITY_BACKGROUND)
         await ctx.send(f"✅ สั่งให้ {member.mention} ยืนยันตัวตนใหม่แล้ว (roles cleared)")
 
+    @commands.command(name="dbstats")
+    @commands.has_permissions(manage_roles=True)
+    async def dbstats(self, ctx: commands.Context):
+        st = pool_stats()
+        w = st["acquire_wait"]
+        embed = discord.Embed(title="🗄️ DB Pool", color=discord.Color.blurple())
+        embed.add_field(name="Pool", value=(f"in use {st['in_use']}/{st['size']} (min {st['min_size']}, max {st['max_size']})"
+                                             if "size" in st else "not connected"), inline=False)
+        embed.add_field(name="Acquire wait", value=f"n={w['count']} avg={w['avg_ms']}ms max={w['max_ms']}ms", inline=False)
+        lines = [f"`{k}` n={v['count']} avg={v['avg_ms']}ms max={v['max_ms']}ms" for k, v in st["queries"].items()]
+        embed.add_field(name="Queries", value="\n".join(lines)[:1024] or "—", inline=False)
+        await ctx.send(embed=embed)
+
+    @commands.command(name="reststats")
+    @commands.has_permissions(manage_roles=True)
+    async def reststats(self, ctx: commands.Context):
+        st = rest.stats()
+        embed = discord.Embed(title="📡 REST Scheduler", color=discord.Color.blurple())
+        embed.add_field(name="Queue depth", value=f"interactive {st['queue_depth']['interactive']} • background {st['queue_depth']['background']}", inline=False)
+        for klass in ("interactive", "background"):
+            w, r = st["wait"][klass], st["run"][klass]
+            embed.add_field(name=klass.title(), value=f"n={r['count']} wait avg={w['avg_ms']}ms max={w['max_ms']}ms • run avg={r['avg_ms']}ms", inline=False)
+        embed.add_field(name="Errors", value=str(st["errors"]), inline=False)
+        await ctx.send(embed=embed)
+
+    @commands.command(name="shardstats")
+    @commands.has_permissions(manage_roles=True)
+    async def shardstats(self, ctx: commands.Context):
+        monitor = getattr(self.bot, "shard_monitor", None)
+        if monitor is None:
+            await ctx.send("⚠️ shard monitor is not running"); return
+        embed = discord.Embed(title="🧩 Shards", color=discord.Color.blurple())
+        lines = [f"`#{r['shard_id']}` guilds={r['guilds']} now={r['current_ms'] if r['current_ms'] is not None else '—'}ms "
+                 f"avg={r['avg_ms']}ms max={r['max_ms']}ms" for r in monitor.stats()]
+        embed.add_field(name=f"Cluster {CLUSTER_ID} • this guild on shard #{ctx.guild.shard_id}", value="\n".join(lines)[:1024] or "—", inline=False)
+        mc = members.stats()
+        embed.add_field(name="Member cache", value=f"size={mc['size']} inflight={mc['inflight']} hits={mc['hits']} "
+                                                   f"fetches={mc['fetches']} coalesced={mc['coalesced']}", inline=False)
+        await ctx.send(embed=embed)
+
+    @commands.command(name="latency")
+    @commands.has_permissions(manage_roles=True)
+    async def latency(self, ctx: commands.Context):
+        embed = discord.Embed(title="⏱️ Latency (p50 / p95 / p99)", color=discord.Color.blurple())
+        for fam in (INTERACTION_SECONDS, INTERACTION_STEP_SECONDS, REST_SECONDS, JOB_SECONDS):
+            lines = [f"`{'/'.join(key)}` n={h.count} {d['p50_ms']} / {d['p95_ms']} / {d['p99_ms']} ms"
+                     for key, h in sorted(fam.children.items()) if (d := h.as_dict())["count"]]
+            embed.add_field(name=fam.help, value="\n".join(lines)[:1024] or "—", inline=False)
+        counts = " • ".join(f"{k[0]}={c.value}" for k, c in sorted(VERIFICATIONS_TOTAL.children.items()))
+        errors = " • ".join(f"{k[0]}={c.value}" for k, c in sorted(ERRORS_TOTAL.children.items()))
+        embed.add_field(name="Verifications", value=counts or "—", inline=False)
+        embed.add_field(name="Errors", value=errors or "—", inline=False)
+        job_counts = " • ".join(f"{'/'.join(k)}={c.value}" for k, c in sorted(JOBS_TOTAL.children.items()))
+        embed.add_field(name=f"Jobs (queued {jobs.depth()})", value=job_counts or "—", inline=False)
+        outbox_counts = " • ".join(f"{'/'.join(k)}={c.value}" for k, c in sorted(OUTBOX_TOTAL.children.items()))
+        embed.add_field(name="Outbox (kind/path/outcome)", value=outbox_counts[:1024] or "—", inline=False)
+        await ctx.send(embed=embed)
+
 async def setup(bot):
     await bot.add_cog(AdminCog(bot))
@@ -6,9 +6,13 @@ _SHORT_DESC = {
     "verify_embed": "ส่ง Embed ปุ่มยืนยันตัวตนไปยังห้อง VERIFY_CHANNEL_ID",
     "idcard": "ดู ID Card ของตัวเอง; ดูของคนอื่นได้เฉพาะแอดมิน",
     "reverify": "บังคับให้สมาชิกยืนยันตัวตนใหม่ (ลบ roles)",
+    "dbstats": "ดูสถานะ connection pool และเวลาที่ใช้ต่อ query",
+    "reststats": "ดูคิวและเวลารอของคำสั่ง Discord REST (roles/DM/ข้อความ)",
+    "latency": "ดู p50/p95/p99 ของ interaction, ขั้นตอนย่อย และ REST พร้อมตัวนับคำขอ/ข้อผิดพลาด",
+    "shardstats": "ดู latency ของแต่ละ shard และสถานะ member cache ในโปรเซสนี้",
 }
 
-_ADMIN_COMMANDS = {"verify_embed", "reverify"}
+_ADMIN_COMMANDS = {"verify_embed", "reverify", "dbstats", "reststats", "shardstats", "latency"}
 
 def _fmt_cmd_list(prefix: str, names: list[str]) -> str:
     lines = []
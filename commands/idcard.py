@@ -1,10 +1,31 @@
 from discord.ext import commands
 import discord
-from config import APPROVAL_CHANNEL_ID, HIDE_BIRTHDAY_ON_IDCARD
-from ui.messages import copy_embed_fields, mask_birthday_field_for_idcard
+from config import HIDE_BIRTHDAY_ON_IDCARD
+from db.repo import PgApprovalIndexRepo, PgVerifyRepo
+from ui.messages import copy_embed_fields, mask_birthday_field_for_idcard, build_idcard_embed
 
 class IDCardCog(commands.Cog):
-    def __init__(self, bot): self.bot = bot
+    def __init__(self, bot):
+        self.bot = bot
+        self.approval_repo = PgApprovalIndexRepo()
+        self.verify_repo = PgVerifyRepo()
+
+    async def _load_card(self, guild: discord.Guild, member: discord.abc.User):
+        # approval_index is keyed by (guild_id, user_id): one indexed lookup + one fetch_message
+        latest = await self.approval_repo.get_latest(guild.id, member.id)
+        if latest:
+            channel_id, message_id = latest
+            ch = guild.get_channel(channel_id)
+            if ch:
+                try:
+                    m = await ch.fetch_message(message_id)
+                    if m.embeds:
+                        return copy_embed_fields(m.embeds[0])
+                except (discord.NotFound, discord.Forbidden):
+                    pass
+        # approval message deleted/unreachable → rebuild from the stored request
+        payload = await self.verify_repo.get_latest_request(guild.id, member.id)
+        return build_idcard_embed(member, payload) if payload else None
 
     @commands.command(name="idcard")
     async def idcard(self, ctx: commands.Context, *, who: str = None):
@@ -22,18 +43,12 @@ class IDCardCog(commands.Cog):
         if member.id != ctx.author.id and not ctx.author.guild_permissions.administrator:
             await ctx.send("❌ คุณสามารถดูบัตรของ **ตัวเอง** ได้เท่านั้น"); return
 
-        ch = ctx.guild.get_channel(APPROVAL_CHANNEL_ID)
-        if not ch: return await ctx.send("❌ APPROVAL_CHANNEL_ID not found.")
-
-        async for m in ch.history(limit=200):
-            if (m.author == self.bot.user and m.embeds and m.mentions and member in m.mentions):
-                src = m.embeds[0]
-                e = copy_embed_fields(src)
-                e.title = "🪪 ID Card / บัตรยืนยันตัวตน"
-                mask_birthday_field_for_idcard(e)
-                return await ctx.send(embed=e)
-
-        await ctx.send("❌ No verification info found for this user.")
+        e = await self._load_card(ctx.guild, member)
+        if e is None:
+            return await ctx.send("❌ No verification info found for this user.")
+        e.title = "🪪 ID Card / บัตรยืนยันตัวตน"
+        mask_birthday_field_for_idcard(e)
+        await ctx.send(embed=e)
 
 async def setup(bot):
     await bot.add_cog(IDCardCog(bot))
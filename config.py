@@ -4,6 +4,33 @@ from datetime import timezone, timedelta
 # Tokens / URLs
 DISCORD_BOT_TOKEN = os.getenv("DISCORD_BOT_TOKEN", "")
 DATABASE_URL = os.getenv("DATABASE_URL", "")
+DISCORD_API_BASE = os.getenv("DISCORD_API_BASE", "")  # load tests only: bench/fake_discord.py
+
+# DB pool
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "5000"))
+DB_COMMAND_TIMEOUT = float(os.getenv("DB_COMMAND_TIMEOUT", "10"))
+WARM_UP_RETRY_MAX_SECONDS = float(os.getenv("WARM_UP_RETRY_MAX_SECONDS", "60"))  # backoff cap while the DB is unreachable at boot
+
+# Write-behind for submission writes (services/write_behind.py); off = one statement per submission.
+# A submission is acknowledged only once its flush commits (adds up to one interval to the ack), so a
+# hard crash loses no acknowledged request, only buffered attach/profile updates; resume_unposted
+# then re-posts the affected approval messages. A batch failing WRITE_BEHIND_MAX_ATTEMPTS flushes in
+# a row is written row by row and rows Postgres rejects are dropped.
+WRITE_BEHIND_ENABLED = os.getenv("WRITE_BEHIND_ENABLED", "0") == "1"
+WRITE_BEHIND_INTERVAL_MS = int(os.getenv("WRITE_BEHIND_INTERVAL_MS", "50"))
+WRITE_BEHIND_MAX_ROWS = int(os.getenv("WRITE_BEHIND_MAX_ROWS", "200"))
+WRITE_BEHIND_MAX_ATTEMPTS = int(os.getenv("WRITE_BEHIND_MAX_ATTEMPTS", "5"))
+WRITE_BEHIND_ACK_TIMEOUT = float(os.getenv("WRITE_BEHIND_ACK_TIMEOUT", "5"))  # seconds a submit waits for its commit
+
+# Cluster mode (python cluster.py): SHARD_COUNT shards spread over CLUSTER_PROCESSES processes.
+# SHARD_COUNT=0 keeps the single-process, un-sharded commands.Bot.
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", "0"))
+CLUSTER_PROCESSES = int(os.getenv("CLUSTER_PROCESSES", "1"))
+CLUSTER_ID = int(os.getenv("CLUSTER_ID", "0"))  # set per process by cluster.py
+CLUSTER_STABLE_SECONDS = float(os.getenv("CLUSTER_STABLE_SECONDS", "300"))  # uptime that resets a child's restart backoff
+SHARD_LATENCY_SAMPLE_SECONDS = float(os.getenv("SHARD_LATENCY_SAMPLE_SECONDS", "30"))
 
 # Timezone
 TZ = timezone(timedelta(hours=7))  # Asia/Bangkok
@@ -46,15 +73,66 @@ AGE_ROLE_IDS_ALL = [rid for rid in [
     ROLE_25_29, ROLE_30_34, ROLE_35_39, ROLE_40_44, ROLE_45_49,
     ROLE_50_54, ROLE_55_59, ROLE_60_64, ROLE_65_UP, ROLE_AGE_UNDISCLOSED
 ] if rid and rid > 0]
+AGE_BRACKETS = [
+    ((0, 12), ROLE_0_12), ((13, 15), ROLE_13_15), ((16, 18), ROLE_16_18), ((19, 21), ROLE_19_21),
+    ((22, 24), ROLE_22_24), ((25, 29), ROLE_25_29), ((30, 34), ROLE_30_34), ((35, 39), ROLE_35_39),
+    ((40, 44), ROLE_40_44), ((45, 49), ROLE_45_49), ((50, 54), ROLE_50_54), ((55, 59), ROLE_55_59),
+    ((60, 64), ROLE_60_64), ((65, 200), ROLE_65_UP),
+]
 
 # Feature flags
 AUTO_REFRESH_ENABLED = True
+
+# Age refresh (daily, local time)
+AGE_REFRESH_HOUR = 0
+AGE_REFRESH_MINUTE = 5
+AGE_REFRESH_BATCH_SIZE = int(os.getenv("AGE_REFRESH_BATCH_SIZE", "10"))
+AGE_REFRESH_RETRY_SECONDS = float(os.getenv("AGE_REFRESH_RETRY_SECONDS", "300"))  # guilds left unfinished by 5xx/timeouts
 HBD_NOTIFY_ENABLED = True
 
 # HBD channel/time
 BIRTHDAY_CHANNEL_ID = 1323069987845312554
 HBD_NOTIFY_HOUR = 9
 HBD_NOTIFY_MINUTE = 0
+HBD_RETRY_SECONDS = float(os.getenv("HBD_RETRY_SECONDS", "300"))  # guilds left unfinished; also the backfill backoff cap
+
+# Discord REST scheduler
+REST_CONCURRENCY = int(os.getenv("REST_CONCURRENCY", "4"))
+REST_RESERVED_INTERACTIVE = int(os.getenv("REST_RESERVED_INTERACTIVE", "1"))  # workers background jobs can't take
+
+# Background jobs (services/job_queue.py): approval posts after a modal submit
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "1000"))  # when full, submit falls back to posting inline
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_RETRY_BASE = float(os.getenv("JOB_RETRY_BASE", "1.0"))  # seconds; doubles per attempt, capped at 60
+
+# Admin notices (services/admin_notifier.py): one digest embed per guild per window
+NOTIFY_WINDOW_SECONDS = float(os.getenv("NOTIFY_WINDOW_SECONDS", "30"))
+NOTIFY_MAX_LINES = int(os.getenv("NOTIFY_MAX_LINES", "10"))     # distinct lines shown per kind (not risk); the rest are counted
+NOTIFY_MAX_EVENTS = int(os.getenv("NOTIFY_MAX_EVENTS", "2000"))  # lines + mentions held in memory across guilds
+
+# Outbox for approve/reject side effects (services/outbox.py, tasks/outbox_dispatcher.py)
+OUTBOX_LEASE_SECONDS = float(os.getenv("OUTBOX_LEASE_SECONDS", "30"))  # how long a claimed row is hidden from other workers
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "5"))
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "12"))  # ~1h of backoff before a row is marked dead
+OUTBOX_RETENTION_HOURS = float(os.getenv("OUTBOX_RETENTION_HOURS", "168"))
+
+# Caches
+PAYLOAD_CACHE_SIZE = int(os.getenv("PAYLOAD_CACHE_SIZE", "2048"))
+PENDING_CACHE_SIZE = int(os.getenv("PENDING_CACHE_SIZE", "50000"))  # past this, misses are checked in Postgres
+PENDING_TTL_HOURS = float(os.getenv("PENDING_TTL_HOURS", "168"))  # stale requests stop blocking resubmission
+
+# Member cache (discord.py's full member cache is off; see services/member_cache.py)
+MEMBER_CACHE_SIZE = int(os.getenv("MEMBER_CACHE_SIZE", "5000"))
+MEMBER_CACHE_TTL = float(os.getenv("MEMBER_CACHE_TTL", "60"))  # seconds; short so role state stays fresh
+
+# Prometheus /metrics endpoint (0 disables); each cluster process adds CLUSTER_ID to the port
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+
+# Interaction trace recording (bench/replay.py); empty disables. Ids are hashed, free text reduced to its shape.
+TRACE_PATH = os.getenv("TRACE_PATH", "")
 
 # Privacy
 HIDE_BIRTHDAY_ON_IDCARD = True
@@ -51,3 +51,9 @@ AGE_ROLE_IDS_ALL = [
     ROLE_25_29, ROLE_30_34, ROLE_35_39, ROLE_40_44, ROLE_45_49,
     ROLE_50_54, ROLE_55_59, ROLE_60_64, ROLE_65_UP, ROLE_AGE_UNDISCLOSED
 ]
+AGE_BRACKETS = [
+    ((0, 12), ROLE_0_12), ((13, 15), ROLE_13_15), ((16, 18), ROLE_16_18), ((19, 21), ROLE_19_21),
+    ((22, 24), ROLE_22_24), ((25, 29), ROLE_25_29), ((30, 34), ROLE_30_34), ((35, 39), ROLE_35_39),
+    ((40, 44), ROLE_40_44), ((45, 49), ROLE_45_49), ((50, 54), ROLE_50_54), ((55, 59), ROLE_55_59),
+    ((60, 64), ROLE_60_64), ((65, 200), ROLE_65_UP),
+]
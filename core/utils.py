@@ -3,70 +3,24 @@ import re, io, unicodedata
 from datetime import datetime, timezone, timedelta
 from typing import Iterable, Optional
 import discord
+from services.admin_notifier import admin_notifier
+from utils.age_index import AgeBracketIndex
+from utils.text import canon_full, canon_many
+from utils.gender import resolve_gender, MALE, FEMALE, LGBT, UNDISCLOSED
+from utils.charclass import FORBIDDEN_CHARS, contains_emoji, text_violations
 
 from .config import (
-    ADMIN_NOTIFY_CHANNEL_ID, APPROVAL_CHANNEL_ID, TH_TZ,
+    TH_TZ,
     ROLE_MALE, ROLE_FEMALE, ROLE_LGBT, ROLE_GENDER_UNDISCLOSED,
     ROLE_AGE_UNDISCLOSED,
-    AGE_ROLE_IDS_ALL, GENDER_ROLE_IDS_ALL,
+    AGE_ROLE_IDS_ALL, GENDER_ROLE_IDS_ALL, AGE_BRACKETS,
     MIN_ACCOUNT_AGE_DAYS_HIGH, MIN_ACCOUNT_AGE_DAYS_MED,
 )
 
-INVALID_CHARS = set("=+*/@#$%^&*()<>?|{}[]\"'\\~`")
-
-EMOJI_RE = re.compile(
-    r"["
-    r"\U0001F300-\U0001F5FF"
-    r"\U0001F600-\U0001F64F"
-    r"\U0001F680-\U0001F6FF"
-    r"\U0001F700-\U0001F77F"
-    r"\U0001F780-\U0001F7FF"
-    r"\U0001F900-\U0001F9FF"
-    r"\U0001FA00-\U0001FA6F"
-    r"\U0001FA70-\U0001FAFF"
-    r"\u2600-\u26FF"
-    r"\u2700-\u27BF"
-    r"]"
-    r"|[\u200d\uFE0F]"
-    r"|[\U0001F1E6-\U0001F1FF]{2}"
-)
-def contains_emoji(s: str) -> bool:
-    return bool(EMOJI_RE.search(s or ""))
-
-_ZERO_WIDTH_RE = re.compile(r"[\u200B-\u200F\u202A-\u202E\u2060-\u206F\uFEFF]")
-_CONFUSABLES_MAP = str.maketrans({
-    "А":"A","В":"B","Е":"E","К":"K","М":"M","Н":"H","О":"O","Р":"P","С":"S","Т":"T","У":"Y","Х":"X",
-    "а":"a","в":"b","е":"e","к":"k","м":"m","н":"h","о":"o","р":"p","с":"c","т":"t","у":"y","х":"x",
-    "Α":"A","Β":"B","Ε":"E","Ζ":"Z","Η":"H","Ι":"I","Κ":"K","Μ":"M","Ν":"N","Ο":"O","Ρ":"P","Τ":"T","Υ":"Y","Χ":"X",
-    "α":"a","β":"b","ε":"e","ι":"i","κ":"k","ν":"n","ο":"o","ρ":"p","τ":"t","υ":"y","χ":"x",
-})
-_LEET_MAP = str.maketrans({
-    "0":"o","1":"l","3":"e","4":"a","5":"s","7":"t","8":"b","9":"g","2":"z","6":"g",
-    "@":"a","$":"s","+":"t"
-})
-def _strip_combining(s: str) -> str:
-    return "".join(ch for ch in s if unicodedata.category(ch) != "Mn")
-def _letters_only(s: str) -> str:
-    return "".join(ch for ch in s if unicodedata.category(ch).startswith("L"))
-def _collapse_runs(s: str) -> str:
-    if not s: return s
-    out=[s[0]]
-    for ch in s[1:]:
-        if ch!=out[-1]: out.append(ch)
-    return "".join(out)
+INVALID_CHARS = set(FORBIDDEN_CHARS)
+
 def canon_name(s: str) -> str:
-    if not s: return ""
-    s = unicodedata.normalize("NFKC", s)
-    s = _ZERO_WIDTH_RE.sub("", s)
-    s = EMOJI_RE.sub("", s)
-    s = s.translate(_CONFUSABLES_MAP)
-    s = s.translate(_LEET_MAP)
-    s = unicodedata.normalize("NFKD", s)
-    s = _strip_combining(s)
-    s = _letters_only(s)
-    s = s.casefold()
-    s = _collapse_runs(s)
-    return s
+    return canon_full(s)
 
 def base_display_name(member: discord.Member | discord.User) -> str:
     base = (
@@ -86,39 +40,13 @@ def discord_names_set(member: discord.Member | discord.User) -> set[str]:
         getattr(member, "name", ""),
         base_display_name(member),
     })
-    return {canon_name(x) for x in names if x}
-
-# Gender aliases
-def _norm_gender(s: str) -> str:
-    s = (s or "").strip().lower()
-    s = re.sub(r'[\s\.\-_\/\\]+', '', s)
-    return s
-
-_MALE_ALIASES_RAW = {"ชาย","ผู้ชาย","male","man","boy","m","เขา","หนุ่ม","ชายแท้","ช"}
-_FEMALE_ALIASES_RAW = {"หญิง","ผู้หญิง","female","woman","girl","f","สาว","หญ","ห"}
-_LGBT_ALIASES_RAW = {"lgbt","lgbtq","lgbtq+","nonbinary","non-binary","nb","enby","trans","genderqueer","bigender","agender","genderfluid","queer","อื่น","เพศทางเลือก"}
-_GENDER_UNDISCLOSED_ALIASES_RAW = {"ไม่ระบุ","ไม่บอก","ไม่อยากเปิดเผย","prefernottosay","undisclosed","unknown","private","secret","na","n/a","-"}
-
-MALE_ALIASES   = {_norm_gender(x) for x in _MALE_ALIASES_RAW}
-FEMALE_ALIASES = {_norm_gender(x) for x in _FEMALE_ALIASES_RAW}
-LGBT_ALIASES   = {_norm_gender(x) for x in _LGBT_ALIASES_RAW}
-GENDER_UNDISCLOSED_ALIASES = {_norm_gender(x) for x in _GENDER_UNDISCLOSED_ALIASES_RAW}
-
-MALE_PREFIXES   = {_norm_gender(x) for x in ["ช","ชา","ชาย","ผู้ช","เพศช","m","ma","man"]}
-FEMALE_PREFIXES = {_norm_gender(x) for x in ["ห","หญ","หญิ","หญิง","ผู้ห","เพศห","f","fe","woman"]}
-
-def resolve_gender_role_id(text: str) -> int:
-    from .config import ROLE_MALE, ROLE_FEMALE, ROLE_LGBT, ROLE_GENDER_UNDISCLOSED
-    t = _norm_gender(text)
-    if t in MALE_ALIASES or any(t.startswith(p) for p in MALE_PREFIXES):
-        return ROLE_MALE
-    if t in FEMALE_ALIASES or any(t.startswith(p) for p in FEMALE_PREFIXES):
-        return ROLE_FEMALE
-    if t in LGBT_ALIASES:
-        return ROLE_LGBT
-    if t in GENDER_UNDISCLOSED_ALIASES:
-        return ROLE_GENDER_UNDISCLOSED
-    return ROLE_GENDER_UNDISCLOSED
+    return set(canon_many(x for x in names if x))
+
+# Gender aliases (shared trie in utils/gender.py)
+_GENDER_ROLES = {MALE: ROLE_MALE, FEMALE: ROLE_FEMALE, LGBT: ROLE_LGBT, UNDISCLOSED: ROLE_GENDER_UNDISCLOSED}
+
+def resolve_gender_role_id(text: str, guild_id: int | None = None) -> int:
+    return _GENDER_ROLES[resolve_gender(text, guild_id)]
 
 # Age handling
 def _norm_simple(s: str) -> str:
@@ -130,38 +58,16 @@ def is_age_undisclosed(text: str) -> bool:
     t = _norm_simple(text)
     return (t == "") or (t in AGE_UNDISCLOSED_ALIASES)
 
+_AGE_INDEX = AgeBracketIndex(AGE_BRACKETS)
+
 def resolve_age_role_id(age_text: str) -> int | None:
-    from .config import (
-        ROLE_0_12, ROLE_13_15, ROLE_16_18, ROLE_19_21, ROLE_22_24, ROLE_25_29, ROLE_30_34,
-        ROLE_35_39, ROLE_40_44, ROLE_45_49, ROLE_50_54, ROLE_55_59, ROLE_60_64, ROLE_65_UP,
-        ROLE_AGE_UNDISCLOSED
-    )
     if is_age_undisclosed(age_text):
         return ROLE_AGE_UNDISCLOSED
     try:
         age = int((age_text or "").strip())
     except ValueError:
         return None
-    slots = [
-        ((0, 12), ROLE_0_12),
-        ((13, 15), ROLE_13_15),
-        ((16, 18), ROLE_16_18),
-        ((19, 21), ROLE_19_21),
-        ((22, 24), ROLE_22_24),
-        ((25, 29), ROLE_25_29),
-        ((30, 34), ROLE_30_34),
-        ((35, 39), ROLE_35_39),
-        ((40, 44), ROLE_40_44),
-        ((45, 49), ROLE_45_49),
-        ((50, 54), ROLE_50_54),
-        ((55, 59), ROLE_55_59),
-        ((60, 64), ROLE_60_64),
-        ((65, 200), ROLE_65_UP),
-    ]
-    for (lo, hi), rid in slots:
-        if lo <= age <= hi and rid > 0:
-            return rid
-    return None
+    return _AGE_INDEX.resolve(age)
 
 # Birthday helpers
 _BDAY_RE = re.compile(r"^\s*(\d{1,2})[\/\.\-](\d{1,2})[\/\.\-](\d{4})\s*$")
@@ -189,14 +95,10 @@ def age_from_birthday(bday: datetime, now_local: datetime | None = None) -> int:
     now_local = now_local or datetime.now(TH_TZ)
     return _years_between(bday, now_local)
 
-# Admin notify
-async def notify_admin(guild: discord.Guild, text: str):
-    try:
-        ch = guild.get_channel(ADMIN_NOTIFY_CHANNEL_ID) or guild.get_channel(APPROVAL_CHANNEL_ID)
-        if ch:
-            await ch.send(f"🔔 **Admin Notice:** {text}")
-    except Exception:
-        pass
+# Admin notify: coalesced into a per-window digest (services/admin_notifier.py); never waits on Discord
+async def notify_admin(guild: discord.Guild, text: str, kind: str = "general", key: str | None = None,
+                       who: str | None = None):
+    admin_notifier.notify(guild, text, kind, key, who)
 
 # Risk
 from datetime import timezone as _dt_timezone
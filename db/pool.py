@@ -1,13 +1,85 @@
-import os, asyncpg
+import os, re, time, asyncio, asyncpg
+from contextlib import asynccontextmanager
 from typing import Optional
-from config import DATABASE_URL
+from utils.metrics import Timing, DB_QUERY_SECONDS, DB_ACQUIRE_SECONDS
+from config import DATABASE_URL, DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_STATEMENT_TIMEOUT_MS, DB_COMMAND_TIMEOUT
 
 _pool: Optional[asyncpg.Pool] = None
+_pool_lock = asyncio.Lock()
+_STATEMENTS: list[str] = []
+
+def statement(q: str) -> str:
+    # register a repo query so every new connection prepares it up front
+    _STATEMENTS.append(q)
+    return q
+
+_acquire_wait = Timing()
+_query_timings: dict[str, Timing] = {}
+
+# Warming means seeding asyncpg's per-connection statement cache, which fetch/execute look up by
+# query text. Only the private Connection._prepare(query, use_cache=True) writes to it; the public
+# prepare() returns a statement the cache never sees. The call is pinned to the releases it was
+# checked against (requirements.txt floor up to 0.32); on any other version connections skip
+# warming and the cache fills on first use, as asyncpg does by default.
+_ASYNCPG_VERSION = tuple(int(x) for x in re.findall(r"\d+", asyncpg.__version__)[:2])
+_CAN_WARM = (0, 29) <= _ASYNCPG_VERSION <= (0, 32)
+
+async def _init_connection(con: asyncpg.Connection) -> None:
+    if not _CAN_WARM: return
+    for q in _STATEMENTS:
+        try:
+            await con._prepare(q, use_cache=True)
+        except asyncpg.PostgresError as e:
+            print(f"⚠️ prepare failed ({e.__class__.__name__}): {q.split()[0:4]}")
+    # _prepare doesn't end with a Sync, so the server keeps the last Parse open as a running statement:
+    # statement_timeout would then cancel the connection's first real query. A simple query closes it.
+    await con.execute("SELECT 1")
 
 async def get_pool() -> asyncpg.Pool:
     global _pool
     if _pool is None:
-        if not DATABASE_URL:
-            raise RuntimeError("DATABASE_URL is not set")
-        _pool = await asyncpg.create_pool(DATABASE_URL, min_size=1, max_size=5)
+        async with _pool_lock:
+            if _pool is None:
+                if not DATABASE_URL:
+                    raise RuntimeError("DATABASE_URL is not set")
+                _pool = await asyncpg.create_pool(
+                    DATABASE_URL, min_size=DB_POOL_MIN_SIZE, max_size=DB_POOL_MAX_SIZE,
+                    command_timeout=DB_COMMAND_TIMEOUT,
+                    server_settings={"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)},
+                    init=_init_connection,
+                )
     return _pool
+
+async def init_pool() -> asyncpg.Pool:
+    # called at startup: opens min_size connections (and prepares statements) before the first interaction
+    return await get_pool()
+
+async def close_pool() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+@asynccontextmanager
+async def acquire(label: str):
+    pool = await get_pool()
+    t0 = time.perf_counter()
+    async with pool.acquire() as con:
+        t1 = time.perf_counter()
+        _acquire_wait.add(t1 - t0)
+        DB_ACQUIRE_SECONDS.labels().observe(t1 - t0)
+        try:
+            yield con
+        finally:
+            held = time.perf_counter() - t1
+            _query_timings.setdefault(label, Timing()).add(held)
+            DB_QUERY_SECONDS.labels(label).observe(held)
+
+def pool_stats() -> dict:
+    stats = {"acquire_wait": _acquire_wait.as_dict(),
+             "queries": {k: v.as_dict() for k, v in sorted(_query_timings.items())}}
+    if _pool is not None:
+        size = _pool.get_size()
+        stats.update(size=size, in_use=size - _pool.get_idle_size(),
+                     min_size=_pool.get_min_size(), max_size=_pool.get_max_size())
+    return stats
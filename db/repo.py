@@ -1,107 +1,457 @@
 from __future__ import annotations
-from typing import Protocol, Optional, Tuple
-from .pool import get_pool
+from datetime import date, datetime
+import json
+from typing import Protocol, Optional, Sequence, Tuple
+from domain.models import VerificationPayload, OutboxEffect
+from config import OUTBOX_LEASE_SECONDS
+from .pool import acquire, statement
 
 class MemberRepo(Protocol):
     async def upsert_member(self, guild_id:int, user_id:int, *, nickname:str|None, age_text:str|None,
-                            gender_text:str|None, birthday_text:str|None) -> None: ...
+                            gender_text:str|None, birthday_text:str|None, birthday:date|None=None) -> None: ...
+    async def list_unparsed_birthdays(self) -> list[tuple[int,int,str]]: ...
+    async def set_birthdays_many(self, rows:list[tuple[int,int,date]]) -> None: ...
 
 class VerifyRepo(Protocol):
     async def insert_request(self, guild_id:int, user_id:int, channel_id:int, message_id:int|None,
                              nickname:str, age_text:str, gender_text:str, birthday_text:str,
                              account_age_days:int|None, account_risk:str|None) -> int: ...
-    async def set_request_status(self, guild_id:int, message_id:int, status:str, decided_by:int) -> None: ...
+    async def set_request_status(self, guild_id:int, message_id:int, status:str, decided_by:int,
+                                 effects:Sequence[OutboxEffect]=()) -> bool: ...
+    async def record_submission(self, guild_id:int, user_id:int, channel_id:int, message_id:int|None,
+                                nickname:str, age_text:str, gender_text:str, birthday_text:str,
+                                account_age_days:int|None, account_risk:str|None, birthday:date|None=None) -> int: ...
+    async def attach_message(self, request_id:int, channel_id:int, message_id:int) -> None: ...
+    async def list_unposted(self, max_age_seconds:float) -> list[tuple[int,VerificationPayload,datetime]]: ...
+    async def cancel_unposted(self, request_id:int) -> Optional[int]: ...
+    async def get_latest_request(self, guild_id:int, user_id:int) -> Optional[VerificationPayload]: ...
+    async def get_by_message(self, guild_id:int, message_id:int) -> Optional[VerificationPayload]: ...
+    async def list_pending(self, max_age_seconds:float) -> list[tuple[int,int,float]]: ...
+    async def has_pending(self, guild_id:int, user_id:int, max_age_seconds:float) -> bool: ...
+    async def cancel_request(self, guild_id:int, message_id:int) -> Optional[int]: ...
 
 class ApprovalIndexRepo(Protocol):
     async def set_latest(self, guild_id:int, user_id:int, channel_id:int, message_id:int) -> None: ...
     async def get_latest(self, guild_id:int, user_id:int) -> Optional[tuple[int,int]]: ...
 
+class SubmissionBatchRepo(Protocol):
+    async def reserve_request_ids(self, n:int) -> list[int]: ...
+    async def write_batch(self, requests:list[tuple], members:list[tuple], index:list[tuple], attaches:list[tuple]) -> None: ...
+
+class OutboxRepo(Protocol):
+    async def claim_due(self, guild_ids:list[int], limit:int, lease_seconds:float) -> list[OutboxEffect]: ...
+    async def complete_many(self, keys:list[str]) -> None: ...
+    async def retry_many(self, rows:list[tuple[str,float,str]]) -> None: ...
+    async def dead_many(self, rows:list[tuple[str,str]]) -> None: ...
+    async def purge_done(self, older_than_seconds:float) -> int: ...
+
+class GenderAliasRepo(Protocol):
+    async def list_all(self) -> list[tuple[int,str,str]]: ...
+
 class AgeRefreshRepo(Protocol):
     async def already_ran(self, guild_id:int, tag:str) -> bool: ...
     async def mark_ran(self, guild_id:int, tag:str) -> None: ...
+    async def crossing_bracket_today(self, guild_id:int, today:date, bracket_starts:list[int]) -> list[tuple[int,date]]: ...
+    async def log_changes_many(self, guild_id:int, rows:list[tuple[int,int|None,int|None]], reason:str) -> None: ...
 
 class HBDRepo(Protocol):
     async def already_sent(self, guild_id:int, user_id:int, date_local:str) -> bool: ...
     async def mark_sent(self, guild_id:int, user_id:int, date_local:str, message_id:int|None) -> None: ...
+    async def born_today_unsent(self, guild_id:int, today:date) -> list[int]: ...
+    async def mark_sent_many(self, guild_id:int, today:date, sent:list[tuple[int,int|None]]) -> None: ...
 
 # Implementations
+_PAYLOAD_COLS = "guild_id,user_id,nickname,age_text,gender_text,birthday_text,account_age_days,account_risk"
+
+def _is_leap(year:int) -> bool:
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+def _row_to_payload(row) -> Optional[VerificationPayload]:
+    if row is None: return None
+    return VerificationPayload(**{k: row[k] for k in _PAYLOAD_COLS.split(",")})
+
 class PgMemberRepo:
-    async def upsert_member(self, guild_id:int, user_id:int, **kw) -> None:
-        q = ("""
-        INSERT INTO members (guild_id,user_id,nickname,age_text,gender_text,birthday_text)
-        VALUES ($1,$2,$3,$4,$5,$6)
+    _Q_UPSERT_MEMBER = statement("""
+        INSERT INTO members (guild_id,user_id,nickname,age_text,gender_text,birthday_text,birthday)
+        VALUES ($1,$2,$3,$4,$5,$6,$7)
         ON CONFLICT (guild_id,user_id)
         DO UPDATE SET nickname=EXCLUDED.nickname,
                       age_text=EXCLUDED.age_text,
                       gender_text=EXCLUDED.gender_text,
                       birthday_text=EXCLUDED.birthday_text,
+                      birthday=EXCLUDED.birthday,
                       updated_at=now();
         """)
-        pool = await get_pool()
-        async with pool.acquire() as con:
-            await con.execute(q, guild_id, user_id, kw.get('nickname'), kw.get('age_text'), kw.get('gender_text'), kw.get('birthday_text'))
+    _Q_LIST_UNPARSED_BIRTHDAYS = statement(
+        "SELECT guild_id, user_id, birthday_text FROM members WHERE birthday IS NULL AND coalesce(birthday_text,'') <> ''")
+    _Q_SET_BIRTHDAYS_MANY = statement("""
+        UPDATE members m SET birthday=t.b
+        FROM UNNEST($1::bigint[], $2::bigint[], $3::date[]) AS t(g,u,b)
+        WHERE m.guild_id=t.g AND m.user_id=t.u
+        """)
+
+    async def upsert_member(self, guild_id:int, user_id:int, **kw) -> None:
+        async with acquire("member.upsert_member") as con:
+            await con.execute(self._Q_UPSERT_MEMBER, guild_id, user_id, kw.get('nickname'), kw.get('age_text'), kw.get('gender_text'), kw.get('birthday_text'), kw.get('birthday'))
+
+    async def list_unparsed_birthdays(self) -> list[tuple[int,int,str]]:
+        async with acquire("member.list_unparsed_birthdays") as con:
+            return [(r['guild_id'], r['user_id'], r['birthday_text']) for r in await con.fetch(self._Q_LIST_UNPARSED_BIRTHDAYS)]
+
+    async def set_birthdays_many(self, rows:list[tuple[int,int,date]]) -> None:
+        if not rows: return
+        g, u, b = zip(*rows)
+        async with acquire("member.set_birthdays_many") as con:
+            await con.execute(self._Q_SET_BIRTHDAYS_MANY, list(g), list(u), list(b))
 
 class PgVerifyRepo:
-    async def insert_request(self, guild_id:int, user_id:int, channel_id:int, message_id:int|None,
-                             nickname:str, age_text:str, gender_text:str, birthday_text:str,
-                             account_age_days:int|None, account_risk:str|None) -> int:
-        q = ("""
+    _Q_INSERT_REQUEST = statement("""
         INSERT INTO verification_requests
           (guild_id,user_id,channel_id,message_id,nickname,age_text,gender_text,birthday_text,account_age_days,account_risk)
         VALUES ($1,$2,$3,$4,$5,$6,$7,$8,$9,$10)
         RETURNING id;
         """)
-        pool = await get_pool()
-        async with pool.acquire() as con:
-            return await con.fetchval(q, guild_id, user_id, channel_id, message_id, nickname, age_text, gender_text, birthday_text, account_age_days, account_risk)
-
-    async def set_request_status(self, guild_id:int, message_id:int, status:str, decided_by:int) -> None:
-        q = ("""
-        UPDATE verification_requests SET status=$1, decided_by=$2, decided_at=now()
-        WHERE guild_id=$3 AND message_id=$4 AND status='SUBMITTED'
+    _Q_RECORD_SUBMISSION = statement("""
+        WITH req AS (
+          INSERT INTO verification_requests
+            (guild_id,user_id,channel_id,message_id,nickname,age_text,gender_text,birthday_text,account_age_days,account_risk)
+          VALUES ($1,$2,$3,$4,$5,$6,$7,$8,$9,$10)
+          RETURNING id
+        ), idx AS (
+          INSERT INTO approval_index (guild_id,user_id,channel_id,message_id)
+          SELECT $1,$2,$3,$4 WHERE $4::bigint IS NOT NULL
+          ON CONFLICT (guild_id,user_id) DO UPDATE SET channel_id=EXCLUDED.channel_id, message_id=EXCLUDED.message_id, created_at=now()
+        ), mem AS (
+          INSERT INTO members (guild_id,user_id,nickname,age_text,gender_text,birthday_text,birthday)
+          VALUES ($1,$2,$5,$6,$7,$8,$11)
+          ON CONFLICT (guild_id,user_id)
+          DO UPDATE SET nickname=EXCLUDED.nickname,
+                        age_text=EXCLUDED.age_text,
+                        gender_text=EXCLUDED.gender_text,
+                        birthday_text=EXCLUDED.birthday_text,
+                        birthday=EXCLUDED.birthday,
+                        updated_at=now()
+        )
+        SELECT id FROM req;
+        """)
+    # the claim and its outbox rows commit together: a winning decision can't lose its side effects.
+    # Rows start leased for $8 seconds so the deciding handler gets the first attempt.
+    _Q_SET_REQUEST_STATUS = statement("""
+        WITH req AS (
+          UPDATE verification_requests SET status=$1, decided_by=$2, decided_at=now()
+          WHERE guild_id=$3 AND message_id=$4 AND status='SUBMITTED'
+          RETURNING id
+        ), fx AS (
+          INSERT INTO outbox (guild_id, kind, dedup_key, payload, next_at)
+          SELECT $3, t.kind, t.k, t.p::jsonb, now() + make_interval(secs => $8)
+          FROM req, UNNEST($5::text[], $6::text[], $7::text[]) AS t(kind, k, p)
+          ON CONFLICT (dedup_key) DO NOTHING
+        )
+        SELECT id FROM req
+        """)
+    # background post finished: the request becomes addressable by its approval message
+    _Q_ATTACH_MESSAGE = statement("""
+        WITH req AS (
+          UPDATE verification_requests SET channel_id=$2, message_id=$3
+          WHERE id=$1 AND message_id IS NULL
+          RETURNING guild_id, user_id
+        )
+        INSERT INTO approval_index (guild_id,user_id,channel_id,message_id)
+        SELECT guild_id, user_id, $2, $3 FROM req
+        ON CONFLICT (guild_id,user_id) DO UPDATE SET channel_id=EXCLUDED.channel_id, message_id=EXCLUDED.message_id, created_at=now()
+        """)
+    _Q_LIST_UNPOSTED = statement(f"""
+        SELECT id, sent_at, {_PAYLOAD_COLS} FROM verification_requests
+        WHERE status='SUBMITTED' AND message_id IS NULL AND sent_at > now() - make_interval(secs => $1)
+        ORDER BY id
         """)
-        pool = await get_pool()
-        async with pool.acquire() as con:
-            await con.execute(q, status, decided_by, guild_id, message_id)
+    _Q_CANCEL_UNPOSTED = statement("""
+        UPDATE verification_requests SET status='CANCELLED', decided_at=now()
+        WHERE id=$1 AND message_id IS NULL AND status='SUBMITTED'
+        RETURNING user_id
+        """)
+    _Q_GET_LATEST_REQUEST = statement(f"SELECT {_PAYLOAD_COLS} FROM verification_requests WHERE guild_id=$1 AND user_id=$2 ORDER BY id DESC LIMIT 1")
+    _Q_GET_BY_MESSAGE = statement(f"SELECT {_PAYLOAD_COLS} FROM verification_requests WHERE guild_id=$1 AND message_id=$2 ORDER BY id DESC LIMIT 1")
+    _Q_LIST_PENDING = statement("""
+        SELECT guild_id, user_id, EXTRACT(EPOCH FROM now() - sent_at)::float8 AS age
+        FROM verification_requests
+        WHERE status='SUBMITTED' AND sent_at > now() - make_interval(secs => $1)
+        """)
+    _Q_HAS_PENDING = statement("""
+        SELECT EXISTS (SELECT 1 FROM verification_requests
+                       WHERE guild_id=$1 AND user_id=$2 AND status='SUBMITTED' AND sent_at > now() - make_interval(secs => $3))
+        """)
+    _Q_CANCEL_REQUEST = statement("""
+        UPDATE verification_requests SET status='CANCELLED', decided_at=now()
+        WHERE guild_id=$1 AND message_id=$2 AND status='SUBMITTED'
+        RETURNING user_id
+        """)
+
+    async def insert_request(self, guild_id:int, user_id:int, channel_id:int, message_id:int|None,
+                             nickname:str, age_text:str, gender_text:str, birthday_text:str,
+                             account_age_days:int|None, account_risk:str|None) -> int:
+        async with acquire("verify.insert_request") as con:
+            return await con.fetchval(self._Q_INSERT_REQUEST, guild_id, user_id, channel_id, message_id, nickname, age_text, gender_text, birthday_text, account_age_days, account_risk)
+
+    async def record_submission(self, guild_id:int, user_id:int, channel_id:int, message_id:int|None,
+                                nickname:str, age_text:str, gender_text:str, birthday_text:str,
+                                account_age_days:int|None, account_risk:str|None, birthday:date|None=None) -> int:
+        # request + approval_index + members in one statement: one acquire, one round trip, atomic
+        async with acquire("verify.record_submission") as con:
+            return await con.fetchval(self._Q_RECORD_SUBMISSION, guild_id, user_id, channel_id, message_id, nickname, age_text, gender_text, birthday_text, account_age_days, account_risk, birthday)
+
+    async def set_request_status(self, guild_id:int, message_id:int, status:str, decided_by:int,
+                                 effects:Sequence[OutboxEffect]=()) -> bool:
+        # conditional claim: only the first decision on a SUBMITTED row gets a row back (and writes the outbox)
+        kinds = [e.kind for e in effects]
+        keys = [e.dedup_key for e in effects]
+        payloads = [json.dumps(e.payload, ensure_ascii=False) for e in effects]
+        async with acquire("verify.set_request_status") as con:
+            return await con.fetchval(self._Q_SET_REQUEST_STATUS, status, decided_by, guild_id, message_id,
+                                      kinds, keys, payloads, float(OUTBOX_LEASE_SECONDS)) is not None
+
+    async def attach_message(self, request_id:int, channel_id:int, message_id:int) -> None:
+        async with acquire("verify.attach_message") as con:
+            await con.execute(self._Q_ATTACH_MESSAGE, request_id, channel_id, message_id)
+
+    async def list_unposted(self, max_age_seconds:float) -> list[tuple[int,VerificationPayload,datetime]]:
+        # submissions acknowledged to the user whose approval message was never posted (crash/restart)
+        async with acquire("verify.list_unposted") as con:
+            rows = await con.fetch(self._Q_LIST_UNPOSTED, float(max_age_seconds))
+            return [(r['id'], _row_to_payload(r), r['sent_at']) for r in rows]
+
+    async def cancel_unposted(self, request_id:int) -> Optional[int]:
+        async with acquire("verify.cancel_unposted") as con:
+            return await con.fetchval(self._Q_CANCEL_UNPOSTED, request_id)
+
+    async def get_latest_request(self, guild_id:int, user_id:int) -> Optional[VerificationPayload]:
+        # served by vr_guild_user_idx (guild_id, user_id, id DESC)
+        async with acquire("verify.get_latest_request") as con:
+            return _row_to_payload(await con.fetchrow(self._Q_GET_LATEST_REQUEST, guild_id, user_id))
+
+    async def get_by_message(self, guild_id:int, message_id:int) -> Optional[VerificationPayload]:
+        # served by vr_msg_idx (guild_id, message_id)
+        async with acquire("verify.get_by_message") as con:
+            return _row_to_payload(await con.fetchrow(self._Q_GET_BY_MESSAGE, guild_id, message_id))
+
+    async def list_pending(self, max_age_seconds:float) -> list[tuple[int,int,float]]:
+        # served by the partial index vr_pending_idx
+        async with acquire("verify.list_pending") as con:
+            rows = await con.fetch(self._Q_LIST_PENDING, float(max_age_seconds))
+            return [(r['guild_id'], r['user_id'], r['age']) for r in rows]
+
+    async def has_pending(self, guild_id:int, user_id:int, max_age_seconds:float) -> bool:
+        # PendingRegistry fallback once it has evicted live entries; served by vr_guild_user_idx
+        async with acquire("verify.has_pending") as con:
+            return await con.fetchval(self._Q_HAS_PENDING, guild_id, user_id, float(max_age_seconds))
+
+    async def cancel_request(self, guild_id:int, message_id:int) -> Optional[int]:
+        async with acquire("verify.cancel_request") as con:
+            return await con.fetchval(self._Q_CANCEL_REQUEST, guild_id, message_id)
 
 class PgApprovalIndexRepo:
-    async def set_latest(self, guild_id:int, user_id:int, channel_id:int, message_id:int) -> None:
-        q = ("""
+    _Q_SET_LATEST = statement("""
         INSERT INTO approval_index (guild_id,user_id,channel_id,message_id)
         VALUES ($1,$2,$3,$4)
         ON CONFLICT (guild_id,user_id) DO UPDATE SET channel_id=EXCLUDED.channel_id, message_id=EXCLUDED.message_id, created_at=now();
         """)
-        pool = await get_pool()
-        async with pool.acquire() as con:
-            await con.execute(q, guild_id, user_id, channel_id, message_id)
+    _Q_GET_LATEST = statement("SELECT channel_id, message_id FROM approval_index WHERE guild_id=$1 AND user_id=$2")
+
+    async def set_latest(self, guild_id:int, user_id:int, channel_id:int, message_id:int) -> None:
+        async with acquire("approvalindex.set_latest") as con:
+            await con.execute(self._Q_SET_LATEST, guild_id, user_id, channel_id, message_id)
 
     async def get_latest(self, guild_id:int, user_id:int):
-        q = "SELECT channel_id, message_id FROM approval_index WHERE guild_id=$1 AND user_id=$2"
-        pool = await get_pool()
-        async with pool.acquire() as con:
-            row = await con.fetchrow(q, guild_id, user_id)
+        async with acquire("approvalindex.get_latest") as con:
+            row = await con.fetchrow(self._Q_GET_LATEST, guild_id, user_id)
             return (row['channel_id'], row['message_id']) if row else None
 
+# column order of the tuples services/write_behind.py buffers
+REQUEST_COPY_COLUMNS = ("id", "guild_id", "user_id", "channel_id", "message_id", "nickname", "age_text", "gender_text",
+                        "birthday_text", "account_age_days", "account_risk", "sent_at")
+
+class PgSubmissionBatchRepo:
+    # ids come from the table's own sequence in blocks, so buffered requests have their id before the INSERT
+    _Q_RESERVE_IDS = statement(
+        "SELECT nextval(pg_get_serial_sequence('verification_requests','id')) FROM generate_series(1, $1)")
+    _Q_UPSERT_MEMBERS_MANY = statement("""
+        INSERT INTO members (guild_id,user_id,nickname,age_text,gender_text,birthday_text,birthday)
+        SELECT * FROM UNNEST($1::bigint[], $2::bigint[], $3::text[], $4::text[], $5::text[], $6::text[], $7::date[])
+        ON CONFLICT (guild_id,user_id)
+        DO UPDATE SET nickname=EXCLUDED.nickname,
+                      age_text=EXCLUDED.age_text,
+                      gender_text=EXCLUDED.gender_text,
+                      birthday_text=EXCLUDED.birthday_text,
+                      birthday=EXCLUDED.birthday,
+                      updated_at=now()
+        """)
+    _Q_SET_INDEX_MANY = statement("""
+        INSERT INTO approval_index (guild_id,user_id,channel_id,message_id)
+        SELECT * FROM UNNEST($1::bigint[], $2::bigint[], $3::bigint[], $4::bigint[])
+        ON CONFLICT (guild_id,user_id) DO UPDATE SET channel_id=EXCLUDED.channel_id, message_id=EXCLUDED.message_id, created_at=now()
+        """)
+    # attach_message for requests written by an earlier flush
+    _Q_ATTACH_MANY = statement("""
+        WITH req AS (
+          UPDATE verification_requests v SET channel_id=t.c, message_id=t.m
+          FROM UNNEST($1::bigint[], $2::bigint[], $3::bigint[]) AS t(id,c,m)
+          WHERE v.id=t.id AND v.message_id IS NULL
+          RETURNING v.id, v.guild_id, v.user_id, t.c, t.m
+        )
+        INSERT INTO approval_index (guild_id,user_id,channel_id,message_id)
+        SELECT DISTINCT ON (guild_id,user_id) guild_id, user_id, c, m FROM req ORDER BY guild_id, user_id, id DESC
+        ON CONFLICT (guild_id,user_id) DO UPDATE SET channel_id=EXCLUDED.channel_id, message_id=EXCLUDED.message_id, created_at=now()
+        """)
+
+    async def reserve_request_ids(self, n:int) -> list[int]:
+        async with acquire("batch.reserve_request_ids") as con:
+            return [r[0] for r in await con.fetch(self._Q_RESERVE_IDS, n)]
+
+    async def write_batch(self, requests:list[tuple], members:list[tuple], index:list[tuple], attaches:list[tuple]) -> None:
+        # one transaction: COPY for the plain inserts, UNNEST for the upserts and updates
+        async with acquire("batch.write_batch") as con:
+            async with con.transaction():
+                if requests:
+                    await con.copy_records_to_table("verification_requests", records=requests, columns=REQUEST_COPY_COLUMNS)
+                if members:
+                    await con.execute(self._Q_UPSERT_MEMBERS_MANY, *map(list, zip(*members)))
+                if index:
+                    await con.execute(self._Q_SET_INDEX_MANY, *map(list, zip(*index)))
+                if attaches:
+                    await con.execute(self._Q_ATTACH_MANY, *map(list, zip(*attaches)))
+
+class PgOutboxRepo:
+    # SKIP LOCKED + lease: cluster processes share the table without running a row twice
+    _Q_CLAIM_DUE = statement("""
+        UPDATE outbox o SET attempts=o.attempts+1, next_at=now() + make_interval(secs => $3)
+        WHERE o.id IN (
+          SELECT id FROM outbox
+          WHERE done_at IS NULL AND next_at <= now() AND guild_id = ANY($1::bigint[])
+          ORDER BY next_at LIMIT $2
+          FOR UPDATE SKIP LOCKED)
+        RETURNING o.guild_id, o.kind, o.dedup_key, o.payload, o.attempts
+        """)
+    _Q_COMPLETE_MANY = statement("UPDATE outbox SET done_at=now(), last_error=NULL WHERE dedup_key = ANY($1::text[]) AND done_at IS NULL")
+    _Q_RETRY_MANY = statement("""
+        UPDATE outbox o SET next_at=now() + make_interval(secs => t.d), last_error=t.e
+        FROM UNNEST($1::text[], $2::float8[], $3::text[]) AS t(k,d,e)
+        WHERE o.dedup_key=t.k AND o.done_at IS NULL
+        """)
+    _Q_DEAD_MANY = statement("""
+        UPDATE outbox o SET done_at=now(), dead=true, last_error=t.e
+        FROM UNNEST($1::text[], $2::text[]) AS t(k,e)
+        WHERE o.dedup_key=t.k AND o.done_at IS NULL
+        """)
+    _Q_PURGE_DONE = statement("""
+        WITH d AS (DELETE FROM outbox WHERE done_at < now() - make_interval(secs => $1) RETURNING 1)
+        SELECT count(*) FROM d
+        """)
+
+    async def claim_due(self, guild_ids:list[int], limit:int, lease_seconds:float) -> list[OutboxEffect]:
+        async with acquire("outbox.claim_due") as con:
+            rows = await con.fetch(self._Q_CLAIM_DUE, guild_ids, limit, float(lease_seconds))
+            return [OutboxEffect(r['kind'], r['dedup_key'], json.loads(r['payload']), r['guild_id'], r['attempts']) for r in rows]
+
+    async def complete_many(self, keys:list[str]) -> None:
+        if not keys: return
+        async with acquire("outbox.complete_many") as con:
+            await con.execute(self._Q_COMPLETE_MANY, keys)
+
+    async def retry_many(self, rows:list[tuple[str,float,str]]) -> None:
+        if not rows: return
+        keys, delays, errors = zip(*rows)
+        async with acquire("outbox.retry_many") as con:
+            await con.execute(self._Q_RETRY_MANY, list(keys), list(delays), list(errors))
+
+    async def dead_many(self, rows:list[tuple[str,str]]) -> None:
+        if not rows: return
+        keys, errors = zip(*rows)
+        async with acquire("outbox.dead_many") as con:
+            await con.execute(self._Q_DEAD_MANY, list(keys), list(errors))
+
+    async def purge_done(self, older_than_seconds:float) -> int:
+        async with acquire("outbox.purge_done") as con:
+            return await con.fetchval(self._Q_PURGE_DONE, float(older_than_seconds))
+
+class PgGenderAliasRepo:
+    _Q_LIST_ALL = statement("SELECT guild_id, alias, category FROM gender_aliases")
+
+    async def list_all(self) -> list[tuple[int,str,str]]:
+        async with acquire("genderalias.list_all") as con:
+            return [(r['guild_id'], r['alias'], r['category']) for r in await con.fetch(self._Q_LIST_ALL)]
+
 class PgAgeRefreshRepo:
+    _Q_ALREADY_RAN = statement("SELECT 1 FROM age_refresh_runs WHERE guild_id=$1 AND tag=$2")
+    _Q_MARK_RAN = statement("INSERT INTO age_refresh_runs (guild_id, tag) VALUES ($1,$2) ON CONFLICT DO NOTHING")
+    # birthdays today (members_bday_md_idx) whose new age is the first year of a bracket
+    _Q_CROSSING_BRACKET_TODAY = statement("""
+        SELECT user_id, birthday FROM members
+        WHERE guild_id=$1 AND birthday IS NOT NULL
+          AND ((EXTRACT(MONTH FROM birthday)::int = $2 AND EXTRACT(DAY FROM birthday)::int = $3)
+               OR ($4 AND EXTRACT(MONTH FROM birthday)::int = 2 AND EXTRACT(DAY FROM birthday)::int = 29))
+          AND $5 - EXTRACT(YEAR FROM birthday)::int = ANY($6::int[])
+        """)
+    _Q_LOG_CHANGES_MANY = statement("""
+        INSERT INTO age_role_changes (guild_id,user_id,old_role,new_role,reason)
+        SELECT $1, t.u, t.o, t.n, $5 FROM UNNEST($2::bigint[], $3::bigint[], $4::bigint[]) AS t(u,o,n)
+        """)
+
     async def already_ran(self, guild_id:int, tag:str) -> bool:
-        q = "SELECT 1 FROM age_refresh_runs WHERE guild_id=$1 AND tag=$2"
-        pool = await get_pool()
-        async with pool.acquire() as con:
-            return (await con.fetchrow(q, guild_id, tag)) is not None
+        async with acquire("agerefresh.already_ran") as con:
+            return (await con.fetchrow(self._Q_ALREADY_RAN, guild_id, tag)) is not None
     async def mark_ran(self, guild_id:int, tag:str) -> None:
-        q = "INSERT INTO age_refresh_runs (guild_id, tag) VALUES ($1,$2) ON CONFLICT DO NOTHING"
-        pool = await get_pool()
-        async with pool.acquire() as con:
-            await con.execute(q, guild_id, tag)
+        async with acquire("agerefresh.mark_ran") as con:
+            await con.execute(self._Q_MARK_RAN, guild_id, tag)
+
+    async def crossing_bracket_today(self, guild_id:int, today:date, bracket_starts:list[int]) -> list[tuple[int,date]]:
+        # Feb-29 birthdays turn a year older on Mar 1 in common years (see years_between)
+        leap_catchup = today.month == 3 and today.day == 1 and not _is_leap(today.year)
+        async with acquire("agerefresh.crossing_bracket_today") as con:
+            rows = await con.fetch(self._Q_CROSSING_BRACKET_TODAY, guild_id, today.month, today.day, leap_catchup, today.year, bracket_starts)
+            return [(r['user_id'], r['birthday']) for r in rows]
+
+    async def log_changes_many(self, guild_id:int, rows:list[tuple[int,int|None,int|None]], reason:str) -> None:
+        if not rows: return
+        users, old, new = zip(*rows)
+        async with acquire("agerefresh.log_changes_many") as con:
+            await con.execute(self._Q_LOG_CHANGES_MANY, guild_id, list(users), list(old), list(new), reason)
 
 class PgHBDRepo:
+    _Q_ALREADY_SENT = statement("SELECT 1 FROM hbd_sent WHERE guild_id=$1 AND user_id=$2 AND date_local=$3")
+    _Q_MARK_SENT = statement("INSERT INTO hbd_sent (guild_id,user_id,date_local,message_id) VALUES ($1,$2,$3,$4) ON CONFLICT DO NOTHING")
+    # served by members_bday_md_idx; the anti-join drops anyone already greeted today
+    _Q_BORN_TODAY_UNSENT = statement("""
+        SELECT m.user_id FROM members m
+        WHERE m.guild_id=$1 AND m.birthday IS NOT NULL
+          AND EXTRACT(MONTH FROM m.birthday)::int = $2
+          AND EXTRACT(DAY FROM m.birthday)::int = ANY($3::int[])
+          AND NOT EXISTS (SELECT 1 FROM hbd_sent h WHERE h.guild_id=m.guild_id AND h.user_id=m.user_id AND h.date_local=$4)
+          -- members holds every submitter; only greet those who were approved
+          AND EXISTS (SELECT 1 FROM verification_requests v
+                      WHERE v.guild_id=m.guild_id AND v.user_id=m.user_id AND v.status='APPROVED')
+        """)
+    _Q_MARK_SENT_MANY = statement("""
+        INSERT INTO hbd_sent (guild_id,user_id,date_local,message_id)
+        SELECT $1, t.u, $2, t.m FROM UNNEST($3::bigint[], $4::bigint[]) AS t(u,m)
+        ON CONFLICT DO NOTHING
+        """)
+
     async def already_sent(self, guild_id:int, user_id:int, date_local:str) -> bool:
-        q = "SELECT 1 FROM hbd_sent WHERE guild_id=$1 AND user_id=$2 AND date_local=$3"
-        pool = await get_pool()
-        async with pool.acquire() as con:
-            return (await con.fetchrow(q, guild_id, user_id, date_local)) is not None
+        async with acquire("hbd.already_sent") as con:
+            return (await con.fetchrow(self._Q_ALREADY_SENT, guild_id, user_id, date_local)) is not None
     async def mark_sent(self, guild_id:int, user_id:int, date_local:str, message_id:int|None) -> None:
-        q = "INSERT INTO hbd_sent (guild_id,user_id,date_local,message_id) VALUES ($1,$2,$3,$4) ON CONFLICT DO NOTHING"
-        pool = await get_pool()
-        async with pool.acquire() as con:
-            await con.execute(q, guild_id, user_id, date_local, message_id)
+        async with acquire("hbd.mark_sent") as con:
+            await con.execute(self._Q_MARK_SENT, guild_id, user_id, date_local, message_id)
+
+    async def born_today_unsent(self, guild_id:int, today:date) -> list[int]:
+        days = [today.day]
+        if today.month == 2 and today.day == 28 and not _is_leap(today.year):
+            days.append(29)  # Feb-29 birthdays are celebrated on the 28th in common years
+        async with acquire("hbd.born_today_unsent") as con:
+            return [r['user_id'] for r in await con.fetch(self._Q_BORN_TODAY_UNSENT, guild_id, today.month, days, today)]
+
+    async def mark_sent_many(self, guild_id:int, today:date, sent:list[tuple[int,int|None]]) -> None:
+        if not sent: return
+        users, messages = zip(*sent)
+        async with acquire("hbd.mark_sent_many") as con:
+            await con.execute(self._Q_MARK_SENT_MANY, guild_id, today, list(users), list(messages))
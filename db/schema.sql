@@ -10,6 +10,12 @@ CREATE TABLE IF NOT EXISTS members (
   PRIMARY KEY (guild_id, user_id)
 );
 
+-- parsed birthday_text; drives the birthday / age-refresh daemons
+ALTER TABLE members ADD COLUMN IF NOT EXISTS birthday DATE;
+CREATE INDEX IF NOT EXISTS members_bday_md_idx
+  ON members (guild_id, (EXTRACT(MONTH FROM birthday)::int), (EXTRACT(DAY FROM birthday)::int))
+  WHERE birthday IS NOT NULL;
+
 CREATE TABLE IF NOT EXISTS verification_requests (
   id               BIGSERIAL PRIMARY KEY,
   guild_id         BIGINT NOT NULL,
@@ -29,6 +35,7 @@ CREATE TABLE IF NOT EXISTS verification_requests (
 );
 CREATE INDEX IF NOT EXISTS vr_guild_user_idx ON verification_requests(guild_id, user_id, id DESC);
 CREATE INDEX IF NOT EXISTS vr_msg_idx ON verification_requests(guild_id, message_id);
+CREATE INDEX IF NOT EXISTS vr_pending_idx ON verification_requests(sent_at) WHERE status='SUBMITTED';
 
 CREATE TABLE IF NOT EXISTS approval_index (
   guild_id   BIGINT NOT NULL,
@@ -39,6 +46,14 @@ CREATE TABLE IF NOT EXISTS approval_index (
   PRIMARY KEY (guild_id, user_id)
 );
 
+-- per-guild additions to the built-in gender aliases (utils/gender.py)
+CREATE TABLE IF NOT EXISTS gender_aliases (
+  guild_id BIGINT NOT NULL,
+  alias    TEXT   NOT NULL,
+  category TEXT   NOT NULL CHECK (category IN ('male','female','lgbt','undisclosed')),
+  PRIMARY KEY (guild_id, alias)
+);
+
 CREATE TABLE IF NOT EXISTS age_refresh_runs (
   guild_id BIGINT NOT NULL,
   tag      TEXT   NOT NULL,
@@ -64,3 +79,50 @@ CREATE TABLE IF NOT EXISTS age_role_changes (
   reason    TEXT,
   at        TIMESTAMPTZ NOT NULL DEFAULT now()
 );
+
+-- Discord side effects of an approve/reject (roles, DM, message edit), written in the same statement
+-- as the status change and drained by tasks/outbox_dispatcher.py until they succeed
+CREATE TABLE IF NOT EXISTS outbox (
+  id          BIGSERIAL PRIMARY KEY,
+  guild_id    BIGINT NOT NULL,
+  kind        TEXT   NOT NULL,
+  dedup_key   TEXT   NOT NULL UNIQUE,
+  payload     JSONB  NOT NULL,
+  attempts    INT    NOT NULL DEFAULT 0,
+  next_at     TIMESTAMPTZ NOT NULL DEFAULT now(),
+  last_error  TEXT,
+  created_at  TIMESTAMPTZ NOT NULL DEFAULT now(),
+  done_at     TIMESTAMPTZ,
+  dead        BOOLEAN NOT NULL DEFAULT false
+);
+CREATE INDEX IF NOT EXISTS outbox_due_idx ON outbox(next_at) WHERE done_at IS NULL;
+
+-- cross-process invalidation (services/invalidation.py LISTENs on saltybot_invalidate)
+CREATE OR REPLACE FUNCTION saltybot_notify_request() RETURNS trigger AS $$
+BEGIN
+  PERFORM pg_notify('saltybot_invalidate', json_build_object(
+    'kind', 'request', 'guild_id', NEW.guild_id, 'user_id', NEW.user_id,
+    'message_id', NEW.message_id, 'status', NEW.status)::text);
+  RETURN NULL;
+END $$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS vr_status_notify ON verification_requests;
+CREATE TRIGGER vr_status_notify AFTER UPDATE OF status ON verification_requests
+  FOR EACH ROW WHEN (OLD.status IS DISTINCT FROM NEW.status)
+  EXECUTE FUNCTION saltybot_notify_request();
+
+-- new submissions too, so other processes' PendingRegistry sees them without waiting for a warm()
+DROP TRIGGER IF EXISTS vr_insert_notify ON verification_requests;
+CREATE TRIGGER vr_insert_notify AFTER INSERT ON verification_requests
+  FOR EACH ROW WHEN (NEW.status = 'SUBMITTED')
+  EXECUTE FUNCTION saltybot_notify_request();
+
+CREATE OR REPLACE FUNCTION saltybot_notify_aliases() RETURNS trigger AS $$
+BEGIN
+  PERFORM pg_notify('saltybot_invalidate', json_build_object('kind', 'aliases')::text);
+  RETURN NULL;
+END $$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS gender_aliases_notify ON gender_aliases;
+CREATE TRIGGER gender_aliases_notify AFTER INSERT OR UPDATE OR DELETE ON gender_aliases
+  FOR EACH STATEMENT EXECUTE FUNCTION saltybot_notify_aliases();
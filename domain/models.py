@@ -11,3 +11,11 @@ class VerificationPayload:
     birthday_text: str
     account_age_days: Optional[int]
     account_risk: Optional[str]
+
+@dataclass
+class OutboxEffect:
+    kind: str
+    dedup_key: str
+    payload: dict
+    guild_id: int = 0
+    attempts: int = 0
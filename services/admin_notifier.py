@@ -0,0 +1,134 @@
+import asyncio
+from typing import Optional
+import discord
+from config import NOTIFY_WINDOW_SECONDS, NOTIFY_MAX_LINES, NOTIFY_MAX_EVENTS
+from core.config import ADMIN_NOTIFY_CHANNEL_ID, APPROVAL_CHANNEL_ID  # env-overridable, as notify_admin always used
+from services.rest_scheduler import rest, channel_route, PRIORITY_BACKGROUND
+from utils.metrics import ADMIN_NOTICES_TOTAL
+
+# Admin notices are coalesced per guild and kind over NOTIFY_WINDOW_SECONDS and posted as one
+# embed per guild per window, so a raid costs one message instead of one per event. Repeats
+# (same key) are counted rather than stored, except for `who` (usually a mention), which is kept
+# per line so a coalesced notice still names everyone it covers. Distinct lines are capped per kind
+# and in total, and anything beyond the caps only bumps a counter. UNCAPPED_KINDS skip the per-kind
+# cap and spill into extra fields/embeds instead of being truncated. notify() never awaits.
+KIND_TITLES = {
+    "risk": "⚠️ High-risk accounts / บัญชีความเสี่ยงสูง",
+    "error": "❌ Errors / ข้อผิดพลาด",
+    "config": "⚙️ Configuration / การตั้งค่า",
+    "outbox": "📮 Unfinished actions / รายการที่ทำไม่สำเร็จ",
+    "general": "🔔 Notices / แจ้งเตือน",
+}
+UNCAPPED_KINDS = {"risk"}  # every flagged account is named; only max_events bounds them
+_FIELD_MAX = 1024
+_EMBED_BUDGET = 5500  # Discord allows 6000 chars per embed; leave room for title and footer
+_WHO_PER_LINE = 10
+
+class _Bucket:
+    __slots__ = ("count", "lines")
+    def __init__(self):
+        self.count = 0
+        self.lines: dict[str, list] = {}  # key -> [text, repeats, whos]
+
+class AdminNotifier:
+    def __init__(self, window:float=30.0, max_lines:int=10, max_events:int=2000):
+        self.window = window
+        self.max_lines = max(max_lines, 1)
+        self.max_events = max(max_events, 1)
+        self._pending: dict[int, tuple[discord.Guild, dict[str, _Bucket]]] = {}
+        self._stored = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        await self.flush()
+
+    def notify(self, guild: discord.Guild, text: str, kind: str = "general", key: Optional[str] = None,
+               who: Optional[str] = None) -> None:
+        ADMIN_NOTICES_TOTAL.labels(kind).inc()
+        entry = self._pending.get(guild.id)
+        if entry is None:
+            entry = self._pending[guild.id] = (guild, {})
+        bucket = entry[1].get(kind)
+        if bucket is None:
+            bucket = entry[1][kind] = _Bucket()
+        bucket.count += 1
+        key = key or text
+        line = bucket.lines.get(key)
+        cap = self.max_events if kind in UNCAPPED_KINDS else self.max_lines
+        if line is None and len(bucket.lines) < cap and self._stored < self.max_events:
+            line = bucket.lines[key] = [text, 0, []]
+            self._stored += 1
+        if line is not None:
+            line[1] += 1
+            if who and self._stored < self.max_events:
+                line[2].append(who)
+                self._stored += 1
+        self.start()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.window)
+            await self.flush()
+
+    async def flush(self) -> None:
+        pending, self._pending, self._stored = self._pending, {}, 0
+        for guild, buckets in pending.values():
+            ch = guild.get_channel(ADMIN_NOTIFY_CHANNEL_ID) or guild.get_channel(APPROVAL_CHANNEL_ID)
+            if ch is None: continue
+            for embed in self.digest(buckets):
+                try:
+                    await rest.submit(channel_route(ch), lambda embed=embed: ch.send(embed=embed), priority=PRIORITY_BACKGROUND)
+                except Exception as e:
+                    print(f"⚠️ admin notice to guild {guild.id} failed: {e!r}")
+                    break
+
+    def digest(self, buckets: dict[str, _Bucket]) -> list[discord.Embed]:
+        total = sum(b.count for b in buckets.values())
+        fields: list[tuple[str, str]] = []
+        for kind, b in buckets.items():
+            lines = []
+            for text, n, whos in b.lines.values():
+                lines.append(f"• {text}" + (f" ×{n}" if n > 1 else ""))
+                for i in range(0, len(whos), _WHO_PER_LINE):
+                    lines.append("  " + " ".join(whos[i:i + _WHO_PER_LINE]))
+            rest_count = b.count - sum(n for _, n, _ in b.lines.values())
+            if rest_count:
+                lines.append(f"… และอีก {rest_count} รายการ")
+            title = KIND_TITLES.get(kind, kind)
+            values = _chunks(lines) if kind in UNCAPPED_KINDS else [_clip("\n".join(lines))]
+            fields += [(f"{title} ×{b.count}" if i == 0 else f"{title} (ต่อ)", v or "—") for i, v in enumerate(values or [""])]
+
+        embeds: list[discord.Embed] = []
+        size = 0
+        for name, value in fields:
+            if not embeds or len(embeds[-1].fields) >= 25 or size + len(name) + len(value) > _EMBED_BUDGET:
+                embeds.append(discord.Embed(title=f"🔔 Admin Notice ({total})", color=discord.Color.gold()))
+                embeds[-1].set_footer(text=f"สรุปทุก {self.window:g} วินาที")
+                size = 0
+            embeds[-1].add_field(name=name, value=value, inline=False)
+            size += len(name) + len(value)
+        return embeds
+
+def _clip(value:str) -> str:
+    return value if len(value) <= _FIELD_MAX else value[:_FIELD_MAX - 3] + "..."
+
+def _chunks(lines:list[str]) -> list[str]:
+    # pack whole lines into field-sized values; a single oversized line is clipped
+    out, cur = [], ""
+    for line in lines:
+        line = _clip(line)
+        if cur and len(cur) + 1 + len(line) > _FIELD_MAX:
+            out.append(cur); cur = line
+        else:
+            cur = f"{cur}\n{line}" if cur else line
+    if cur: out.append(cur)
+    return out
+
+admin_notifier = AdminNotifier(NOTIFY_WINDOW_SECONDS, NOTIFY_MAX_LINES, NOTIFY_MAX_EVENTS)
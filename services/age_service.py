@@ -1,19 +1,19 @@
 import discord
+from config import AGE_ROLE_IDS_ALL
+from services.rest_scheduler import PRIORITY_BACKGROUND
+from utils.roles import current_role_ids, replace_in_group, apply_role_ids
 from utils.validators import resolve_age_role_id, age_from_birthday
 
 class AgeService:
-    async def sync_age_role_from_birthday(self, guild: discord.Guild, member: discord.Member, bday_dt):
-        years = age_from_birthday(bday_dt)
+    async def sync_age_role_from_birthday(self, guild: discord.Guild, member: discord.Member, bday_dt, now_local=None):
+        years = age_from_birthday(bday_dt, now_local)
         rid = resolve_age_role_id(str(years))
         role = guild.get_role(rid) if rid else None
         if not role:
             return False, "no mapped role"
-        to_remove = [r for r in member.roles if r.id != role.id and r.name and 'ปี' in r.name]  # heuristic; adjust to AGE_ROLE_IDS_ALL if imported
+        target = replace_in_group(current_role_ids(member), AGE_ROLE_IDS_ALL, role.id)
         try:
-            if to_remove:
-                await member.remove_roles(*to_remove, reason=f"Birthday update → now {years}")
-            if role not in member.roles:
-                await member.add_roles(role, reason=f"Birthday update → now {years}")
+            await apply_role_ids(member, target, reason=f"Birthday update → now {years}", priority=PRIORITY_BACKGROUND)
             return True, role.name
         except discord.Forbidden:
             return False, "forbidden"
@@ -1,2 +1,19 @@
 from config import BIRTHDAY_HIDDEN_TEXT
-# Placeholder for future business logic; current logic lives in tasks/birthday_daemon.py
+
+HBD_HEADER = "🎂 **สุขสันต์วันเกิด!** ขอให้มีความสุขมาก ๆ นะ 🎉"
+_MAX_MESSAGE_LEN = 2000
+
+def build_hbd_messages(user_ids: list[int]) -> list[tuple[str, list[int]]]:
+    # group mentions into as few messages as Discord's length limit allows
+    out: list[tuple[str, list[int]]] = []
+    text, chunk = HBD_HEADER, []
+    for uid in user_ids:
+        mention = f" <@{uid}>"
+        if chunk and len(text) + len(mention) > _MAX_MESSAGE_LEN:
+            out.append((text, chunk))
+            text, chunk = HBD_HEADER, []
+        text += mention
+        chunk.append(uid)
+    if chunk:
+        out.append((text, chunk))
+    return out
@@ -0,0 +1,76 @@
+import asyncio, json
+from typing import Awaitable, Callable, Optional
+import asyncpg
+from config import DATABASE_URL
+
+CHANNEL = "saltybot_invalidate"
+
+Handler = Callable[[dict], Awaitable[None]]
+Resync = Callable[[], Awaitable[object]]
+
+# Cross-process cache invalidation. Postgres triggers (db/schema.sql) pg_notify on every
+# write that matters, so each cluster process drops its local copies no matter who wrote.
+class InvalidationBus:
+    def __init__(self, dsn:str=DATABASE_URL, reconnect_delay:float=5.0):
+        self.dsn = dsn
+        self.reconnect_delay = reconnect_delay
+        self._handlers: dict[str, list[Handler]] = {}
+        self._resyncs: list[Resync] = []
+        self._con: Optional[asyncpg.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+        self.received = 0
+
+    def on(self, kind:str, handler:Handler) -> None:
+        self._handlers.setdefault(kind, []).append(handler)
+
+    def on_connect(self, resync:Resync) -> None:
+        # run after every LISTEN (re)connect: NOTIFYs sent while no listener was up are gone
+        self._resyncs.append(resync)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task: self._task.cancel()
+        if self._con is not None and not self._con.is_closed():
+            await self._con.close()
+        self._con = None
+
+    async def _run(self) -> None:
+        # LISTEN needs a dedicated connection; pooled ones get reset on release
+        while True:
+            try:
+                self._con = await asyncpg.connect(self.dsn)
+                closed = asyncio.Event()
+                self._con.add_termination_listener(lambda _c: closed.set())
+                await self._con.add_listener(CHANNEL, self._on_notify)
+                for resync in self._resyncs:
+                    asyncio.create_task(self._resync(resync))
+                await closed.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ invalidation listener: {e!r}")
+            await asyncio.sleep(self.reconnect_delay)
+
+    def _on_notify(self, _con, _pid, _channel, payload:str) -> None:
+        try:
+            msg = json.loads(payload)
+        except ValueError:
+            return
+        self.received += 1
+        for handler in self._handlers.get(msg.get("kind"), ()):
+            asyncio.create_task(self._dispatch(handler, msg))
+
+    async def _resync(self, resync:Resync) -> None:
+        try:
+            await resync()
+        except Exception as e:
+            print(f"⚠️ invalidation resync: {e!r}")
+
+    async def _dispatch(self, handler:Handler, msg:dict) -> None:
+        try:
+            await handler(msg)
+        except Exception as e:
+            print(f"⚠️ invalidation handler {msg.get('kind')}: {e!r}")
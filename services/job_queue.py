@@ -0,0 +1,94 @@
+import asyncio, random, time
+from typing import Awaitable, Callable, Optional
+import discord
+from config import JOB_WORKERS, JOB_QUEUE_SIZE, JOB_MAX_ATTEMPTS, JOB_RETRY_BASE
+from utils.metrics import JOB_SECONDS, JOBS_TOTAL, JOB_QUEUE_DEPTH, ERRORS_TOTAL
+
+# Bounded in-process queue for side effects the user doesn't have to wait for (the approval
+# post). Jobs are coroutine factories, retried with exponential backoff + jitter.
+# The queue itself is not durable: anything that must survive a restart is written to Postgres
+# before submit() and re-submitted on startup (cogs.verification.resume_unposted, run from bot.py).
+NON_RETRYABLE = (discord.Forbidden, discord.NotFound)
+
+Job = Callable[[], Awaitable[object]]
+OnFailure = Callable[[BaseException], Awaitable[object]]
+
+class JobQueue:
+    def __init__(self, maxsize:int=1000, workers:int=4, max_attempts:int=5, base_delay:float=1.0, max_delay:float=60.0):
+        self.maxsize = maxsize
+        self.workers = max(workers, 1)
+        self.max_attempts = max(max_attempts, 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list[asyncio.Task] = []
+        self._retrying: set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        if self._workers: return
+        self._queue = asyncio.Queue(self.maxsize)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def depth(self) -> int:
+        return (self._queue.qsize() if self._queue else 0) + len(self._retrying)
+
+    def submit(self, name:str, fn: Job, *, on_failure: Optional[OnFailure]=None) -> bool:
+        # never blocks; False means the queue is full and the caller should run the work itself
+        self.start()
+        try:
+            self._queue.put_nowait((name, fn, on_failure, 1))
+        except asyncio.QueueFull:
+            JOBS_TOTAL.labels(name, "rejected").inc()
+            return False
+        JOB_QUEUE_DEPTH.labels().set(self.depth())
+        return True
+
+    async def close(self, timeout:float=10.0) -> None:
+        # let queued work finish (bounded), then stop; retries still waiting are dropped
+        if self._queue is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                print(f"⚠️ job queue: {self._queue.qsize()} job(s) left at shutdown")
+        for t in (*self._workers, *self._retrying): t.cancel()
+        await asyncio.gather(*self._workers, *self._retrying, return_exceptions=True)
+        self._workers, self._retrying = [], set()
+
+    def _backoff(self, attempt:int) -> float:
+        return min(self.max_delay, self.base_delay * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+
+    async def _requeue(self, item: tuple, delay: float) -> None:
+        await asyncio.sleep(delay)
+        await self._queue.put(item)  # waits for room instead of dropping a retry
+
+    async def _worker(self) -> None:
+        while True:
+            item = await self._queue.get()
+            name, fn, on_failure, attempt = item
+            JOB_QUEUE_DEPTH.labels().set(self.depth())
+            t0 = time.perf_counter()
+            try:
+                await fn()
+                JOBS_TOTAL.labels(name, "ok").inc()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if attempt < self.max_attempts and not isinstance(e, NON_RETRYABLE):
+                    JOBS_TOTAL.labels(name, "retry").inc()
+                    t = asyncio.create_task(self._requeue((name, fn, on_failure, attempt + 1), self._backoff(attempt)))
+                    self._retrying.add(t)
+                    t.add_done_callback(self._retrying.discard)
+                else:
+                    JOBS_TOTAL.labels(name, "failed").inc()
+                    ERRORS_TOTAL.labels(f"job:{name}").inc()
+                    print(f"❌ job {name} failed after {attempt} attempt(s): {e!r}")
+                    if on_failure is not None:
+                        try:
+                            await on_failure(e)
+                        except Exception as e2:
+                            print(f"⚠️ job {name} on_failure: {e2!r}")
+            finally:
+                JOB_SECONDS.labels(name).observe(time.perf_counter() - t0)
+                self._queue.task_done()
+
+jobs = JobQueue(JOB_QUEUE_SIZE, JOB_WORKERS, JOB_MAX_ATTEMPTS, JOB_RETRY_BASE)
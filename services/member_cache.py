@@ -0,0 +1,65 @@
+import asyncio
+import discord
+from config import MEMBER_CACHE_SIZE, MEMBER_CACHE_TTL
+from utils.cache import LRUCache
+
+# Bounded, short-lived member lookups in front of guild.fetch_member. discord.py's own member
+# cache is switched off in bot.py, so recently active members live here, and concurrent misses
+# for the same user share one in-flight fetch instead of each hitting REST.
+class MemberCache:
+    def __init__(self, maxsize:int=5000, ttl:float=60.0):
+        self._cache = LRUCache(maxsize, ttl=ttl)
+        self._inflight: dict[tuple[int, int], asyncio.Task] = {}
+        self.hits = self.fetches = self.coalesced = 0
+
+    def remember(self, member) -> None:
+        if isinstance(member, discord.Member):
+            self._cache.set((member.guild.id, member.id), member)
+
+    def forget(self, guild_id:int, user_id:int) -> None:
+        self._cache.pop((guild_id, user_id))
+
+    async def get(self, guild: discord.Guild, user_id:int) -> discord.Member:
+        key = (guild.id, user_id)
+        member = guild.get_member(user_id) or self._cache.get(key)
+        if member is not None:
+            self.hits += 1
+            return member
+        return await self._coalesced(guild, user_id)
+
+    async def fresh(self, guild: discord.Guild, user_id:int) -> discord.Member:
+        # for role edits: member.edit(roles=...) replaces the whole list, so it must start from
+        # Discord's current roles; a cached copy would wipe roles granted since it was fetched
+        self.forget(guild.id, user_id)
+        return await self._coalesced(guild, user_id)
+
+    async def _coalesced(self, guild: discord.Guild, user_id:int) -> discord.Member:
+        key = (guild.id, user_id)
+        task = self._inflight.get(key)
+        if task is None:
+            self.fetches += 1
+            task = asyncio.ensure_future(self._fetch(guild, user_id))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # shield: one caller giving up must not cancel the fetch the others wait on
+        return await asyncio.shield(task)
+
+    async def from_interaction(self, interaction: discord.Interaction) -> discord.Member:
+        # guild interactions already carry a fresh Member (roles included); no REST needed
+        if isinstance(interaction.user, discord.Member):
+            self.remember(interaction.user)
+            return interaction.user
+        return await self.get(interaction.guild, interaction.user.id)
+
+    async def _fetch(self, guild: discord.Guild, user_id:int) -> discord.Member:
+        member = await guild.fetch_member(user_id)
+        self.remember(member)
+        return member
+
+    def stats(self) -> dict:
+        return {"size": len(self._cache), "inflight": len(self._inflight),
+                "hits": self.hits, "fetches": self.fetches, "coalesced": self.coalesced}
+
+members = MemberCache(MEMBER_CACHE_SIZE, MEMBER_CACHE_TTL)
@@ -0,0 +1,48 @@
+import asyncio
+from typing import Awaitable, Callable, Optional
+import discord
+from db.repo import OutboxRepo, PgOutboxRepo
+from domain.models import OutboxEffect
+from services.rest_scheduler import PRIORITY_BACKGROUND
+from utils.metrics import OUTBOX_TOTAL
+
+# Discord side effects of a decision, made durable by writing them in the same statement as the
+# status change (PgVerifyRepo.set_request_status). The deciding handler runs them right away via
+# run(); whatever fails stays in the table for tasks/outbox_dispatcher.py to retry.
+# Executors must be idempotent: a row can run again if its completion wasn't recorded.
+Executor = Callable[..., Awaitable[object]]
+
+def effect(kind:str, guild_id:int, message_id:int, /, **payload) -> OutboxEffect:
+    # one effect of each kind per approval message; a second insert is a no-op
+    return OutboxEffect(kind, f"{kind}:{guild_id}:{message_id}", payload, guild_id)
+
+class Outbox:
+    def __init__(self, repo: OutboxRepo):
+        self.repo = repo
+        self.executors: dict[str, Executor] = {}
+
+    def executor(self, kind:str):
+        def deco(fn: Executor) -> Executor:
+            self.executors[kind] = fn
+            return fn
+        return deco
+
+    async def execute(self, guild: discord.Guild, fx: OutboxEffect, *, message: Optional[discord.Message]=None,
+                      priority:int=PRIORITY_BACKGROUND, path:str="dispatch") -> Optional[Exception]:
+        try:
+            await self.executors[fx.kind](guild, fx.payload, message=message, priority=priority)
+        except Exception as e:
+            OUTBOX_TOTAL.labels(fx.kind, path, "error").inc()
+            return e
+        OUTBOX_TOTAL.labels(fx.kind, path, "ok").inc()
+        return None
+
+    async def run(self, guild: discord.Guild, effects: list[OutboxEffect], *, message: Optional[discord.Message]=None,
+                  priority:int=PRIORITY_BACKGROUND) -> list[tuple[OutboxEffect, Exception]]:
+        # first attempt, inline; returns the effects left for the dispatcher
+        errors = await asyncio.gather(*(self.execute(guild, fx, message=message, priority=priority, path="inline")
+                                        for fx in effects))
+        await self.repo.complete_many([fx.dedup_key for fx, e in zip(effects, errors) if e is None])
+        return [(fx, e) for fx, e in zip(effects, errors) if e is not None]
+
+outbox = Outbox(PgOutboxRepo())
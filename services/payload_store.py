@@ -0,0 +1,25 @@
+from typing import Optional
+from domain.models import VerificationPayload
+from db.repo import VerifyRepo
+from utils.cache import LRUCache
+
+# Submission payloads keyed by approval message id: LRU in front of verification_requests.
+class PayloadStore:
+    def __init__(self, verify_repo: VerifyRepo, maxsize:int=2048):
+        self.verify_repo = verify_repo
+        self._cache = LRUCache(maxsize)
+
+    def put(self, message_id:int, payload: VerificationPayload) -> None:
+        self._cache.set((payload.guild_id, message_id), payload)
+
+    async def get(self, guild_id:int, message_id:int) -> Optional[VerificationPayload]:
+        key = (guild_id, message_id)
+        payload = self._cache.get(key)
+        if payload is None:
+            payload = await self.verify_repo.get_by_message(guild_id, message_id)
+            if payload is not None:
+                self._cache.set(key, payload)
+        return payload
+
+    def drop(self, guild_id:int, message_id:int) -> None:
+        self._cache.pop((guild_id, message_id))
@@ -0,0 +1,58 @@
+from db.repo import VerifyRepo
+from utils.cache import LRUCache
+
+# In-memory view of verification_requests.status='SUBMITTED'; restart-safe via warm().
+# Once more than maxsize users are pending the LRU starts evicting live entries, so from
+# then on a miss is checked against Postgres instead of being read as "not pending".
+class PendingRegistry:
+    def __init__(self, verify_repo: VerifyRepo, maxsize:int=50_000, ttl:float=7*24*3600):
+        self.verify_repo = verify_repo
+        self.ttl = ttl
+        self._cache = LRUCache(maxsize, ttl=ttl)
+        self._evicted = False
+        self._recent: set[tuple[int, int]] | None = None  # keys added while a resync is reading
+
+    def _set(self, key: tuple[int, int], ttl: float | None = None) -> None:
+        if key not in self._cache and len(self._cache) >= self._cache.maxsize:
+            self._evicted = True
+        self._cache.set(key, True, ttl=ttl)
+
+    async def warm(self) -> int:
+        rows = await self.verify_repo.list_pending(self.ttl)
+        for guild_id, user_id, age_seconds in rows:
+            self._set((guild_id, user_id), ttl=max(self.ttl - age_seconds, 0.0))
+        return len(rows)
+
+    async def resync(self) -> int:
+        # after the NOTIFY listener (re)connects: decisions made in the gap were never heard, so
+        # rebuild from Postgres instead of adding to a view that may hold finished requests
+        self._recent = set()
+        try:
+            rows = await self.verify_repo.list_pending(self.ttl)
+        finally:
+            recent, self._recent = self._recent, None
+        self._cache.clear()
+        self._evicted = False
+        for guild_id, user_id, age_seconds in rows:
+            self._set((guild_id, user_id), ttl=max(self.ttl - age_seconds, 0.0))
+        for key in recent:
+            self._set(key)
+        return len(rows)
+
+    async def is_pending(self, guild_id:int, user_id:int) -> bool:
+        if (guild_id, user_id) in self._cache:
+            return True
+        if not self._evicted:
+            return False
+        if await self.verify_repo.has_pending(guild_id, user_id, self.ttl):
+            self._set((guild_id, user_id))
+            return True
+        return False
+
+    def add(self, guild_id:int, user_id:int) -> None:
+        self._set((guild_id, user_id))
+        if self._recent is not None: self._recent.add((guild_id, user_id))
+
+    def discard(self, guild_id:int, user_id:int) -> None:
+        self._cache.pop((guild_id, user_id))
+        if self._recent is not None: self._recent.discard((guild_id, user_id))
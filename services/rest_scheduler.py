@@ -0,0 +1,160 @@
+import asyncio, heapq, itertools, time
+from typing import Any, Awaitable, Callable, Hashable, Optional
+import discord
+from config import REST_CONCURRENCY, REST_RESERVED_INTERACTIVE
+from utils.cache import LRUCache
+from utils.metrics import Timing, REST_SECONDS, REST_WAIT_SECONDS, ERRORS_TOTAL
+
+PRIORITY_INTERACTIVE = 0   # approve/reject, modal submit
+PRIORITY_BACKGROUND = 10   # daemons, bulk admin jobs, notices
+
+# route kind -> (burst, per seconds); kept below Discord's own buckets so we queue instead of eating 429s
+ROUTE_LIMITS: dict[str, tuple[int, float]] = {
+    "member": (5, 5.0),    # PATCH/PUT/DELETE /guilds/{guild}/members/...
+    "channel": (5, 5.0),   # POST/PATCH /channels/{channel}/messages
+    "dm": (5, 5.0),
+}
+_DEFAULT_LIMIT = (5, 5.0)
+
+class TokenBucket:
+    # only touched under the scheduler's condition lock, so it needs no lock of its own
+    def __init__(self, burst:int, per:float):
+        self.burst = burst
+        self.rate = burst / per
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def wait_time(self, now: float) -> float:
+        # seconds until a token is available; 0 means take() will succeed now
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+# Central queue for Discord REST side effects. Jobs are plain coroutine factories, so the
+# scheduler is transport-agnostic and can be driven against a fake REST endpoint.
+# Jobs wait in one priority heap per route. A worker only takes a job whose route has a token
+# right now, so a route's own backlog is also served in priority order, and a busy route never
+# holds a worker slot while the bucket refills.
+class RestScheduler:
+    def __init__(self, concurrency:int=4, reserved_interactive:int=1,
+                 limits:Optional[dict[str, tuple[int, float]]]=None, max_buckets:int=10_000):
+        self.concurrency = max(concurrency, 1)
+        self.reserved_interactive = min(max(reserved_interactive, 0), self.concurrency - 1)
+        self.limits = dict(ROUTE_LIMITS if limits is None else limits)
+        self._buckets = LRUCache(max_buckets)
+        self._queues: dict[tuple, list] = {}  # route -> heap of (priority, seq, fn, fut, queued_at)
+        self._seq = itertools.count()
+        self._cond: Optional[asyncio.Condition] = None
+        self._workers: list[asyncio.Task] = []
+        self.wait = {PRIORITY_INTERACTIVE: Timing(), PRIORITY_BACKGROUND: Timing()}
+        self.run = {PRIORITY_INTERACTIVE: Timing(), PRIORITY_BACKGROUND: Timing()}
+        self.errors = 0
+
+    def start(self) -> None:
+        if self._workers: return
+        self._cond = asyncio.Condition()
+        self._workers = [asyncio.create_task(self._worker(interactive_only=i < self.reserved_interactive))
+                         for i in range(self.concurrency)]
+
+    async def close(self) -> None:
+        for t in self._workers: t.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for q in self._queues.values():
+            for *_, fut, _ in q:
+                if not fut.done(): fut.cancel()
+        self._queues.clear()
+
+    def _bucket(self, route: tuple) -> TokenBucket:
+        b = self._buckets.get(route)
+        if b is None:
+            b = TokenBucket(*self.limits.get(route[0], _DEFAULT_LIMIT))
+            self._buckets.set(route, b)
+        return b
+
+    async def submit(self, route: tuple[str, Hashable], fn: Callable[[], Awaitable[Any]], *,
+                     priority:int=PRIORITY_BACKGROUND) -> Any:
+        self.start()
+        fut = asyncio.get_running_loop().create_future()
+        async with self._cond:
+            heapq.heappush(self._queues.setdefault(route, []), (priority, next(self._seq), fn, fut, time.perf_counter()))
+            self._cond.notify_all()
+        return await fut
+
+    def _pick(self, interactive_only: bool) -> tuple[Optional[tuple], Optional[tuple], Optional[float]]:
+        # (route, job, None) for the most urgent job whose route has a token now, else
+        # (None, None, seconds until the soonest eligible route refills, or None if there is none)
+        now = time.monotonic()
+        best, delay = None, None
+        for route, q in list(self._queues.items()):
+            while q and q[0][3].done():  # caller gave up
+                heapq.heappop(q)
+            if not q:
+                del self._queues[route]; continue
+            if interactive_only and q[0][0] >= PRIORITY_BACKGROUND:
+                continue
+            wait = self._bucket(route).wait_time(now)
+            if wait > 0:
+                delay = wait if delay is None else min(delay, wait)
+            elif best is None or q[0][:2] < best[1][:2]:
+                best = (route, q[0])
+        if best is None:
+            return None, None, delay
+        route = best[0]
+        q = self._queues[route]
+        job = heapq.heappop(q)
+        if not q: del self._queues[route]
+        self._bucket(route).take()
+        return route, job, None
+
+    async def _worker(self, interactive_only: bool) -> None:
+        while True:
+            async with self._cond:
+                while True:
+                    route, job, delay = self._pick(interactive_only)
+                    if job is not None: break
+                    try:  # releases the lock while waiting for a submit or a refill
+                        await asyncio.wait_for(self._cond.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+            priority, _, fn, fut, queued_at = job
+            klass = PRIORITY_INTERACTIVE if priority < PRIORITY_BACKGROUND else PRIORITY_BACKGROUND
+            lane = "interactive" if klass == PRIORITY_INTERACTIVE else "background"
+            started = time.perf_counter()
+            self.wait[klass].add(started - queued_at)
+            REST_WAIT_SECONDS.labels(lane).observe(started - queued_at)
+            try:
+                result = await fn()
+            except Exception as e:
+                self.errors += 1
+                ERRORS_TOTAL.labels("rest").inc()
+                if not fut.done(): fut.set_exception(e)
+            else:
+                if not fut.done(): fut.set_result(result)
+            finally:
+                elapsed = time.perf_counter() - started
+                self.run[klass].add(elapsed)
+                REST_SECONDS.labels(route[0], lane).observe(elapsed)
+
+    def stats(self) -> dict:
+        depth = {"interactive": 0, "background": 0}
+        for q in self._queues.values():
+            for item in q:
+                depth["interactive" if item[0] < PRIORITY_BACKGROUND else "background"] += 1
+        return {"queue_depth": depth, "errors": self.errors,
+                "wait": {("interactive" if k == PRIORITY_INTERACTIVE else "background"): v.as_dict() for k, v in self.wait.items()},
+                "run": {("interactive" if k == PRIORITY_INTERACTIVE else "background"): v.as_dict() for k, v in self.run.items()}}
+
+rest = RestScheduler(REST_CONCURRENCY, REST_RESERVED_INTERACTIVE)
+
+def member_route(member: discord.Member) -> tuple[str, int]:
+    return ("member", member.guild.id)
+
+def channel_route(channel: discord.abc.Snowflake) -> tuple[str, int]:
+    return ("channel", channel.id)
+
+def dm_route(user: discord.abc.User) -> tuple[str, int]:
+    return ("dm", user.id)
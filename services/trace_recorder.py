@@ -0,0 +1,132 @@
+import asyncio, hashlib, hmac, json, os, re, time
+from typing import Optional
+import discord
+from utils.auth import is_moderator
+from utils.charclass import classify, DIGIT, EMOJI, ZERO_WIDTH, FORBIDDEN, LETTER
+from utils.gender import BASE_ALIASES, norm_gender, resolve_gender
+from utils.time import now_local
+from utils.validators import parse_birthday, age_from_birthday, is_age_undisclosed
+
+# Opt-in recorder for real interaction traffic (TRACE_PATH). One compact JSON object per line;
+# bench/replay.py feeds a recording back through the handlers. Ids are HMAC'd with a per-run
+# salt that is never written out, and free text is reduced to its shape:
+#   nickname → same length and character classes, gender → a public alias of the resolved category,
+#   birthday → a synthetic date giving the same age, account age → rounded to 10 days.
+TRACKED_BUTTONS = {"verify_button", "approve_button", "reject_button"}
+MODAL_FIELDS = ("name", "age", "gender", "birthday")  # VerificationForm input order
+
+_PUBLIC_ALIASES = {a for words in BASE_ALIASES.values() for a in words}
+_CATEGORY_ALIAS = {cat: words[2] if len(words) > 2 else words[0] for cat, words in BASE_ALIASES.items()}
+_FOOTER_UID_RE = re.compile(r"User ID:\s*(\d+)")
+
+def shape(text: str) -> str:
+    out = []
+    for ch in text:
+        c = classify(ch)
+        if c & ZERO_WIDTH: out.append("\u200b")
+        elif c & EMOJI: out.append("🙂")
+        elif c & DIGIT: out.append("0")
+        elif c & FORBIDDEN: out.append(ch)
+        elif c & LETTER: out.append("ก" if "\u0e00" <= ch <= "\u0e7f" else ("a" if ch.isascii() else "é"))
+        else: out.append(ch if ch.isspace() else ".")
+    return "".join(out)
+
+class TraceRecorder:
+    def __init__(self, path: str, flush_interval: float = 1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._salt = os.urandom(16)
+        self._t0 = time.monotonic()
+        self._buf: list[str] = []
+        self._task: Optional[asyncio.Task] = None
+        self.recorded = 0
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task: self._task.cancel()
+        await self._flush()
+
+    def _h(self, value) -> str:
+        return hmac.new(self._salt, str(value).encode(), hashlib.sha256).hexdigest()[:12]
+
+    def record(self, interaction: discord.Interaction) -> None:
+        # called from on_interaction: cheap, no awaits; never raises into the gateway loop
+        try:
+            ev = self._event(interaction)
+        except Exception as e:
+            print(f"⚠️ trace: {e!r}")
+            return
+        if ev is not None:
+            self._buf.append(json.dumps(ev, ensure_ascii=False, separators=(",", ":")))
+            self.recorded += 1
+
+    def _event(self, interaction: discord.Interaction) -> Optional[dict]:
+        if interaction.guild is None: return None
+        data = interaction.data or {}
+        ev = {"t": round(time.monotonic() - self._t0, 3), "g": self._h(interaction.guild.id), "u": self._h(interaction.user.id)}
+        if interaction.type == discord.InteractionType.component:
+            cid = data.get("custom_id")
+            if cid not in TRACKED_BUTTONS: return None
+            ev.update(k="click", id=cid)
+            if cid != "verify_button":
+                ev["mod"] = is_moderator(interaction.user)
+                target = self._target(interaction.message)
+                if target: ev["target"] = self._h(target)
+            else:
+                ev["acct"] = self._account_age(interaction.user)
+            return ev
+        if interaction.type == discord.InteractionType.modal_submit:
+            values = [c.get("value") or "" for row in data.get("components", []) for c in row.get("components", [])]
+            raw = dict(zip(MODAL_FIELDS, values))
+            ev.update(k="modal", f=self._fields(raw, interaction.guild.id), acct=self._account_age(interaction.user))
+            names = {getattr(interaction.user, a, None) for a in ("nick", "global_name", "display_name", "name")}
+            ev["same_name"] = bool(raw.get("name")) and raw.get("name", "").strip() in names
+            return ev
+        return None
+
+    @staticmethod
+    def _target(message: Optional[discord.Message]) -> Optional[int]:
+        if message is None or not message.embeds: return None
+        m = _FOOTER_UID_RE.search(message.embeds[0].footer.text or "")
+        return int(m.group(1)) if m else None
+
+    @staticmethod
+    def _account_age(user) -> Optional[int]:
+        created = getattr(user, "created_at", None)
+        if created is None: return None
+        return (discord.utils.utcnow() - created).days // 10 * 10
+
+    @staticmethod
+    def _fields(raw: dict, guild_id: int) -> dict:
+        age = raw.get("age", "").strip()
+        gender = raw.get("gender", "")
+        bday = raw.get("birthday", "").strip()
+        out = {"name": shape(raw.get("name", "")),
+               "age": age if (age.isdigit() or is_age_undisclosed(age)) else shape(age)}
+        if not gender.strip() or norm_gender(gender) in _PUBLIC_ALIASES:
+            out["gender"] = gender
+        else:
+            out["gender"] = _CATEGORY_ALIAS.get(resolve_gender(gender, guild_id), shape(gender))
+        bdt = parse_birthday(bday) if bday else None
+        if bdt:
+            out["birthday"] = f"01/01/{now_local().year - age_from_birthday(bdt)}"
+        else:
+            out["birthday"] = shape(bday)
+        return out
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self._flush()
+
+    async def _flush(self) -> None:
+        if not self._buf: return
+        lines, self._buf = self._buf, []
+        await asyncio.to_thread(self._append, "\n".join(lines) + "\n")
+
+    def _append(self, text: str) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(text)
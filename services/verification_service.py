@@ -2,25 +2,69 @@ import discord
 from typing import Optional
 from config import ROLE_ID_TO_GIVE, AGE_ROLE_IDS_ALL, GENDER_ROLE_IDS_ALL, TZ
 from db.repo import VerifyRepo, MemberRepo, ApprovalIndexRepo
+from domain.models import VerificationPayload
+from services.payload_store import PayloadStore
+from services.pending_registry import PendingRegistry
+from services.rest_scheduler import PRIORITY_INTERACTIVE
+from utils.metrics import VERIFICATIONS_TOTAL
+from utils.roles import current_role_ids, verified_role_ids, apply_role_ids
 from utils.validators import resolve_gender_role_id, resolve_age_role_id, parse_birthday, age_from_birthday
 
 class VerificationService:
-    def __init__(self, verify_repo: VerifyRepo, member_repo: MemberRepo, approval_repo: ApprovalIndexRepo):
+    def __init__(self, verify_repo: VerifyRepo, member_repo: MemberRepo, approval_repo: ApprovalIndexRepo,
+                 payloads: Optional[PayloadStore] = None, pending: Optional[PendingRegistry] = None):
         self.verify_repo = verify_repo
         self.member_repo = member_repo
         self.approval_repo = approval_repo
+        self.payloads = payloads or PayloadStore(verify_repo)
+        self.pending = pending or PendingRegistry(verify_repo)
 
     async def record_submission(self, *, guild: discord.Guild, user: discord.User, channel_id:int, message_id:int|None,
                                 nickname:str, age_text:str, gender_text:str, birthday_text:str,
-                                account_age_days:int|None, account_risk:str|None):
-        await self.verify_repo.insert_request(guild.id, user.id, channel_id, message_id, nickname, age_text, gender_text, birthday_text, account_age_days, account_risk)
+                                account_age_days:int|None, account_risk:str|None) -> int:
+        # message_id=None records the request before its approval message exists (see attach_message)
+        self.pending.add(guild.id, user.id)
+        bdt = parse_birthday(birthday_text) if birthday_text else None
+        request_id = await self.verify_repo.record_submission(guild.id, user.id, channel_id, message_id, nickname, age_text, gender_text, birthday_text,
+                                                 account_age_days, account_risk, bdt.date() if bdt else None)
+        VERIFICATIONS_TOTAL.labels("submitted").inc()
         if message_id:
-            await self.approval_repo.set_latest(guild.id, user.id, channel_id, message_id)
-        await self.member_repo.upsert_member(guild.id, user.id, nickname=nickname, age_text=age_text, gender_text=gender_text, birthday_text=birthday_text)
+            self.payloads.put(message_id, VerificationPayload(guild.id, user.id, nickname, age_text, gender_text, birthday_text,
+                                                              account_age_days, account_risk))
+        return request_id
 
-    async def apply_roles_on_approve(self, guild: discord.Guild, member: discord.Member, *, gender_text:str, age_text:str, birthday_text:str):
+    async def attach_message(self, request_id:int, channel_id:int, message_id:int, payload: VerificationPayload) -> None:
+        await self.verify_repo.attach_message(request_id, channel_id, message_id)
+        self.payloads.put(message_id, payload)
+
+    async def abandon_unposted(self, request_id:int, guild_id:int) -> None:
+        # the approval message could not be posted: void the request so the user can submit again
+        user_id = await self.verify_repo.cancel_unposted(request_id)
+        if user_id:
+            self.pending.discard(guild_id, user_id)
+
+    async def cancel_by_message(self, guild_id:int, message_id:int) -> Optional[int]:
+        # approval message deleted → request is void and the user may submit again
+        user_id = await self.verify_repo.cancel_request(guild_id, message_id)
+        self.payloads.drop(guild_id, message_id)
+        if user_id:
+            self.pending.discard(guild_id, user_id)
+        return user_id
+
+    async def on_request_notify(self, msg: dict) -> None:
+        # status change made by any cluster process (or by hand in psql)
+        guild_id, user_id = msg["guild_id"], msg["user_id"]
+        if msg["status"] == "SUBMITTED":
+            self.pending.add(guild_id, user_id)
+        else:
+            self.pending.discard(guild_id, user_id)
+            if msg["status"] == "CANCELLED" and msg.get("message_id"):
+                self.payloads.drop(guild_id, msg["message_id"])
+
+    async def apply_roles_on_approve(self, guild: discord.Guild, member: discord.Member, *, gender_text:str, age_text:str, birthday_text:str,
+                                     priority:int=PRIORITY_INTERACTIVE):
         general_role = guild.get_role(ROLE_ID_TO_GIVE)
-        gender_role  = guild.get_role(resolve_gender_role_id(gender_text))
+        gender_role  = guild.get_role(resolve_gender_role_id(gender_text, guild.id))
 
         age_role = None
         if birthday_text:
@@ -33,19 +77,7 @@ class VerificationService:
             rid = resolve_age_role_id(age_text)
             age_role = guild.get_role(rid) if rid else None
 
-        # enforce single gender
-        to_remove_gender = [r for r in member.roles if r.id in GENDER_ROLE_IDS_ALL and (gender_role is None or r.id != gender_role.id)]
-        if to_remove_gender:
-            await member.remove_roles(*to_remove_gender, reason="Verification: enforce single gender role")
-        # enforce single age
-        if age_role:
-            to_remove_age = [r for r in member.roles if r.id in AGE_ROLE_IDS_ALL and r.id != age_role.id]
-            if to_remove_age:
-                await member.remove_roles(*to_remove_age, reason="Verification: enforce single age role")
-
-        roles_to_add = []
-        if general_role and general_role not in member.roles: roles_to_add.append(general_role)
-        if gender_role and gender_role not in member.roles: roles_to_add.append(gender_role)
-        if age_role and age_role not in member.roles: roles_to_add.append(age_role)
-        if roles_to_add:
-            await member.add_roles(*roles_to_add, reason="Verified")
+        target = verified_role_ids(current_role_ids(member), gender_id=gender_role.id if gender_role else None,
+                                   age_id=age_role.id if age_role else None,
+                                   general_id=general_role.id if general_role else None)
+        return await apply_role_ids(member, target, reason="Verified", priority=priority)
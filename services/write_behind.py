@@ -0,0 +1,227 @@
+import asyncio, inspect, time
+from datetime import date, datetime, timezone
+from typing import Optional
+import asyncpg
+from config import (WRITE_BEHIND_INTERVAL_MS, WRITE_BEHIND_MAX_ROWS, WRITE_BEHIND_MAX_ATTEMPTS,
+                    WRITE_BEHIND_ACK_TIMEOUT)
+from db.repo import VerifyRepo, SubmissionBatchRepo, PgSubmissionBatchRepo
+from utils.metrics import WRITE_BEHIND_DEPTH, WRITE_BEHIND_FLUSH_SECONDS, WRITE_BEHIND_ROWS_TOTAL
+
+# Optional write-behind for submission writes (WRITE_BEHIND_ENABLED). record_submission and
+# attach_message only touch memory; a background task flushes everything buffered in one
+# transaction every WRITE_BEHIND_INTERVAL_MS, or sooner once WRITE_BEHIND_MAX_ROWS are waiting.
+# Request ids are reserved from the table's sequence in blocks, so callers still get an id back,
+# and BufferedVerifyRepo holds the submit's ack until the flush that commits its row (group commit).
+# A batch that fails max_attempts flushes in a row is quarantined: written one row per transaction,
+# and rows that still fail are logged and dropped so one bad row can't wedge the buffer.
+class WriteBehindBuffer:
+    def __init__(self, repo: SubmissionBatchRepo, interval_ms:int=50, max_rows:int=200, id_block:int=100,
+                 max_attempts:int=5, ack_timeout:float=5.0):
+        self.repo = repo
+        self.interval = max(interval_ms, 1) / 1000
+        self.max_rows = max(max_rows, 1)
+        self.id_block = max(id_block, 1)
+        self.max_attempts = max(max_attempts, 1)
+        self.ack_timeout = ack_timeout
+        self._failures = 0
+        self._ids: list[int] = []  # reversed, so pop() hands them out in order
+        self._id_lock = asyncio.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._requests: dict[int, list] = {}                  # id -> REQUEST_COPY_COLUMNS row
+        self._members: dict[tuple[int, int], tuple] = {}       # (guild, user) -> members row; last write wins
+        self._index: dict[tuple[int, int], tuple] = {}         # (guild, user) -> approval_index row
+        self._attaches: dict[int, tuple] = {}                 # id -> (id, channel, message) for flushed requests
+        self._inflight: dict[int, list] = {}                  # requests of the flush in progress
+        self._durable: dict[int, asyncio.Future] = {}         # id -> resolved once its row is committed
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def depth(self) -> int:
+        return len(self._requests) + len(self._members) + len(self._index) + len(self._attaches)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        # shutdown/SIGTERM: stop the timer and write out whatever is left
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        try:
+            await self.flush()
+        except Exception as e:
+            print(f"❌ write-behind: final flush failed, {self.depth()} row(s) lost: {e!r}")
+            self._settle(list(self._durable), e)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"⚠️ write-behind: flush failed, {self.depth()} row(s) kept for retry: {e!r}")
+
+    def _added(self) -> None:
+        depth = self.depth()
+        WRITE_BEHIND_DEPTH.labels().set(depth)
+        if depth >= self.max_rows:
+            self._wake.set()
+
+    async def _next_id(self) -> int:
+        while not self._ids:
+            async with self._id_lock:
+                if not self._ids:
+                    self._ids = (await self.repo.reserve_request_ids(self.id_block))[::-1]
+        return self._ids.pop()
+
+    async def record_submission(self, guild_id:int, user_id:int, channel_id:int, message_id:int|None,
+                                nickname:str, age_text:str, gender_text:str, birthday_text:str,
+                                account_age_days:int|None, account_risk:str|None, birthday:date|None=None) -> int:
+        request_id = await self._next_id()
+        self._requests[request_id] = [request_id, guild_id, user_id, channel_id, message_id, nickname, age_text, gender_text,
+                                      birthday_text, account_age_days, account_risk, datetime.now(timezone.utc)]
+        self._members[(guild_id, user_id)] = (guild_id, user_id, nickname, age_text, gender_text, birthday_text, birthday)
+        if message_id is not None:
+            self._index[(guild_id, user_id)] = (guild_id, user_id, channel_id, message_id)
+        self._added()
+        return request_id
+
+    async def durable(self, request_id:int) -> None:
+        # waits for the flush that commits this request (group commit: one interval at most when healthy);
+        # raises if the row was dropped
+        if request_id not in self._requests and request_id not in self._inflight: return
+        fut = self._durable.get(request_id)
+        if fut is None:
+            fut = self._durable[request_id] = asyncio.get_running_loop().create_future()
+        await asyncio.shield(fut)
+
+    async def withdraw(self, request_id:int) -> bool:
+        # after an ack timed out: True means the row will never be written. A still-buffered row is
+        # taken out (with its members/approval_index rows); one already in a flush waits for that flush.
+        fut = self._durable.get(request_id)
+        if request_id in self._inflight:
+            async with self._flush_lock: pass
+        row = self._requests.pop(request_id, None)
+        if row is None:
+            return fut is not None and fut.done() and fut.exception() is not None  # dropped by _quarantine
+        key = (row[1], row[2])
+        self._members.pop(key, None)
+        if row[4] is not None and self._index.get(key, (None,) * 4)[3] == row[4]:
+            del self._index[key]
+        self._attaches.pop(request_id, None)
+        fut = self._durable.pop(request_id, None)
+        if fut is not None and not fut.done(): fut.cancel()  # its waiter already gave up
+        WRITE_BEHIND_DEPTH.labels().set(self.depth())
+        return True
+
+    def _settle(self, request_ids, error:Optional[BaseException]=None) -> None:
+        for request_id in request_ids:
+            fut = self._durable.pop(request_id, None)
+            if fut is None or fut.done(): continue
+            if error is None: fut.set_result(None)
+            else: fut.set_exception(error)
+
+    async def attach_message(self, request_id:int, channel_id:int, message_id:int) -> None:
+        row = self._requests.get(request_id)
+        if row is not None and row[4] is None:  # not written yet: the INSERT carries the message id
+            row[3], row[4] = channel_id, message_id
+            self._index[(row[1], row[2])] = (row[1], row[2], channel_id, message_id)
+        else:
+            self._attaches[request_id] = (request_id, channel_id, message_id)
+        self._added()
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            if not self.depth(): return
+            batch = (self._requests, self._members, self._index, self._attaches)
+            self._requests, self._members, self._index, self._attaches = {}, {}, {}, {}
+            self._inflight = batch[0]
+            t0 = time.perf_counter()
+            try:
+                if self._failures >= self.max_attempts:
+                    await self._quarantine(batch)
+                else:
+                    await self.repo.write_batch(*(list(b.values()) for b in batch))
+                    self._count(batch)
+                    self._settle(list(batch[0]))
+                self._failures = 0
+            except Exception:
+                # keep the batch; anything buffered meanwhile is newer and wins
+                self._failures += 1
+                self._requests = {**batch[0], **self._requests}
+                self._members = {**batch[1], **self._members}
+                self._index = {**batch[2], **self._index}
+                self._attaches = {**batch[3], **self._attaches}
+                raise
+            finally:
+                self._inflight = {}
+                WRITE_BEHIND_FLUSH_SECONDS.labels().observe(time.perf_counter() - t0)
+                WRITE_BEHIND_DEPTH.labels().set(self.depth())
+
+    async def _quarantine(self, batch:tuple) -> None:
+        # one transaction per row, requests first so attaches find their row. A row Postgres rejects
+        # on its own (bad data, constraint) is dropped; anything else is an outage, and whatever is
+        # left of the batch goes back for the next attempt.
+        print(f"⚠️ write-behind: batch failed {self._failures} times, writing its rows one by one")
+        for pos, rows in enumerate(batch):
+            for key in list(rows):
+                single = [[], [], [], []]
+                single[pos].append(rows[key])
+                try:
+                    await self.repo.write_batch(*single)
+                except _ROW_ERRORS as e:
+                    print(f"❌ write-behind: dropped {_TABLES[pos]} row {key}: {e!r}")
+                    WRITE_BEHIND_ROWS_TOTAL.labels("dropped").inc()
+                    if pos == 0: self._settle([key], e)
+                else:
+                    WRITE_BEHIND_ROWS_TOTAL.labels(_TABLES[pos]).inc()
+                    if pos == 0: self._settle([key])
+                del rows[key]
+
+    def _count(self, batch:tuple) -> None:
+        for table, rows in zip(_TABLES, batch):
+            if rows: WRITE_BEHIND_ROWS_TOTAL.labels(table).inc(len(rows))
+
+_TABLES = ("verification_requests", "members", "approval_index", "attach")
+_ROW_ERRORS = (asyncpg.DataError, asyncpg.IntegrityConstraintViolationError)  # SQLSTATE classes 22 and 23
+
+class BufferedVerifyRepo:
+    # VerifyRepo whose submission writes go through the buffer. record_submission returns only once
+    # the row is committed, so the user is never told "sent" for a row a crash could lose. Every
+    # other call tries a flush first, so a claim or lookup sees this process's own submissions;
+    # if that flush fails the call still goes ahead against what is already in Postgres.
+    def __init__(self, inner: VerifyRepo, buffer: WriteBehindBuffer):
+        self.inner = inner
+        self.buffer = buffer
+
+    async def record_submission(self, *args, **kw) -> int:
+        request_id = await self.buffer.record_submission(*args, **kw)
+        try:
+            await asyncio.wait_for(self.buffer.durable(request_id), self.buffer.ack_timeout)
+        except asyncio.TimeoutError:
+            # database down: give the row up so the caller's error path runs and the user may retry
+            if await self.buffer.withdraw(request_id): raise
+        return request_id
+
+    async def attach_message(self, request_id:int, channel_id:int, message_id:int) -> None:
+        await self.buffer.attach_message(request_id, channel_id, message_id)
+
+    def __getattr__(self, name):
+        attr = getattr(self.inner, name)
+        if not inspect.iscoroutinefunction(attr): return attr
+        async def flushed(*args, **kw):
+            if self.buffer.depth():
+                try:
+                    await self.buffer.flush()
+                except Exception as e:
+                    print(f"⚠️ write-behind: flush before {name} failed, reading without it: {e!r}")
+            return await attr(*args, **kw)
+        return flushed
+
+write_behind = WriteBehindBuffer(PgSubmissionBatchRepo(), WRITE_BEHIND_INTERVAL_MS, WRITE_BEHIND_MAX_ROWS,
+                                 max_attempts=WRITE_BEHIND_MAX_ATTEMPTS, ack_timeout=WRITE_BEHIND_ACK_TIMEOUT)
@@ -1 +1,101 @@
-# Placeholder: move your daemon logic here and call from bot bootstrap if enabled.
+import asyncio, discord
+from datetime import datetime, time
+from discord.ext import commands
+from config import (TZ, ROLE_ID_TO_GIVE, AGE_ROLE_IDS_ALL, AGE_REFRESH_HOUR, AGE_REFRESH_MINUTE, AGE_REFRESH_BATCH_SIZE,
+                    AGE_REFRESH_RETRY_SECONDS)
+from db.repo import AgeRefreshRepo
+from services.age_service import AgeService
+from services.member_cache import members
+from utils.time import now_local, seconds_until
+from utils.validators import AGE_BRACKET_STARTS, resolve_age_role_id, age_from_birthday
+
+# Once a day, touches only members whose birthday today moves them into a new age bracket.
+# A guild is marked done only when every member went through; guilds hit by Discord 5xx/timeouts
+# are retried every AGE_REFRESH_RETRY_SECONDS until the next day's slot.
+class AgeRefreshDaemon:
+    def __init__(self, bot: commands.Bot, refresh_repo: AgeRefreshRepo, age_service: AgeService,
+                 batch_size:int=AGE_REFRESH_BATCH_SIZE):
+        self.bot = bot
+        self.refresh_repo = refresh_repo
+        self.age_service = age_service
+        self.batch_size = max(batch_size, 1)
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task: self._task.cancel()
+
+    async def _run(self) -> None:
+        await self.bot.wait_until_ready()
+        while True:
+            try:
+                unfinished = await self.run_once()  # first pass doubles as catch-up; already_ran skips finished guilds
+            except Exception as e:
+                print(f"⚠️ age refresh daemon: {e!r}")
+                unfinished = 1
+            wait = seconds_until(AGE_REFRESH_HOUR, AGE_REFRESH_MINUTE)
+            if unfinished:
+                wait = min(wait, AGE_REFRESH_RETRY_SECONDS)
+                print(f"⚠️ age refresh: {unfinished} guild(s) unfinished, retrying in {wait:.0f}s")
+            await asyncio.sleep(wait)
+
+    async def run_once(self) -> int:
+        # returns how many guilds are left for a retry
+        now = now_local()
+        tag = f"age-refresh:{now.date().isoformat()}"
+        unfinished = 0
+        for guild in self.bot.guilds:
+            try:
+                if not await self._refresh_guild(guild, tag, now):
+                    unfinished += 1
+            except Exception as e:
+                print(f"⚠️ age refresh for guild {guild.id}: {e!r}")
+                unfinished += 1
+        return unfinished
+
+    async def _refresh_guild(self, guild: discord.Guild, tag: str, now: datetime) -> bool:
+        if await self.refresh_repo.already_ran(guild.id, tag):
+            return True
+        rows = await self.refresh_repo.crossing_bracket_today(guild.id, now.date(), AGE_BRACKET_STARTS)
+        changes: list[tuple[int, int | None, int | None]] = []
+        finished = True
+        for i in range(0, len(rows), self.batch_size):
+            batch = rows[i:i + self.batch_size]
+            # role edits are throttled by the REST scheduler's background lane
+            results = await asyncio.gather(*(self._refresh_member(guild, uid, bday, now) for uid, bday in batch))
+            for change, done in results:
+                if change: changes.append(change)
+                finished = finished and done
+        # members already moved are skipped on a retry (role already matches), so nothing is logged twice
+        await self.refresh_repo.log_changes_many(guild.id, changes, "birthday: age bracket changed")
+        if finished:
+            await self.refresh_repo.mark_ran(guild.id, tag)
+        return finished
+
+    async def _refresh_member(self, guild: discord.Guild, user_id: int, bday,
+                              now: datetime) -> tuple[tuple[int, int | None, int | None] | None, bool]:
+        # (change to log, done); done=False means a transient failure worth another pass
+        try:
+            member = await members.fresh(guild, user_id)  # current roles: the edit replaces the full set
+        except discord.NotFound:
+            return None, True  # left the guild
+        except (discord.HTTPException, asyncio.TimeoutError) as e:
+            print(f"⚠️ age refresh: fetch {user_id} in {guild.id} failed: {e!r}")
+            return None, False
+        bday_dt = datetime.combine(bday, time(), tzinfo=TZ)
+        new_id = resolve_age_role_id(str(age_from_birthday(bday_dt, now)))
+        old_id = next((r.id for r in member.roles if r.id in AGE_ROLE_IDS_ALL), None)
+        if old_id is None and not any(r.id == ROLE_ID_TO_GIVE for r in member.roles):
+            return None, True  # never approved (pending/rejected submitters are in members too)
+        if new_id == old_id:
+            return None, True
+        try:
+            ok, why = await self.age_service.sync_age_role_from_birthday(guild, member, bday_dt, now)
+        except asyncio.TimeoutError:
+            ok, why = False, "http"
+        if ok:
+            return (user_id, old_id, new_id), True
+        return None, why != "http"  # forbidden / unmapped role won't fix itself
@@ -1 +1,96 @@
-# Placeholder: move your birthday daemon logic here and call from bot bootstrap if enabled.
+import asyncio, discord
+from discord.ext import commands
+from config import BIRTHDAY_CHANNEL_ID, HBD_NOTIFY_HOUR, HBD_NOTIFY_MINUTE, HBD_RETRY_SECONDS
+from db.repo import HBDRepo, MemberRepo
+from services.hbd_service import build_hbd_messages
+from services.rest_scheduler import rest, channel_route, PRIORITY_BACKGROUND
+from utils.time import now_local, seconds_until
+from utils.validators import parse_birthday
+
+# Greets approved members at HBD_NOTIFY_HOUR:HBD_NOTIFY_MINUTE. A guild with a failed send or query is
+# retried every HBD_RETRY_SECONDS for the rest of the day; hbd_sent keeps each pass idempotent.
+class BirthdayDaemon:
+    def __init__(self, bot: commands.Bot, hbd_repo: HBDRepo, member_repo: MemberRepo):
+        self.bot = bot
+        self.hbd_repo = hbd_repo
+        self.member_repo = member_repo
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task: self._task.cancel()
+
+    async def _run(self) -> None:
+        await self.bot.wait_until_ready()
+        await self._backfill()
+        while True:
+            now = now_local()
+            unfinished = 0
+            if (now.hour, now.minute) >= (HBD_NOTIFY_HOUR, HBD_NOTIFY_MINUTE):
+                unfinished = await self._safe_run_once()  # also the catch-up after a restart past notify time
+            wait = seconds_until(HBD_NOTIFY_HOUR, HBD_NOTIFY_MINUTE)
+            if unfinished:
+                wait = min(wait, HBD_RETRY_SECONDS)
+                print(f"⚠️ birthday daemon: {unfinished} guild(s) unfinished, retrying in {wait:.0f}s")
+            await asyncio.sleep(wait)
+
+    async def _safe_run_once(self) -> int:
+        try:
+            return await self.run_once()
+        except Exception as e:
+            print(f"⚠️ birthday daemon: {e!r}")
+            return 1
+
+    async def _backfill(self) -> None:
+        # the pool may still be warming; a failure here must not end the daemon
+        delay = 1.0
+        while True:
+            try:
+                return await self.backfill_birthdays()
+            except Exception as e:
+                print(f"⚠️ birthday backfill failed: {e!r}; retrying in {delay:g}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, HBD_RETRY_SECONDS)
+
+    async def backfill_birthdays(self) -> None:
+        # rows written before members.birthday existed
+        rows = await self.member_repo.list_unparsed_birthdays()
+        parsed = [(g, u, bdt.date()) for g, u, text in rows if (bdt := parse_birthday(text))]
+        await self.member_repo.set_birthdays_many(parsed)
+
+    async def run_once(self) -> int:
+        # returns how many guilds are left for a retry
+        today = now_local().date()
+        unfinished = 0
+        for guild in self.bot.guilds:
+            try:
+                if not await self._greet_guild(guild, today):
+                    unfinished += 1
+            except Exception as e:
+                print(f"⚠️ birthday daemon for guild {guild.id}: {e!r}")
+                unfinished += 1
+        return unfinished
+
+    async def _greet_guild(self, guild: discord.Guild, today) -> bool:
+        ch = guild.get_channel(BIRTHDAY_CHANNEL_ID)
+        if not ch: return True
+        user_ids = await self.hbd_repo.born_today_unsent(guild.id, today)
+        sent: list[tuple[int, int | None]] = []
+        finished = True
+        try:
+            for text, chunk in build_hbd_messages(user_ids):
+                try:
+                    msg = await rest.submit(channel_route(ch), lambda text=text: ch.send(
+                        text, allowed_mentions=discord.AllowedMentions(everyone=False, roles=False, users=True)),
+                        priority=PRIORITY_BACKGROUND)
+                except (discord.HTTPException, asyncio.TimeoutError) as e:
+                    print(f"⚠️ birthday greeting in guild {guild.id} failed: {e!r}")
+                    finished = False  # not recorded → sent on this guild's retry later today
+                    continue
+                sent.extend((uid, msg.id) for uid in chunk)
+        finally:
+            await self.hbd_repo.mark_sent_many(guild.id, today, sent)  # keep what went out even if a send raised
+        return finished
@@ -0,0 +1,72 @@
+import asyncio, random, time
+from discord.ext import commands
+from config import (OUTBOX_LEASE_SECONDS, OUTBOX_POLL_SECONDS, OUTBOX_BATCH_SIZE, OUTBOX_MAX_ATTEMPTS,
+                    OUTBOX_RETENTION_HOURS)
+from core.utils import notify_admin
+from services.outbox import Outbox
+
+# Drains outbox rows the deciding handler couldn't finish (Discord 5xx, 429 storms, restarts).
+# Only rows for this process's guilds are claimed, in batches; failures back off exponentially
+# and rows that exhaust OUTBOX_MAX_ATTEMPTS are marked dead and reported to admins.
+class OutboxDispatcher:
+    def __init__(self, bot: commands.Bot, outbox: Outbox, *, poll:float=OUTBOX_POLL_SECONDS,
+                 batch_size:int=OUTBOX_BATCH_SIZE, max_attempts:int=OUTBOX_MAX_ATTEMPTS,
+                 base_delay:float=5.0, max_delay:float=600.0):
+        self.bot = bot
+        self.outbox = outbox
+        self.poll = poll
+        self.batch_size = max(batch_size, 1)
+        self.max_attempts = max(max_attempts, 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._task: asyncio.Task | None = None
+        self._purged_at = 0.0
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task: self._task.cancel()
+
+    async def _run(self) -> None:
+        await self.bot.wait_until_ready()
+        while True:
+            try:
+                n = await self.run_once()
+            except Exception as e:
+                print(f"⚠️ outbox dispatcher: {e!r}")
+                n = 0
+            if n < self.batch_size:  # a full batch means more is due; go again right away
+                await asyncio.sleep(self.poll)
+
+    def _backoff(self, attempts:int) -> float:
+        return min(self.max_delay, self.base_delay * 2 ** (attempts - 1)) * random.uniform(0.75, 1.25)
+
+    async def run_once(self) -> int:
+        guild_ids = [g.id for g in self.bot.guilds]
+        if not guild_ids: return 0
+        repo = self.outbox.repo
+        rows = await repo.claim_due(guild_ids, self.batch_size, OUTBOX_LEASE_SECONDS)
+        live = [(g, fx) for fx in rows if (g := self.bot.get_guild(fx.guild_id)) is not None]
+        # REST calls are paced by the scheduler's background lane
+        errors = await asyncio.gather(*(self.outbox.execute(g, fx) for g, fx in live))
+        done, retry, dead = [], [], []
+        for (guild, fx), e in zip(live, errors):
+            if e is None:
+                done.append(fx.dedup_key)
+            elif fx.attempts >= self.max_attempts:
+                dead.append((fx.dedup_key, repr(e)))
+                await notify_admin(guild, f"ทำรายการ `{fx.kind}` ไม่สำเร็จหลังลอง {fx.attempts} ครั้ง ({fx.dedup_key}): {e!r}",
+                                   kind="outbox", key=f"{fx.kind}:{e!r}")
+            else:
+                retry.append((fx.dedup_key, self._backoff(fx.attempts), repr(e)))
+        await repo.complete_many(done)
+        await repo.retry_many(retry)
+        await repo.dead_many(dead)
+
+        now = time.monotonic()
+        if now - self._purged_at > 3600:
+            self._purged_at = now
+            await repo.purge_done(OUTBOX_RETENTION_HOURS * 3600)
+        return len(rows)
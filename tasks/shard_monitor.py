@@ -0,0 +1,46 @@
+import asyncio, math
+from discord.ext import commands
+from utils.metrics import Timing
+
+# Samples gateway heartbeat latency per shard; AutoShardedBot exposes bot.latencies,
+# a plain Bot only bot.latency (reported as shard 0).
+class ShardMonitor:
+    def __init__(self, bot: commands.Bot, interval:float=30.0):
+        self.bot = bot
+        self.interval = interval
+        self.latency: dict[int, Timing] = {}
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task: self._task.cancel()
+
+    async def _run(self) -> None:
+        await self.bot.wait_until_ready()
+        while True:
+            self.sample()
+            await asyncio.sleep(self.interval)
+
+    def current(self) -> list[tuple[int, float]]:
+        latencies = getattr(self.bot, "latencies", None)
+        return list(latencies) if latencies else [(self.bot.shard_id or 0, self.bot.latency)]
+
+    def sample(self) -> None:
+        for shard_id, seconds in self.current():
+            if math.isfinite(seconds):  # inf/nan until the first heartbeat ACK
+                self.latency.setdefault(shard_id, Timing()).add(seconds)
+
+    def stats(self) -> list[dict]:
+        guilds: dict[int, int] = {}
+        for g in self.bot.guilds:
+            guilds[g.shard_id or 0] = guilds.get(g.shard_id or 0, 0) + 1
+        out = []
+        for shard_id, seconds in sorted(self.current()):
+            row = {"shard_id": shard_id, "guilds": guilds.get(shard_id, 0),
+                   "current_ms": round(seconds * 1000, 1) if math.isfinite(seconds) else None}
+            row.update(self.latency.get(shard_id, Timing()).as_dict())
+            out.append(row)
+        return out
@@ -50,3 +50,15 @@ async def build_avatar_attachment(user: discord.User):
         return f, filename
     except Exception:
         return None, None
+
+def build_idcard_embed(user: discord.abc.User, payload) -> discord.Embed:
+    # Rebuilds the card from the stored request when the approval message is gone
+    def show(v): return (v or "").strip() or "ไม่ระบุ"
+    e = discord.Embed(color=discord.Color.orange())
+    e.set_thumbnail(url=user.display_avatar.with_static_format("png").with_size(128).url)
+    e.add_field(name="Nickname / ชื่อเล่น", value=show(payload.nickname), inline=False)
+    e.add_field(name="Age / อายุ", value=show(payload.age_text), inline=False)
+    e.add_field(name="Gender / เพศ", value=show(payload.gender_text), inline=False)
+    e.add_field(name="Birthday / วันเกิด", value=show(payload.birthday_text), inline=False)
+    e.set_footer(text=f"User ID: {payload.user_id}")
+    return e
@@ -1,21 +1,29 @@
 import discord
 from utils.auth import is_moderator
-from utils.locks import message_lock
 from utils.validators import parse_birthday, age_from_birthday
 from utils.time import now_local
 from db.repo import PgVerifyRepo, PgMemberRepo, PgApprovalIndexRepo
 from services.verification_service import VerificationService
-from config import APPROVAL_CHANNEL_ID, ROLE_ID_TO_GIVE, TZ
-
-verify_service = VerificationService(PgVerifyRepo(), PgMemberRepo(), PgApprovalIndexRepo())
-
-def _find_embed_field(embed: discord.Embed, *keys: str):
-    keys_low = [k.lower() for k in keys]
-    for f in embed.fields:
-        name = (f.name or "").lower()
-        if any(k in name for k in keys_low):
-            return f.value
-    return None
+from services.payload_store import PayloadStore
+from services.pending_registry import PendingRegistry
+from services.member_cache import members
+from utils.metrics import instrumented, INTERACTION_STEP_SECONDS, VERIFICATIONS_TOTAL
+from services.rest_scheduler import rest, channel_route, dm_route, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from services.outbox import outbox, effect
+from services.admin_notifier import admin_notifier
+from domain.models import OutboxEffect
+from services.write_behind import BufferedVerifyRepo, write_behind
+from config import (APPROVAL_CHANNEL_ID, ROLE_ID_TO_GIVE, TZ, PAYLOAD_CACHE_SIZE,
+                    PENDING_CACHE_SIZE, PENDING_TTL_HOURS, WRITE_BEHIND_ENABLED)
+
+_verify_repo = BufferedVerifyRepo(PgVerifyRepo(), write_behind) if WRITE_BEHIND_ENABLED else PgVerifyRepo()
+verify_service = VerificationService(
+    _verify_repo, PgMemberRepo(), PgApprovalIndexRepo(),
+    payloads=PayloadStore(_verify_repo, maxsize=PAYLOAD_CACHE_SIZE),
+    pending=PendingRegistry(_verify_repo, maxsize=PENDING_CACHE_SIZE, ttl=PENDING_TTL_HOURS * 3600),
+)
+
+_ALREADY_HANDLED = "⚠️ คำขอนี้ถูกจัดการไปแล้ว"
 
 class VerificationView(discord.ui.View):
     def __init__(self):
@@ -30,68 +38,135 @@ class ApproveRejectPersistent(discord.ui.View):
         super().__init__(timeout=None)
 
     @discord.ui.button(label="✅ Approve / อนุมัติ", style=discord.ButtonStyle.success, custom_id="approve_button")
+    @instrumented("approve")
     async def approve(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not is_moderator(interaction.user):
             await interaction.response.send_message("❌ เฉพาะผู้ดูแลเท่านั้น", ephemeral=True); return
         if not interaction.response.is_done():
-            await interaction.response.defer()
+            with INTERACTION_STEP_SECONDS.labels("approve", "defer").time():
+                await interaction.response.defer()
 
         msg = interaction.message
-        if not msg or not msg.embeds or not msg.mentions:
-            await interaction.followup.send("❌ ข้อความไม่อยู่ในรูปแบบที่รองรับ", ephemeral=True); return
-
-        async with message_lock(msg.id):
-            target_user = msg.mentions[0]
-            e = msg.embeds[0]
-            gender_text   = _find_embed_field(e, "gender", "เพศ") or ""
-            age_text      = _find_embed_field(e, "age", "อายุ") or "ไม่ระบุ"
-            birthday_text = _find_embed_field(e, "birthday", "วันเกิด") or ""
-
-            member = interaction.guild.get_member(target_user.id) or await interaction.guild.fetch_member(target_user.id)
-            await verify_service.apply_roles_on_approve(interaction.guild, member, gender_text=gender_text, age_text=age_text, birthday_text=birthday_text)
-
-            # mark DB
-            await PgVerifyRepo().set_request_status(interaction.guild.id, msg.id, "APPROVED", interaction.user.id)
-
-            # disable buttons + footer
-            for child in self.children:
-                if getattr(child, "custom_id", None) == "approve_button":
-                    child.label = "✅ Approved / อนุมัติแล้ว"; child.style = discord.ButtonStyle.success
-                elif getattr(child, "custom_id", None) == "reject_button":
-                    child.style = discord.ButtonStyle.secondary
-                child.disabled = True
-
-            actor = getattr(interaction.user, "display_name", None) or interaction.user.name
-            stamp = now_local().strftime("%d/%m/%Y %H:%M")
-            orig = e.footer.text or ""
-            e.set_footer(text=(f"{orig} • Approved by {actor} • {stamp}" if orig else f"Approved by {actor} • {stamp}"))
-            await msg.edit(embed=e, view=self)
+        payload = await verify_service.payloads.get(interaction.guild.id, msg.id) if msg else None
+        if payload is None:
+            await interaction.followup.send("❌ ไม่พบข้อมูลคำขอนี้ในระบบ", ephemeral=True); return
+
+        effects = decision_effects(interaction, "APPROVED", user_id=payload.user_id, gender_text=payload.gender_text or "",
+                                   age_text=payload.age_text or "ไม่ระบุ", birthday_text=payload.birthday_text or "")
+        # claim first: the conditional UPDATE lets exactly one click (on any worker) win, and its
+        # side effects are committed with it
+        with INTERACTION_STEP_SECONDS.labels("approve", "claim").time():
+            won = await verify_service.verify_repo.set_request_status(interaction.guild.id, msg.id, "APPROVED",
+                                                                      interaction.user.id, effects)
+        if not won:
+            await interaction.followup.send(_ALREADY_HANDLED, ephemeral=True); return
+        verify_service.pending.discard(interaction.guild.id, payload.user_id)
+        VERIFICATIONS_TOTAL.labels("approved").inc()
+        with INTERACTION_STEP_SECONDS.labels("approve", "effects").time():
+            await run_decision_effects(interaction, effects)
 
     @discord.ui.button(label="❌ Reject / ปฏิเสธ", style=discord.ButtonStyle.danger, custom_id="reject_button")
+    @instrumented("reject")
     async def reject(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not is_moderator(interaction.user):
             await interaction.response.send_message("❌ เฉพาะผู้ดูแลเท่านั้น", ephemeral=True); return
         if not interaction.response.is_done():
-            await interaction.response.defer()
+            with INTERACTION_STEP_SECONDS.labels("reject", "defer").time():
+                await interaction.response.defer()
 
         msg = interaction.message
-        if msg:
-            await PgVerifyRepo().set_request_status(interaction.guild.id, msg.id, "REJECTED", interaction.user.id)
-
-        # Disable
-        for child in self.children:
-            if getattr(child, "custom_id", None) == "reject_button":
-                child.label = "❌ Rejected / ปฏิเสธแล้ว"; child.style = discord.ButtonStyle.danger
-            elif getattr(child, "custom_id", None) == "approve_button":
-                child.style = discord.ButtonStyle.secondary
-            child.disabled = True
-
-        try:
-            e = msg.embeds[0]
-            actor = getattr(interaction.user, "display_name", None) or interaction.user.name
-            stamp = now_local().strftime("%d/%m/%Y %H:%M")
-            orig = e.footer.text or ""
-            e.set_footer(text=(f"{orig} • Rejected by {actor} • {stamp}" if orig else f"Rejected by {actor} • {stamp}"))
-            await msg.edit(embed=e, view=self)
-        except Exception:
-            pass
+        payload = await verify_service.payloads.get(interaction.guild.id, msg.id) if msg else None
+        if payload is None:
+            await interaction.followup.send("❌ ไม่พบข้อมูลคำขอนี้ในระบบ", ephemeral=True); return
+
+        effects = decision_effects(interaction, "REJECTED", user_id=payload.user_id)
+        with INTERACTION_STEP_SECONDS.labels("reject", "claim").time():
+            won = await verify_service.verify_repo.set_request_status(interaction.guild.id, msg.id, "REJECTED",
+                                                                      interaction.user.id, effects)
+        if not won:
+            await interaction.followup.send(_ALREADY_HANDLED, ephemeral=True); return
+        verify_service.pending.discard(interaction.guild.id, payload.user_id)
+        VERIFICATIONS_TOTAL.labels("rejected").inc()
+        with INTERACTION_STEP_SECONDS.labels("reject", "effects").time():
+            await run_decision_effects(interaction, effects)
+
+# ---- decision side effects (services/outbox.py) ----
+_REJECT_DM = "❌ การยืนยันตัวตนของคุณไม่ผ่าน กรุณาติดต่อแอดมิน"
+_DECIDED = {
+    "APPROVED": ("approve_button", "✅ Approved / อนุมัติแล้ว", discord.ButtonStyle.success, "Approved"),
+    "REJECTED": ("reject_button", "❌ Rejected / ปฏิเสธแล้ว", discord.ButtonStyle.danger, "Rejected"),
+}
+_RETRYING = "⏳ บางขั้นตอนยังไม่สำเร็จ ({kinds}) ระบบจะลองใหม่อัตโนมัติ ไม่ต้องกดซ้ำ"
+
+def decided_view(status: str) -> ApproveRejectPersistent:
+    # same custom_ids as the live view, all disabled; the chosen button keeps its colour
+    chosen, label, style, _ = _DECIDED[status]
+    view = ApproveRejectPersistent()
+    for child in view.children:
+        if getattr(child, "custom_id", None) == chosen:
+            child.label, child.style = label, style
+        else:
+            child.style = discord.ButtonStyle.secondary
+        child.disabled = True
+    return view
+
+def decision_effects(interaction: discord.Interaction, status: str, *, user_id: int, gender_text: str = "",
+                     age_text: str = "", birthday_text: str = "") -> list[OutboxEffect]:
+    gid, msg = interaction.guild.id, interaction.message
+    actor = getattr(interaction.user, "display_name", None) or interaction.user.name
+    effects = [effect("edit", gid, msg.id, channel_id=msg.channel.id, message_id=msg.id, status=status, actor=actor,
+                      stamp=now_local().strftime("%d/%m/%Y %H:%M"))]
+    if status == "APPROVED":
+        effects.append(effect("roles", gid, msg.id, user_id=user_id, gender_text=gender_text, age_text=age_text,
+                              birthday_text=birthday_text))
+    else:
+        effects.append(effect("dm", gid, msg.id, user_id=user_id, text=_REJECT_DM))
+    return effects
+
+async def run_decision_effects(interaction: discord.Interaction, effects: list[OutboxEffect]) -> None:
+    # first attempt on the interactive lane; failures stay in the outbox for the dispatcher
+    failed = await outbox.run(interaction.guild, effects, message=interaction.message, priority=PRIORITY_INTERACTIVE)
+    if failed:
+        await interaction.followup.send(_RETRYING.format(kinds=", ".join(fx.kind for fx, _ in failed)), ephemeral=True)
+
+@outbox.executor("roles")
+async def _apply_roles(guild: discord.Guild, p: dict, *, message=None, priority: int = PRIORITY_BACKGROUND) -> None:
+    if guild.get_role(ROLE_ID_TO_GIVE) is None:
+        raise RuntimeError(f"role {ROLE_ID_TO_GIVE} not found")
+    try:
+        member = await members.fresh(guild, p["user_id"])  # the role set below replaces whatever it holds
+    except discord.NotFound:
+        return  # left the guild: nothing to converge to
+    await verify_service.apply_roles_on_approve(guild, member, gender_text=p["gender_text"], age_text=p["age_text"],
+                                                birthday_text=p["birthday_text"], priority=priority)
+
+@outbox.executor("dm")
+async def _send_dm(guild: discord.Guild, p: dict, *, message=None, priority: int = PRIORITY_BACKGROUND) -> None:
+    try:
+        member = await members.get(guild, p["user_id"])
+        await rest.submit(dm_route(member), lambda: member.send(p["text"]), priority=priority)
+    except discord.NotFound:
+        pass  # left the guild; retrying won't change that
+    except discord.Forbidden:
+        # closed DMs: retrying won't help either, but the moderators should know the user wasn't told
+        admin_notifier.notify(guild, "ส่ง DM แจ้งผลการยืนยันไม่สำเร็จ (ผู้ใช้ปิด DM)", kind="error", key="dm:forbidden",
+                              who=f"<@{p['user_id']}>")
+
+@outbox.executor("edit")
+async def _mark_decided(guild: discord.Guild, p: dict, *, message=None, priority: int = PRIORITY_BACKGROUND) -> None:
+    channel = message.channel if message is not None else guild.get_channel(p["channel_id"])
+    if channel is None: return
+    try:
+        msg = message or await rest.submit(channel_route(channel), lambda: channel.fetch_message(p["message_id"]),
+                                           priority=priority)
+        view = decided_view(p["status"])
+        if not msg.embeds:
+            await rest.submit(channel_route(channel), lambda: msg.edit(view=view), priority=priority); return
+        e = msg.embeds[0]
+        note = f"{_DECIDED[p['status']][3]} by {p['actor']} • {p['stamp']}"
+        orig = e.footer.text or ""
+        if note not in orig:  # a retried edit must not stamp the footer twice
+            e.set_footer(text=f"{orig} • {note}" if orig else note)
+        await rest.submit(channel_route(channel), lambda: msg.edit(embed=e, view=view), priority=priority)
+    except discord.NotFound:
+        pass  # approval message deleted
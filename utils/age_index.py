@@ -0,0 +1,51 @@
+from bisect import bisect_right
+from datetime import date
+from typing import Iterable, Optional, Sequence
+try:
+    import numpy as np
+except ImportError:  # optional: batch APIs fall back to pure Python
+    np = None
+
+# Age → role lookup built once from ((lo, hi), role_id) slots: sorted boundary arrays + bisect.
+class AgeBracketIndex:
+    def __init__(self, slots: Iterable[tuple[tuple[int, int], int]]):
+        slots = sorted(((lo, hi), rid) for (lo, hi), rid in slots if rid and rid > 0)
+        self.lows = [lo for (lo, _), _ in slots]
+        self.highs = [hi for (_, hi), _ in slots]
+        self.role_ids = [rid for _, rid in slots]
+        # ages at which a birthday moves someone into a new bracket
+        self.starts = [lo for lo in self.lows if lo > 0]
+        if np is not None:
+            self._np_lows = np.asarray(self.lows, dtype=np.int64)
+            self._np_highs = np.asarray(self.highs, dtype=np.int64)
+            self._np_role_ids = np.asarray(self.role_ids, dtype=np.int64)
+
+    def resolve(self, age: int) -> Optional[int]:
+        i = bisect_right(self.lows, age) - 1
+        if i >= 0 and age <= self.highs[i]:
+            return self.role_ids[i]
+        return None
+
+    def resolve_many(self, ages: Sequence[int]) -> list[Optional[int]]:
+        if np is None or not self.lows:
+            return [self.resolve(a) for a in ages]
+        a = np.asarray(ages, dtype=np.int64)
+        idx = np.searchsorted(self._np_lows, a, side="right") - 1
+        safe = np.clip(idx, 0, None)
+        hit = (idx >= 0) & (a <= self._np_highs[safe])
+        out = np.where(hit, self._np_role_ids[safe], 0)
+        return [rid or None for rid in out.tolist()]
+
+def ages_from_birthdays(dates, today: date) -> list[int]:
+    # same rule as years_between: a year is added once (month, day) is reached; never negative.
+    # Accepts date/datetime objects, or a numpy datetime64 array for the fast path.
+    if np is not None and isinstance(dates, np.ndarray) and np.issubdtype(dates.dtype, np.datetime64):
+        d = dates.astype("datetime64[D]")
+        months = d.astype("datetime64[M]")
+        y = months.astype("datetime64[Y]").astype(np.int64) + 1970
+        m = months.astype(np.int64) % 12 + 1
+        day = (d - months).astype(np.int64) + 1
+        not_yet = (m > today.month) | ((m == today.month) & (day > today.day))
+        return np.maximum(today.year - y - not_yet, 0).tolist()
+    key = (today.month, today.day)
+    return [max(today.year - b.year - (key < (b.month, b.day)), 0) for b in dates]
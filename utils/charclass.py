@@ -0,0 +1,58 @@
+# Codepoint class table for validating form input in one scan.
+# Each entry is a bit set, so a field's violations come from OR-ing its characters.
+LETTER, DIGIT, FORBIDDEN, EMOJI, ZERO_WIDTH = 1, 2, 4, 8, 16
+
+FORBIDDEN_CHARS = "=+*/@#$%^&*()<>?|{}[]\"'\\~`"
+
+_EMOJI_RANGES = [
+    (0x1F000, 0x1FAFF),  # mahjong/cards, enclosed alnum (incl. regional indicators), pictographs, emoticons,
+                         # transport, alchemical, geometric ext, arrows-C, supplemental/extended-A pictographs
+    (0x2600, 0x27BF),    # misc symbols, dingbats
+    (0x2B00, 0x2BFF),    # misc symbols and arrows (⭐ ⬛ ⭕ …)
+    (0x2190, 0x21FF),    # arrows (↔ ↩ …)
+    (0x2300, 0x23FF),    # misc technical (⌚ ⏰ ⏩ …)
+    (0x25A0, 0x25FF),    # geometric shapes (▶ ◀ ◻ …)
+    (0x2900, 0x297F),    # supplemental arrows-B (⤴ ⤵)
+    (0xE0020, 0xE007F),  # tag characters (subdivision flags)
+    (0xFE00, 0xFE0F),    # variation selectors (incl. emoji presentation FE0F)
+]
+_EMOJI_SINGLES = [0x00A9, 0x00AE, 0x203C, 0x2049, 0x2122, 0x2139, 0x24C2, 0x3030, 0x303D, 0x3297, 0x3299,
+                  0x20E3, 0x200D]  # keycap combiner, ZWJ
+_ZERO_WIDTH_RANGES = [(0x200B, 0x200F), (0x202A, 0x202E), (0x2060, 0x206F), (0xFEFF, 0xFEFF),
+                      (0x00AD, 0x00AD), (0x180E, 0x180E)]
+
+_ASSIGNED_LIMIT = 0x30000  # letters/digits beyond plane 2 are not expected in display names
+
+def _build() -> bytearray:
+    table = bytearray(0x110000)
+    for cp in range(_ASSIGNED_LIMIT):
+        ch = chr(cp)
+        if ch.isdigit(): table[cp] = DIGIT
+        elif ch.isalpha(): table[cp] = LETTER
+    for lo, hi in _EMOJI_RANGES:
+        table[lo:hi + 1] = bytes([EMOJI]) * (hi - lo + 1)
+    for cp in _EMOJI_SINGLES:
+        table[cp] |= EMOJI
+    for lo, hi in _ZERO_WIDTH_RANGES:
+        for cp in range(lo, hi + 1):
+            table[cp] |= ZERO_WIDTH
+    for ch in FORBIDDEN_CHARS:
+        table[ord(ch)] |= FORBIDDEN
+    return table
+
+_TABLE = _build()
+
+_NAMES = ((DIGIT, "digit"), (FORBIDDEN, "forbidden"), (EMOJI, "emoji"), (ZERO_WIDTH, "zero_width"))
+
+def classify(s: str) -> int:
+    flags = 0
+    for ch in s or "":
+        flags |= _TABLE[ord(ch)]
+    return flags
+
+def text_violations(s: str, forbid: int = DIGIT | FORBIDDEN | EMOJI | ZERO_WIDTH) -> list[str]:
+    found = classify(s) & forbid
+    return [name for bit, name in _NAMES if found & bit]
+
+def contains_emoji(s: str) -> bool:
+    return bool(classify(s) & EMOJI)
@@ -0,0 +1,123 @@
+import re
+from typing import Iterable, Optional
+from utils.cache import LRUCache
+
+MALE, FEMALE, LGBT, UNDISCLOSED = "male", "female", "lgbt", "undisclosed"
+CATEGORIES = (MALE, FEMALE, LGBT, UNDISCLOSED)
+
+def norm_gender(s: str) -> str:
+    return re.sub(r'[\s\.\-_\/\\]+', '', (s or '').strip().lower())
+
+# Union of the alias lists that used to live separately in utils/validators.py and core/utils.py
+BASE_ALIASES = {
+    MALE: ["ช","ชา","ชาย","ผู้ชาย","เพศชาย","ผช","ชายแท้","เขา","หนุ่ม","male","man","boy","m","masculine","he","him",
+           "男","男性","おとこ","だんせい"],
+    FEMALE: ["ห","หญ","หญิง","ผู้หญิง","เพศหญิง","ผญ","สาว","female","woman","girl","f","feminine","she","her",
+             "女","女性","おんな","じょせい"],
+    LGBT: ["lgbt","lgbtq","lgbtq+","nonbinary","non-binary","nb","enby","trans","genderqueer","bigender","agender",
+           "genderfluid","queer","อื่น","เพศทางเลือก","สาวสอง","ทอม","ดี้","ไบ",
+           "mtf","ftm","transwoman","transman","transgender","transfem","transmasc","gay","lesbian","les","bi",
+           "bisexual","pansexual","เกย์","เลสเบี้ยน","เลส","กะเทย","ตุ๊ด","สาวประเภทสอง","ทรานส์","หญิงข้ามเพศ",
+           "ชายข้ามเพศ"],
+    UNDISCLOSED: ["ไม่ระบุ","ไม่บอก","ไม่สะดวก","ไม่อยากเปิดเผย","prefernottosay","undisclosed","unspecified","unknown",
+                  "private","secret","n/a","na","none","-","—"],
+}
+# Inputs that merely start with one of these still resolve (e.g. "ชายจ้า", "male!!"). No one- or
+# two-letter stems: "m"/"f"/"ห"/"ช" would send "mtf", "ftm", "หล่อ" and "หมา" to the wrong role, and
+# the longest prefix wins, so "mtf!!" or "หญิงข้ามเพศค่ะ" lands on the LGBT entry.
+BASE_PREFIXES = {
+    MALE: ["ชาย","ผู้ช","เพศช","หนุ่ม","male"],
+    FEMALE: ["หญิ","ผู้ห","เพศห","female","woman"],
+    LGBT: ["lgbt","trans","mtf","ftm","เกย์","กะเทย","ตุ๊ด","สาวสอง","สาวประเภทสอง","ทรานส์","หญิงข้ามเพศ","ชายข้ามเพศ"],
+}
+
+class _Node:
+    __slots__ = ("children", "exact", "prefix")
+    def __init__(self):
+        self.children: dict[str, _Node] = {}
+        self.exact: Optional[str] = None
+        self.prefix: Optional[str] = None
+
+# Prefix trie over normalized aliases: exact match, else longest registered prefix,
+# else the unique category within a small edit distance (typos/transpositions).
+class GenderAliasTrie:
+    def __init__(self, aliases: dict[str, Iterable[str]], prefixes: dict[str, Iterable[str]], cache_size:int=4096):
+        self._root = _Node()
+        self._cache = LRUCache(cache_size)
+        for cat, words in prefixes.items():
+            for w in words: self._insert(w).prefix = cat
+        for cat, words in aliases.items():
+            for w in words: self._insert(w).exact = cat
+
+    def _insert(self, word: str) -> _Node:
+        node = self._root
+        for ch in norm_gender(word):
+            node = node.children.setdefault(ch, _Node())
+        return node
+
+    def resolve(self, text: str) -> str:
+        t = norm_gender(text)
+        cat = self._cache.get(t)
+        if cat is None:
+            cat = self._lookup(t)
+            self._cache.set(t, cat)
+        return cat
+
+    def _lookup(self, t: str) -> str:
+        node, prefix_cat = self._root, self._root.prefix
+        for ch in t:
+            node = node.children.get(ch)
+            if node is None: break
+            if node.prefix: prefix_cat = node.prefix
+        else:
+            if node.exact: return node.exact
+        if prefix_cat: return prefix_cat
+        max_dist = 0 if len(t) < 4 else (1 if len(t) < 8 else 2)
+        return (self._fuzzy(t, max_dist) if max_dist else None) or UNDISCLOSED
+
+    def _fuzzy(self, word: str, max_dist: int) -> Optional[str]:
+        # optimal-string-alignment distance, pruned per trie branch
+        found: dict[str, int] = {}
+        first = list(range(len(word) + 1))
+        stack = [(child, ch, "", first, None) for ch, child in self._root.children.items()]
+        while stack:
+            node, ch, prev_ch, prev_row, prev_prev = stack.pop()
+            row = [prev_row[0] + 1]
+            for i in range(1, len(word) + 1):
+                v = min(row[i - 1] + 1, prev_row[i] + 1, prev_row[i - 1] + (word[i - 1] != ch))
+                if prev_prev is not None and i > 1 and word[i - 1] == prev_ch and word[i - 2] == ch:
+                    v = min(v, prev_prev[i - 2] + 1)
+                row.append(v)
+            if node.exact and row[-1] <= max_dist:
+                found[node.exact] = min(row[-1], found.get(node.exact, max_dist + 1))
+            if min(row) <= max_dist:
+                stack.extend((child, c, ch, row, prev_row) for c, child in node.children.items())
+        if not found: return None
+        best = min(found.values())
+        winners = [c for c, d in found.items() if d == best]
+        return winners[0] if len(winners) == 1 else None
+
+_base = GenderAliasTrie(BASE_ALIASES, BASE_PREFIXES)
+_by_guild: dict[int, GenderAliasTrie] = {}
+
+def resolve_gender(text: str, guild_id: Optional[int] = None) -> str:
+    return _by_guild.get(guild_id, _base).resolve(text)
+
+def _guild_trie(rows: Iterable[tuple[str, str]]) -> GenderAliasTrie:
+    aliases = {cat: list(words) for cat, words in BASE_ALIASES.items()}
+    for alias, cat in rows:
+        if cat in aliases: aliases[cat].append(alias)
+    return GenderAliasTrie(aliases, BASE_PREFIXES)
+
+def set_guild_aliases(guild_id: int, rows: Iterable[tuple[str, str]]) -> None:
+    _by_guild[guild_id] = _guild_trie(rows)
+
+async def load_guild_aliases(repo) -> int:
+    # repo.list_all() -> [(guild_id, alias, category)]; swaps the whole map so deleted guild aliases disappear too
+    grouped: dict[int, list[tuple[str, str]]] = {}
+    for guild_id, alias, cat in await repo.list_all():
+        grouped.setdefault(guild_id, []).append((alias, cat))
+    fresh = {guild_id: _guild_trie(rows) for guild_id, rows in grouped.items()}
+    _by_guild.clear()
+    _by_guild.update(fresh)
+    return len(grouped)
@@ -0,0 +1,178 @@
+# Lightweight in-process timing aggregates (count / avg / max).
+class Timing:
+    __slots__ = ("count", "total", "max")
+    def __init__(self):
+        self.count, self.total, self.max = 0, 0.0, 0.0
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max: self.max = seconds
+    def as_dict(self) -> dict:
+        avg = self.total / self.count if self.count else 0.0
+        return {"count": self.count, "avg_ms": round(avg * 1000, 3), "max_ms": round(self.max * 1000, 3)}
+
+# ---- Prometheus-style registry (rendered by services/metrics_server.py) ----
+import functools, time
+from bisect import bisect_left
+from typing import Iterable, Optional
+
+# 1.25x steps from 0.5ms to ~45s, so interpolated quantiles are within ~25% of the true value
+DEFAULT_BUCKETS = tuple(round(0.0005 * 1.25 ** i, 6) for i in range(52))
+
+class Counter:
+    __slots__ = ("value",)
+    def __init__(self):
+        self.value = 0
+    def inc(self, n: int = 1) -> None:
+        self.value += n
+
+class Gauge:
+    __slots__ = ("value",)
+    def __init__(self):
+        self.value = 0
+    def set(self, v) -> None:
+        self.value = v
+    def inc(self, n: int = 1) -> None:
+        self.value += n
+    def dec(self, n: int = 1) -> None:
+        self.value -= n
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum", "count", "max")
+    def __init__(self, bounds: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.sum, self.count, self.max = 0.0, 0, 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+        if seconds > self.max: self.max = seconds
+
+    def time(self) -> "_Timer":
+        return _Timer(self)
+
+    def quantile(self, q: float) -> Optional[float]:
+        # linear interpolation inside the bucket holding the q-th observation
+        if not self.count: return None
+        rank, seen = q * self.count, 0
+        for i, c in enumerate(self.counts):
+            if c and seen + c >= rank:
+                lo = self.bounds[i - 1] if i else 0.0
+                hi = min(self.bounds[i] if i < len(self.bounds) else self.max, self.max)
+                return lo + (hi - lo) * ((rank - seen) / c)
+            seen += c
+        return self.max
+
+    def as_dict(self) -> dict:
+        ms = lambda v: round(v * 1000, 2) if v is not None else None
+        return {"count": self.count, "p50_ms": ms(self.quantile(0.5)),
+                "p95_ms": ms(self.quantile(0.95)), "p99_ms": ms(self.quantile(0.99))}
+
+class _Timer:
+    __slots__ = ("hist", "t0")
+    def __init__(self, hist: Histogram):
+        self.hist = hist
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+    def __exit__(self, *exc):
+        self.hist.observe(time.perf_counter() - self.t0)
+
+class Family:
+    def __init__(self, kind: str, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.kind, self.name, self.help = kind, name, help
+        self.labelnames = tuple(labelnames)
+        self.children: dict[tuple, Counter | Gauge | Histogram] = {}
+
+    def labels(self, *values, **kw):
+        key = tuple(str(v) for v in values) or tuple(str(kw[n]) for n in self.labelnames)
+        child = self.children.get(key)
+        if child is None:
+            child = self.children[key] = _KINDS[self.kind]()
+        return child
+
+    def render(self) -> list[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self.children.items()):
+            lbl = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, key))
+            if not isinstance(child, Histogram):
+                out.append(f"{self.name}{{{lbl}}} {child.value}" if lbl else f"{self.name} {child.value}")
+                continue
+            sep = "," if lbl else ""
+            cum = 0
+            for bound, c in zip(child.bounds, child.counts):
+                cum += c
+                out.append(f'{self.name}_bucket{{{lbl}{sep}le="{bound}"}} {cum}')
+            out.append(f'{self.name}_bucket{{{lbl}{sep}le="+Inf"}} {child.count}')
+            out.append(f"{self.name}_sum{{{lbl}}} {child.sum}" if lbl else f"{self.name}_sum {child.sum}")
+            out.append(f"{self.name}_count{{{lbl}}} {child.count}" if lbl else f"{self.name}_count {child.count}")
+        return out
+
+_KINDS = {"counter": Counter, "gauge": Gauge, "histogram": Histogram}
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class Registry:
+    def __init__(self):
+        self.families: dict[str, Family] = {}
+
+    def _family(self, kind: str, name: str, help: str, labelnames: Iterable[str]) -> Family:
+        fam = self.families.get(name)
+        if fam is None:
+            fam = self.families[name] = Family(kind, name, help, labelnames)
+        return fam
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Family:
+        return self._family("counter", name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Family:
+        return self._family("gauge", name, help, labelnames)
+
+    def histogram(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Family:
+        return self._family("histogram", name, help, labelnames)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for fam in self.families.values():
+            lines.extend(fam.render())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+def instrumented(handler: str):
+    # times an async interaction handler end to end and counts exceptions that escape it
+    def deco(fn):
+        hist = INTERACTION_SECONDS.labels(handler)
+        errors = ERRORS_TOTAL.labels(handler)
+        @functools.wraps(fn)
+        async def wrapper(*args, **kw):
+            t0 = time.perf_counter()
+            try:
+                return await fn(*args, **kw)
+            except Exception:
+                errors.inc()
+                raise
+            finally:
+                hist.observe(time.perf_counter() - t0)
+        return wrapper
+    return deco
+
+INTERACTION_SECONDS = registry.histogram("saltybot_interaction_seconds", "Interaction handler latency", ("handler",))
+INTERACTION_STEP_SECONDS = registry.histogram("saltybot_interaction_step_seconds", "Latency of steps inside a handler", ("handler", "step"))
+DB_QUERY_SECONDS = registry.histogram("saltybot_db_query_seconds", "Time holding a pooled connection per repo call", ("query",))
+DB_ACQUIRE_SECONDS = registry.histogram("saltybot_db_acquire_seconds", "Time waiting for a pooled connection")
+REST_SECONDS = registry.histogram("saltybot_rest_seconds", "Discord REST call latency", ("route", "lane"))
+REST_WAIT_SECONDS = registry.histogram("saltybot_rest_wait_seconds", "Time queued in the REST scheduler", ("lane",))
+VERIFICATIONS_TOTAL = registry.counter("saltybot_verifications_total", "Verification requests by outcome", ("outcome",))
+ERRORS_TOTAL = registry.counter("saltybot_errors_total", "Errors by origin", ("where",))
+JOB_SECONDS = registry.histogram("saltybot_job_seconds", "Background job run time per attempt", ("job",))
+JOBS_TOTAL = registry.counter("saltybot_jobs_total", "Background job attempts by outcome", ("job", "outcome"))
+JOB_QUEUE_DEPTH = registry.gauge("saltybot_job_queue_depth", "Jobs waiting for a worker or a retry")
+OUTBOX_TOTAL = registry.counter("saltybot_outbox_total", "Outbox effect attempts by kind, path and outcome", ("kind", "path", "outcome"))
+WRITE_BEHIND_DEPTH = registry.gauge("saltybot_write_behind_depth", "Rows buffered for the next write-behind flush")
+WRITE_BEHIND_FLUSH_SECONDS = registry.histogram("saltybot_write_behind_flush_seconds", "Write-behind flush latency (one transaction)")
+WRITE_BEHIND_ROWS_TOTAL = registry.counter("saltybot_write_behind_rows_total", "Rows written by write-behind flushes", ("table",))
+ADMIN_NOTICES_TOTAL = registry.counter("saltybot_admin_notices_total", "Admin notices raised (before coalescing)", ("kind",))
@@ -0,0 +1,35 @@
+import discord
+from typing import Iterable, Optional
+from config import ROLE_ID_TO_GIVE, GENDER_ROLE_IDS_ALL, AGE_ROLE_IDS_ALL
+from services.rest_scheduler import rest, member_route, PRIORITY_INTERACTIVE
+from services.member_cache import members
+
+def current_role_ids(member: discord.Member) -> set[int]:
+    return {r.id for r in member.roles if not r.is_default()}
+
+def replace_in_group(current: Iterable[int], group: Iterable[int], new_id: Optional[int]) -> set[int]:
+    # drop every role of an exclusive group, then add new_id (if any)
+    target = set(current) - set(group)
+    if new_id: target.add(new_id)
+    return target
+
+def verified_role_ids(current: Iterable[int], *, gender_id: Optional[int], age_id: Optional[int],
+                      general_id: Optional[int] = ROLE_ID_TO_GIVE,
+                      gender_ids_all: Iterable[int] = GENDER_ROLE_IDS_ALL,
+                      age_ids_all: Iterable[int] = AGE_ROLE_IDS_ALL) -> set[int]:
+    # final role set after approval: exactly one gender role, at most one age role, plus the base role
+    target = replace_in_group(current, gender_ids_all, gender_id)
+    if age_id:
+        target = replace_in_group(target, age_ids_all, age_id)
+    if general_id: target.add(general_id)
+    return target
+
+async def apply_role_ids(member: discord.Member, target: set[int], *, reason: str,
+                         priority: int = PRIORITY_INTERACTIVE) -> bool:
+    # one PATCH for the whole diff; skipped entirely when nothing changes
+    if target == current_role_ids(member):
+        return False
+    roles = [discord.Object(id=rid) for rid in target]
+    await rest.submit(member_route(member), lambda: member.edit(roles=roles, reason=reason), priority=priority)
+    members.forget(member.guild.id, member.id)  # cached copy now has stale roles
+    return True
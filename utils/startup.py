@@ -0,0 +1,41 @@
+import time
+from typing import Optional
+
+# Wall-clock spans of one cold start, relative to process import time. Spans may overlap
+# (the DB warm-up runs alongside the gateway connect); each name is recorded once.
+class StartupTimer:
+    def __init__(self, t0: Optional[float] = None):
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self._open: dict[str, float] = {}
+        self.spans: dict[str, tuple[float, float]] = {}
+
+    def begin(self, name: str) -> None:
+        if name not in self.spans: self._open.setdefault(name, time.perf_counter())
+
+    def end(self, name: str) -> bool:
+        start = self._open.pop(name, None)
+        if start is None: return False
+        self.spans[name] = (start, time.perf_counter())
+        return True
+
+    def record(self, name: str, start: float, end: Optional[float] = None) -> None:
+        self.spans.setdefault(name, (start, time.perf_counter() if end is None else end))
+
+    def span(self, name: str):
+        return _Span(self, name)
+
+    def report(self) -> str:
+        lines = [f"⏱️ startup {max(e for _, e in self.spans.values()) - self.t0:.2f}s"] if self.spans else ["⏱️ startup"]
+        for name, (s, e) in sorted(self.spans.items(), key=lambda kv: kv[1][0]):
+            lines.append(f"  {name:<8} {s - self.t0:6.2f}s → {e - self.t0:6.2f}s  ({(e - s) * 1000:.0f}ms)")
+        return "\n".join(lines)
+
+class _Span:
+    __slots__ = ("timer", "name")
+    def __init__(self, timer: StartupTimer, name: str):
+        self.timer, self.name = timer, name
+    def __enter__(self):
+        self.timer.begin(self.name)
+        return self
+    def __exit__(self, *exc):
+        self.timer.end(self.name)
@@ -1,28 +1,10 @@
 import re, unicodedata
+from functools import lru_cache
+from typing import Iterable
+from utils.charclass import FORBIDDEN_CHARS, contains_emoji
 
-INVALID_CHARS = set("=+*/@#$%^&*()<>?|{}[]\"'\\~`")
+INVALID_CHARS = set(FORBIDDEN_CHARS)
 
-EMOJI_RE = re.compile(
-    r"["
-    r"\U0001F300-\U0001F5FF"
-    r"\U0001F600-\U0001F64F"
-    r"\U0001F680-\U0001F6FF"
-    r"\U0001F700-\U0001F77F"
-    r"\U0001F780-\U0001F7FF"
-    r"\U0001F900-\U0001F9FF"
-    r"\U0001FA00-\U0001FA6F"
-    r"\U0001FA70-\U0001FAFF"
-    r"\u2600-\u26FF"
-    r"\u2700-\u27BF"
-    r"]"
-    r"|[\u200d\uFE0F]"
-    r"|[\U0001F1E6-\U0001F1FF]{2}"
-)
-
-def contains_emoji(s: str) -> bool:
-    return bool(EMOJI_RE.search(s or ""))
-
-_ZERO_WIDTH_RE = re.compile(r"[\u200B-\u200F\u202A-\u202E\u2060-\u206F\uFEFF]")
 _CONFUSABLES_MAP = str.maketrans({
     "А":"A","В":"B","Е":"E","К":"K","М":"M","Н":"H","О":"O","Р":"P","С":"S","Т":"T","У":"Y","Х":"X",
     "а":"a","в":"b","е":"e","к":"k","м":"m","н":"h","о":"o","р":"p","с":"c","т":"t","у":"y","х":"x",
@@ -31,26 +13,28 @@ _CONFUSABLES_MAP = str.maketrans({
 })
 _LEET_MAP = str.maketrans({"0":"o","1":"l","3":"e","4":"a","5":"s","7":"t","8":"b","9":"g","2":"z","6":"g","@":"a","$":"s","+":"t"})
 
-def _strip_combining(s: str) -> str:
-    return "".join(ch for ch in s if unicodedata.category(ch) != "Mn")
-def _letters_only(s: str) -> str:
-    return "".join(ch for ch in s if unicodedata.category(ch).startswith("L"))
-def _collapse_runs(s: str) -> str:
-    if not s: return s
-    out=[s[0]]
-    for ch in s[1:]:
-        if ch!=out[-1]: out.append(ch)
-    return "".join(out)
+# Per-codepoint fold table: confusable/leet map → NFKD → keep letters (drops Mn/emoji/zero-width) → casefold.
+# Filled lazily (dict.__missing__) so str.translate does the whole per-character stage in C.
+_FOLD_MAP = {**_CONFUSABLES_MAP, **_LEET_MAP}
+
+class _FoldTable(dict):
+    def __missing__(self, cp: int) -> str:
+        ch = _FOLD_MAP.get(cp, chr(cp))
+        out = "".join(c.casefold() for c in unicodedata.normalize("NFKD", ch) if unicodedata.category(c).startswith("L"))
+        self[cp] = out
+        return out
+
+_FOLD = _FoldTable()
+for _cp in (*range(0x80), *range(0x0E00, 0x0E80)):  # ASCII + Thai up front
+    _FOLD[_cp]
+_RUNS_RE = re.compile(r"(.)\1+", re.S)
+
+@lru_cache(maxsize=8192)
 def canon_full(s: str) -> str:
     if not s: return ""
-    s = unicodedata.normalize("NFKC", s)
-    s = _ZERO_WIDTH_RE.sub("", s)
-    s = EMOJI_RE.sub("", s)
-    s = s.translate(_CONFUSABLES_MAP)
-    s = s.translate(_LEET_MAP)
-    s = unicodedata.normalize("NFKD", s)
-    s = _strip_combining(s)
-    s = _letters_only(s)
-    s = s.casefold()
-    s = _collapse_runs(s)
-    return s
+    if not s.isascii():
+        s = unicodedata.normalize("NFKC", s)  # needs context (composition), so it stays a separate pass
+    return _RUNS_RE.sub(r"\1", s.translate(_FOLD))
+
+def canon_many(names: Iterable[str]) -> list[str]:
+    return [canon_full(n) for n in names]
@@ -1,5 +1,13 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from config import TZ
 
 def now_local():
     return datetime.now(TZ)
+
+def seconds_until(hour:int, minute:int, now:datetime|None=None) -> float:
+    # seconds until the next HH:MM in TZ (tomorrow if already past today)
+    now = now or now_local()
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
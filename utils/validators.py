@@ -2,54 +2,35 @@ import re
 from datetime import datetime, timezone, timedelta
 from typing import Optional
 from config import (ROLE_MALE, ROLE_FEMALE, ROLE_LGBT, ROLE_GENDER_UNDISCLOSED,
-                    ROLE_AGE_UNDISCLOSED, TZ)
+                    ROLE_AGE_UNDISCLOSED, AGE_BRACKETS, TZ)
 from utils.text import contains_emoji
+from utils.age_index import AgeBracketIndex
+from utils.gender import resolve_gender, MALE, FEMALE, LGBT, UNDISCLOSED
 
 def _norm(s: str) -> str:
     return re.sub(r'[\s\.\-_\/\\]+', '', (s or '').strip().lower())
 
-MALE_ALIASES = {_norm(x) for x in ["ช","ชา","ชาย","ผู้ชาย","เพศชาย","ผช","male","man","boy","m","masculine","he","him","男","男性","おとこ","だんせい"]}
-FEMALE_ALIASES = {_norm(x) for x in ["ห","หญิง","ผู้หญิง","เพศหญิง","ผญ","female","woman","girl","f","feminine","she","her","女","女性","おんな","じょせい"]}
-LGBT_ALIASES = {_norm(x) for x in ["lgbt","lgbtq","lgbtq+","nonbinary","enby","trans","queer","อื่น","เพศทางเลือก","สาวสอง","ทอม","ดี้","ไบ"]}
 UNDISCLOSED_ALIASES = {_norm(x) for x in ["ไม่ระบุ","ไม่บอก","ไม่สะดวก","prefernottosay","undisclosed","unspecified","unknown","private","secret","n/a","na","none","-","—"]}
 
-def resolve_gender_role_id(text: str) -> int:
-    t = _norm(text)
-    if t in MALE_ALIASES: return ROLE_MALE
-    if t in FEMALE_ALIASES: return ROLE_FEMALE
-    if t in LGBT_ALIASES: return ROLE_LGBT
-    return ROLE_GENDER_UNDISCLOSED
+_GENDER_ROLES = {MALE: ROLE_MALE, FEMALE: ROLE_FEMALE, LGBT: ROLE_LGBT, UNDISCLOSED: ROLE_GENDER_UNDISCLOSED}
+
+def resolve_gender_role_id(text: str, guild_id: Optional[int] = None) -> int:
+    return _GENDER_ROLES[resolve_gender(text, guild_id)]
 
 def is_age_undisclosed(text: str) -> bool:
     t = _norm(text)
     return (t == "") or (t in UNDISCLOSED_ALIASES)
 
+AGE_INDEX = AgeBracketIndex(AGE_BRACKETS)
+AGE_BRACKET_STARTS = AGE_INDEX.starts
+
 def resolve_age_role_id(age_text: str) -> Optional[int]:
     if is_age_undisclosed(age_text): return ROLE_AGE_UNDISCLOSED
     try:
         age = int((age_text or "").strip())
     except ValueError:
         return None
-    slots = [
-        ((0, 12), 1402907371696558131),
-        ((13, 15), 1344232758129594379),
-        ((16, 18), 1344232891093090377),
-        ((19, 21), 1344232979647565924),
-        ((22, 24), 1344233048593403955),
-        ((25, 29), 1418703710137094357),
-        ((30, 34), 1418703702843457576),
-        ((35, 39), 1418703707100545075),
-        ((40, 44), 1418703944711929917),
-        ((45, 49), 1418703955176718396),
-        ((50, 54), 1418704062592843948),
-        ((55, 59), 1418704067194261615),
-        ((60, 64), 1418704072617496666),
-        ((65, 200), 1418704076119736390),
-    ]
-    for (lo, hi), rid in slots:
-        if lo <= age <= hi:
-            return rid
-    return None
+    return AGE_INDEX.resolve(age)
 
 _BDAY_RE = re.compile(r"^\s*(\d{1,2})[\/\.\-](\d{1,2})[\/\.\-](\d{4})\s*$")
 